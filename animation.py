@@ -0,0 +1,136 @@
+"""
+Timeline d'animations non bloquante : chaque effet est une entrée qui avance à chaque image
+de la boucle principale, pendant que les entrées clavier et souris restent traitées.
+非阻塞动画时间线：每个特效是一个条目，在主循环的每一帧推进，同时仍然处理键盘和鼠标输入。
+"""
+
+import pygame
+
+MAX_FRAME_MS = 100  # Après un menu ou une pause, ne pas sauter toute l'animation d'un coup
+SPEEDS = (1, 2, 4)  # Vitesses proposées dans les paramètres
+
+
+class Animation:
+    """
+    Classe pour représenter un effet en cours de lecture.
+    表示正在播放的特效的类。
+
+    ...
+    Attributs
+    ---------
+    frames : int
+        Nombre d'images de l'effet.
+        特效的帧数。
+    frame_ms : int
+        Durée d'une image, en millisecondes (à vitesse x1).
+        每帧时长（毫秒，一倍速）。
+    draw : callable
+        draw(screen, frame) dessine l'image numéro frame et renvoie le ou les rectangles dessinés.
+        绘制第 frame 帧并返回绘制的矩形。
+    delay : int
+        Attente avant la première image, en millisecondes (pour enchaîner plusieurs tirs).
+        第一帧前的等待时间（毫秒），用于连续射击。
+    """
+
+    __slots__ = ("frames", "frame_ms", "draw", "delay", "elapsed")
+
+    def __init__(self, frames, frame_ms, draw, delay=0):
+        self.frames = frames
+        self.frame_ms = frame_ms
+        self.draw = draw
+        self.delay = delay
+        self.elapsed = 0.0
+
+    @property
+    def started(self):
+        return self.elapsed >= self.delay
+
+    @property
+    def frame(self):
+        """Numéro de l'image à afficher."""
+        return int((self.elapsed - self.delay) // self.frame_ms)
+
+    @property
+    def done(self):
+        return self.started and self.frame >= self.frames
+
+
+class Timeline:
+    """
+    Classe pour jouer plusieurs animations en parallèle, au rythme d'une horloge.
+    按时钟节奏并行播放多个动画的类。
+
+    ...
+    Attributs
+    ---------
+    clock : pygame.time.Clock
+        Horloge de la boucle principale (limitée à fps images par seconde).
+        主循环的时钟。
+    speed : float
+        Multiplicateur de vitesse de lecture (2 = deux fois plus rapide).
+        播放速度倍数。
+    skip : bool
+        Si vrai, les animations ne sont pas jouées du tout (tours plus rapides).
+        为 True 时完全跳过动画。
+    animations : list
+        Animations en cours.
+        正在播放的动画。
+
+    Méthodes
+    --------
+    play(frames, frame_ms, draw, delay=0)
+        Ajoute un effet à la timeline et rend la main tout de suite.
+        添加特效并立即返回。
+    tick()
+        Attend la prochaine image et renvoie le temps écoulé.
+        等待下一帧并返回经过的时间。
+    advance(dt) / draw(screen)
+        Fait avancer les animations puis dessine leur image courante.
+        推进动画并绘制当前帧。
+    """
+
+    def __init__(self, fps):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.speed = 1
+        self.skip = False
+        self.animations = []
+
+    @property
+    def active(self):
+        return bool(self.animations)
+
+    def play(self, frames, frame_ms, draw, delay=0):
+        """Ajoute un effet ; renvoie l'Animation, ou None si les animations sont désactivées."""
+        if self.skip:
+            return None
+        animation = Animation(frames, frame_ms, draw, delay)
+        self.animations.append(animation)
+        return animation
+
+    def tick(self):
+        """Limite la boucle à fps images par seconde ; renvoie les millisecondes écoulées (plafonnées)."""
+        return min(self.clock.tick(self.fps), MAX_FRAME_MS)
+
+    def advance(self, dt):
+        """Fait avancer toutes les animations de dt millisecondes et retire celles qui sont finies."""
+        for animation in self.animations:
+            animation.elapsed += dt * self.speed
+        self.animations = [animation for animation in self.animations if not animation.done]
+
+    def draw(self, screen):
+        """Dessine l'image courante de chaque animation commencée ; renvoie les rectangles dessinés."""
+        rects = []
+        for animation in self.animations:
+            if not animation.started:
+                continue
+            drawn = animation.draw(screen, animation.frame)
+            if isinstance(drawn, pygame.Rect):
+                rects.append(drawn)
+            elif drawn:
+                rects.extend(drawn)
+        return rects
+
+    def clear(self):
+        """Abandonne les animations en cours."""
+        self.animations = []
@@ -0,0 +1,316 @@
+"""
+Gestionnaire d'images partagé : chaque fichier est décodé une fois, redimensionné une fois par taille
+et converti au format de l'écran, avec un plafond mémoire (éviction LRU).
+Les polices et les textes rendus sont aussi partagés.
+共享的图片管理器：每个文件只解码一次，每种尺寸只缩放一次，并转换为屏幕格式；带内存上限（LRU 淘汰）。
+字体和渲染后的文字也在此共享。
+"""
+
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+DEFAULT_MEMORY_CAP = 64 * 1024 * 1024  # 64 Mo de surfaces en cache
+DEFAULT_TEXT_CAP = 512  # Textes rendus gardés en cache
+PRELOAD_WORKERS = 4
+
+
+def surface_bytes(surface):
+    """Mémoire occupée par les pixels d'une surface."""
+    return surface.get_pitch() * surface.get_height()
+
+
+def file_size(path):
+    """Taille du fichier en octets, 0 s'il n'existe pas."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def decode_image(path, size):
+    """Décode (et redimensionne) une image ; exécuté dans un thread du pool de préchargement."""
+    image = pygame.image.load(path)
+    return image, None if size is None else pygame.transform.scale(image, size)
+
+
+def read_bytes(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+class Preload:
+    """
+    Classe pour suivre un préchargement lancé par AssetManager.preload.
+    跟踪 AssetManager.preload 启动的预加载的类。
+
+    ...
+    Attributs
+    ---------
+    total, total_bytes : int
+        Nombre de fichiers et d'octets à charger.
+        要加载的文件数和字节数。
+    errors : list
+        (chemin, exception) des fichiers qui n'ont pas pu être chargés.
+        加载失败的文件。
+
+    Méthodes
+    --------
+    progress()
+        (fichiers chargés, octets chargés), pour la barre de progression.
+        已加载的文件数和字节数，用于进度条。
+    done
+        Vrai quand tous les fichiers sont décodés.
+        全部解码完成时为 True。
+    finish()
+        Range les résultats dans le cache (à appeler depuis le thread principal).
+        将结果放入缓存（需在主线程调用）。
+    """
+
+    def __init__(self, manager, jobs, workers):
+        self.manager = manager
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # (type, clé, taille du fichier, future)
+        self.jobs = [(kind, key, file_size(key[0]), self.executor.submit(function, *key))
+                     for kind, key, function in jobs]
+        self.total = len(self.jobs)
+        self.total_bytes = sum(size for _, _, size, _ in self.jobs)
+        self.errors = []
+
+    @property
+    def done(self):
+        return all(future.done() for _, _, _, future in self.jobs)
+
+    def progress(self):
+        finished = [size for _, _, size, future in self.jobs if future.done()]
+        return len(finished), sum(finished)
+
+    def finish(self):
+        """Attend la fin des décodages puis range les résultats dans le cache du gestionnaire."""
+        manager = self.manager
+        for kind, key, _, future in self.jobs:
+            try:
+                result = future.result()
+            except (OSError, pygame.error) as error:
+                # Fichier manquant ou illisible : l'appelant retombera sur son image de secours
+                self.errors.append((key[0], error))
+                continue
+            if kind == "image":
+                path, size = key
+                image, scaled = result
+                if (path, None) not in manager.cache:
+                    manager.store((path, None), manager.to_display_format(image))
+                if scaled is not None:
+                    manager.store((path, size), manager.to_display_format(scaled))
+            elif kind == "sound":
+                manager.sounds[key[0]] = result
+            elif kind == "music":
+                manager.music[key[0]] = result
+        self.executor.shutdown()
+        return self.errors
+
+
+class AssetManager:
+    """
+    Classe pour charger et partager les images du jeu.
+    加载并共享游戏图片的类。
+
+    ...
+    Attributs
+    ---------
+    memory_cap : int
+        Taille maximale du cache en octets ; au-delà, les images les moins récemment utilisées sont oubliées.
+        缓存的最大字节数；超出时淘汰最久未使用的图片。
+    memory : int
+        Taille actuelle du cache en octets.
+        当前缓存大小（字节）。
+    hits, misses, evictions : int
+        Statistiques du cache.
+        缓存命中、未命中和淘汰次数。
+    text_cap : int
+        Nombre maximal de textes rendus gardés en cache (LRU).
+        缓存的渲染文字数量上限（LRU）。
+    text_hits, text_misses : int
+        Statistiques du cache de textes.
+        文字缓存命中与未命中次数。
+
+    Méthodes
+    --------
+    image(path, size=None)
+        L'image du fichier, à la taille demandée, au format de l'écran.
+        指定尺寸、屏幕格式的图片。
+    scaled(surface, size)
+        Une surface déjà chargée, redimensionnée une seule fois par taille.
+        已加载表面的缩放版本，每种尺寸只缩放一次。
+    font(face, size)
+        Police partagée, créée une seule fois par (face, taille).
+        共享字体，每个（字体，字号）只创建一次。
+    render(font, text, antialias, color)
+        Comme font.render, mais le texte n'est rastérisé qu'une fois tant qu'il ne change pas.
+        与 font.render 相同，但文字不变时只光栅化一次。
+    sound(path) / music_file(path)
+        Son décodé une seule fois, et fichier de musique gardé en mémoire.
+        只解码一次的音效，以及保存在内存中的音乐文件。
+    preload(images, sounds, music)
+        Décode tout en arrière-plan dans un pool de threads (écran de chargement).
+        在线程池中后台解码所有资源（加载界面）。
+    stats()
+        Résumé des statistiques du cache.
+        缓存统计摘要。
+    """
+
+    def __init__(self, memory_cap=DEFAULT_MEMORY_CAP, text_cap=DEFAULT_TEXT_CAP):
+        self.memory_cap = memory_cap
+        self.cache = OrderedDict()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fonts = {}
+        self.text_cap = text_cap
+        self.texts = OrderedDict()
+        self.text_hits = 0
+        self.text_misses = 0
+        self.sounds = {}
+        self.music = {}
+
+    def image(self, path, size=None):
+        """
+        Renvoie l'image du fichier, redimensionnée si size est donné.
+
+        Paramètres
+        ----------
+        path : str
+            Chemin du fichier image.
+        size : tuple ou None
+            (largeur, hauteur) voulue, ou None pour la taille d'origine.
+
+        Lève FileNotFoundError si le fichier n'existe pas (l'appelant choisit son image de secours).
+        """
+        key = (path, size)
+        surface = self.lookup(key)
+        if surface is None:
+            if size is None:
+                surface = self.to_display_format(pygame.image.load(path))
+            else:
+                surface = self.to_display_format(pygame.transform.scale(self.image(path), size))
+            self.store(key, surface)
+        return surface
+
+    def scaled(self, surface, size):
+        """Renvoie la surface à la taille donnée, sans la redimensionner à chaque image."""
+        if surface.get_size() == tuple(size):
+            return surface
+        key = (surface, tuple(size))
+        scaled = self.lookup(key)
+        if scaled is None:
+            scaled = pygame.transform.scale(surface, size)
+            self.store(key, scaled)
+        return scaled
+
+    def font(self, face, size):
+        """Police (face = None pour la police par défaut de pygame) à la taille donnée."""
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(face, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font, text, antialias, color):
+        """Surface du texte rendu, réutilisée tant que (texte, police, couleur, lissage) ne change pas."""
+        key = (text, font, tuple(color), antialias)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.text_hits += 1
+            self.texts.move_to_end(key)
+            return surface
+        self.text_misses += 1
+        surface = font.render(text, antialias, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.text_cap:
+            self.texts.popitem(last=False)  # Le texte le moins récemment affiché
+        return surface
+
+    def sound(self, path):
+        """Son du fichier, décodé une seule fois ; None si l'audio n'est pas disponible."""
+        if pygame.mixer.get_init() is None:
+            return None
+        sound = self.sounds.get(path)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            self.sounds[path] = sound
+        return sound
+
+    def music_file(self, path):
+        """Fichier de musique pour pygame.mixer.music.load : en mémoire s'il a été préchargé."""
+        data = self.music.get(path)
+        return path if data is None else io.BytesIO(data)
+
+    def preload(self, images=(), sounds=(), music=(), workers=PRELOAD_WORKERS):
+        """
+        Lance le décodage des images (chemin, taille), des sons et la lecture des musiques dans un pool de threads.
+
+        Les fichiers déjà en cache sont ignorés. La conversion au format de l'écran se fait ensuite
+        dans le thread principal, par Preload.finish().
+        """
+        jobs = [("image", (path, size), decode_image) for path, size in images if (path, size) not in self.cache]
+        if pygame.mixer.get_init() is not None:
+            jobs += [("sound", (path,), pygame.mixer.Sound) for path in sounds if path not in self.sounds]
+            jobs += [("music", (path,), read_bytes) for path in music if path not in self.music]
+        return Preload(self, jobs, workers)
+
+    def lookup(self, key):
+        surface = self.cache.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.cache.move_to_end(key)  # Récemment utilisée
+        return surface
+
+    def store(self, key, surface):
+        self.cache[key] = surface
+        self.memory += surface_bytes(surface)
+        # Oublier les plus anciennes, en gardant au moins celle qu'on vient d'ajouter
+        while self.memory > self.memory_cap and len(self.cache) > 1:
+            _, evicted = self.cache.popitem(last=False)
+            self.memory -= surface_bytes(evicted)
+            self.evictions += 1
+
+    @staticmethod
+    def to_display_format(surface):
+        """Convertit au format de l'écran (blits plus rapides), si une fenêtre existe."""
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def clear(self):
+        """Vide le cache (les surfaces encore utilisées ailleurs restent valides)."""
+        self.cache.clear()
+        self.memory = 0
+        self.texts.clear()
+
+    def stats(self):
+        """Statistiques du cache sous forme de dict."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.cache),
+            "memory": self.memory,
+            "text_hits": self.text_hits,
+            "text_misses": self.text_misses,
+            "texts": len(self.texts),
+        }
+
+
+# Gestionnaire partagé par tout le jeu
+assets = AssetManager()
@@ -0,0 +1,484 @@
+"""
+Mesures de performance du jeu.
+游戏性能测试。
+
+Usage : python benchmark.py
+Les messages console des règles sont redirigés pour ne mesurer que le calcul.
+"""
+
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+# Fenêtre et audio factices : les mesures d'affichage tournent aussi sans écran
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import combat
+import journal
+import mapgen
+import simulation
+import snapshot
+from assets import assets
+from game import Game, PRELOAD_IMAGES, show_loading_screen
+from occupancy import OccupancyGrid
+from particles import ParticlePool, emit_fire, emit_explosion
+from pathfinding import PathFinder
+from planner import Planner
+from replay import Replay
+from shapes import DISK_2, best_placement
+from terrain import TerrainGrid, TERRAIN_CODES
+from unit import WIDTH, HEIGHT, GRID_SIZE, CELL_SIZE, Pyro, Medic, Sniper, Scout
+from unitstore import UnitStore, COLUMNS
+
+
+@contextlib.contextmanager
+def quiet():
+    """Redirige les messages console des règles vers /dev/null."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def make_screen_game():
+    """Crée une fenêtre (factice si besoin) et un jeu affiché."""
+    screen = pygame.display.set_mode((WIDTH + 250, HEIGHT))
+    with quiet():
+        game = Game(screen)
+    return game
+
+
+def per_frame_ms(function, frames):
+    """Temps moyen d'un appel, en millisecondes."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        function()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def bench_headless_games(count=200):
+    """Parties headless complètes par seconde, comparées à l'objectif de simulation.py."""
+    with quiet():
+        rate = simulation.games_per_second(count)
+    target = simulation.TARGET_GAMES_PER_SECOND
+    status = "OK" if rate >= target else "sous l'objectif"
+    print(f"Parties headless : {rate:.1f} parties/s (objectif {target}) -> {status}")
+    return rate
+
+
+def bench_terrain_layer(frames=300):
+    """Coût par image du terrain : 256 blits (avant) contre le fond en cache (après)."""
+    game = make_screen_game()
+    screen = game.screen
+
+    def blit_every_tile():
+        for x in range(GRID_SIZE):
+            for y in range(GRID_SIZE):
+                screen.blit(game.terrain.image_at(x, y), (x * CELL_SIZE, y * CELL_SIZE))
+
+    def blit_cached_layer():
+        game.update_terrain_layer()
+        screen.blit(game.terrain_layer, (0, 0))
+
+    before = per_frame_ms(blit_every_tile, frames)
+    after = per_frame_ms(blit_cached_layer, frames)
+    with quiet():
+        frame = per_frame_ms(game.flip_display, frames)
+    print(f"Terrain par image : {before:.3f} ms (256 blits) -> {after:.3f} ms (fond en cache), "
+          f"flip_display complet : {frame:.3f} ms")
+    return before, after
+
+
+def bench_dirty_rects(frames=60):
+    """Pixels poussés par image : rectangles modifiés contre display.flip complet."""
+    results = {}
+    for dirty_rects in (False, True):
+        game = make_screen_game()
+        game.selected_mode = "Group"
+        game.renderer.dirty_rects = dirty_rects
+        unit = game.player_units[0]
+        with quiet():
+            game.flip_display()
+            game.renderer.reset_stats()
+            for frame in range(frames):
+                # Une unité fait des allers-retours et perd un peu de vie de temps en temps
+                unit.move(1 if frame % 2 == 0 else -1, 0, game)
+                if frame % 10 == 0:
+                    unit.health -= 1
+                game.flip_display()
+        results[dirty_rects] = game.renderer.average_frame_pixels
+    print(f"Pixels poussés par image : {results[False]:.0f} (flip) -> {results[True]:.0f} (rectangles modifiés)")
+    return results
+
+
+def random_terrain(size, rng):
+    """Terrain aléatoire sans affichage : surtout de l'herbe, avec murs, eau, lave et routes."""
+    terrain = TerrainGrid(size)
+    weights = {"grass": 70, "road": 10, "water": 8, "lava": 2, "tree": 3, "wall": 7}
+    codes = rng.choices([TERRAIN_CODES[name] for name in weights], weights=list(weights.values()), k=size * size)
+    terrain.types[:] = np.array(codes, dtype=np.uint8).reshape(size, size)
+    return terrain
+
+
+def bench_pathfinding(sizes=(GRID_SIZE, 64, 128, 256, 1024), seed=0):
+    """
+    Requêtes A* par seconde (sans cache) entre deux cases aléatoires, selon la taille de la carte,
+    et durée de la première requête (grille des coûts à construire).
+    """
+    rng = random.Random(seed)
+    results = {}
+    for size in sizes:
+        pathfinder = PathFinder(random_terrain(size, rng), OccupancyGrid(size))
+        start = time.perf_counter()
+        pathfinder.find_path((0, 0), (0, 1))
+        first = (time.perf_counter() - start) * 1000
+        queries = max(5, 20000 // size)
+        pairs = [((rng.randrange(size), rng.randrange(size)), (rng.randrange(size), rng.randrange(size)))
+                 for _ in range(queries)]
+        start = time.perf_counter()
+        for source, goal in pairs:
+            pathfinder.find_path(source, goal)
+        results[size] = queries / (time.perf_counter() - start)
+        print(f"Chemins A* {size}x{size} : {results[size]:.1f} requêtes/s (première requête {first:.1f} ms)")
+    return results
+
+
+def bench_move_range(calls=2000):
+    """Cases accessibles d'une unité : BFS borné (cache vide) contre le dict en cache, puis le dessin de la portée."""
+    game = make_screen_game()
+    unit = max(game.player_units, key=lambda unit: unit.speed)
+    pathfinder = game.pathfinder
+
+    def cold():
+        pathfinder.reach_cache.clear()
+        pathfinder.reachable(unit)
+
+    bfs = per_frame_ms(cold, calls) * 1000
+    cached = per_frame_ms(lambda: pathfinder.reachable(unit), calls) * 1000
+    draw = per_frame_ms(lambda: unit.draw_move_range(game.screen, game), calls // 10)
+    print(f"Cases accessibles ({unit.__class__.__name__}, vitesse {unit.speed}) : BFS {bfs:.1f} µs, "
+          f"en cache {cached:.2f} µs ; dessin de la portée {draw:.3f} ms")
+
+
+def bench_assets(games=5):
+    """Création d'un jeu affiché : premier chargement (disque) contre les suivants (cache d'images)."""
+    assets.clear()
+    timings = []
+    for _ in range(games):
+        start = time.perf_counter()
+        make_screen_game()
+        timings.append((time.perf_counter() - start) * 1000)
+    stats = assets.stats()
+    print(f"Création d'un jeu : {timings[0]:.1f} ms (à froid) -> {min(timings[1:]):.1f} ms (images en cache), "
+          f"taux de succès {stats['hit_rate']:.0%}, {stats['entries']} images, {stats['memory'] / 1e6:.1f} Mo")
+    return timings
+
+
+def bench_restart(restarts=20):
+    """Nouvelle partie jusqu'à la première image : __init__ complet (à froid, puis images en cache) contre Game.new_game."""
+    screen = pygame.display.set_mode((WIDTH + 250, HEIGHT))
+    assets.clear()
+    with quiet():
+        start = time.perf_counter()
+        game = Game(screen)
+        game.flip_display()
+        cold = (time.perf_counter() - start) * 1000
+        warm = per_frame_ms(lambda: (game.__init__(screen), game.flip_display()), restarts)
+        reset = per_frame_ms(lambda: (game.new_game(), game.flip_display()), restarts)
+    print(f"Nouvelle partie jouable : __init__ {cold:.1f} ms (à froid), {warm:.1f} ms (images en cache) "
+          f"-> new_game {reset:.1f} ms")
+
+
+def bench_mapgen(sizes=(GRID_SIZE, 64, 256, 1024), seeds=5):
+    """Génération de carte (mapgen) de 16x16 à 1024x1024, dont la vérification de connexité des zones d'apparition."""
+    rules = [("water", "wall", "lava"), ("water", "lava"), ("wall", "lava")]
+    mapgen.generate(GRID_SIZE, 0, movement_rules=rules)  # Premier appel hors mesure
+    for size in sizes:
+        start = time.perf_counter()
+        maps = [mapgen.generate(size, seed, {"grass": 1, "water": 2}, rules) for seed in range(seeds)]
+        generate = (time.perf_counter() - start) * 1000 / seeds
+        check = per_frame_ms(lambda: mapgen.connected(maps[0][0], [TERRAIN_CODES[name] for name in rules[0]]), seeds)
+        print(f"Carte {size}x{size} : génération {generate:.2f} ms, dont connexité {check:.2f} ms")
+
+
+def bench_large_map(sizes=(GRID_SIZE, 64, 256), frames=100):
+    """flip_display selon la taille de la carte, caméra fixe puis en défilement : le coût suit la fenêtre."""
+    screen = pygame.display.set_mode((WIDTH + 250, HEIGHT))
+    for size in sizes:
+        with quiet():
+            start = time.perf_counter()
+            game = Game(screen, seed=0, grid_size=size)
+            setup = (time.perf_counter() - start) * 1000
+            game.flip_display()
+            still = per_frame_ms(game.flip_display, frames)
+            steps = iter(range(frames))
+            scrolling = per_frame_ms(lambda: (game.camera.scroll(1 if next(steps) % 40 < 20 else -1, 0),
+                                              game.flip_display()), frames)
+        print(f"Carte {size}x{size} : création {setup:.1f} ms, image {still:.3f} ms (caméra fixe), "
+              f"{scrolling:.3f} ms (défilement)")
+
+
+def bench_input_loop(clicks=10, interval=0.1):
+    """
+    Écran en attente de clics (menu) : ancienne boucle sur pygame.event.get, redessinée à chaque tour,
+    contre InputLoop (pygame.event.wait, redessin au clic). Processeur utilisé et latence clic -> image.
+    """
+    game = make_screen_game()
+    screen = game.screen
+    menu = assets.image("pic/bg.jpg", (WIDTH, HEIGHT))
+    click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(WIDTH // 2, HEIGHT // 2))
+
+    def feed(posted):
+        for _ in range(clicks):
+            time.sleep(interval)
+            posted.append(time.perf_counter())
+            pygame.event.post(click)
+
+    def measure(wait_for_clicks):
+        posted, answered = [], []
+        feeder = threading.Thread(target=feed, args=(posted,))
+        start, cpu = time.perf_counter(), time.process_time()
+        feeder.start()
+        wait_for_clicks(answered)
+        feeder.join()
+        share = (time.process_time() - cpu) / (time.perf_counter() - start)
+        latency = sum(done - sent for sent, done in zip(posted, answered)) * 1000 / clicks
+        return share, latency
+
+    def spinning(answered):
+        while len(answered) < clicks:
+            clicked = any(event.type == pygame.MOUSEBUTTONDOWN for event in pygame.event.get())
+            screen.blit(menu, (0, 0))
+            game.present()
+            if clicked:
+                answered.append(time.perf_counter())
+
+    def waiting(answered):
+        while len(answered) < clicks:
+            if any(event.type == pygame.MOUSEBUTTONDOWN for event in game.input.events()):
+                screen.blit(menu, (0, 0))
+                game.present()
+                answered.append(time.perf_counter())
+
+    before = measure(spinning)
+    after = measure(waiting)
+    print(f"Attente de clics : processeur {before[0]:.0%}, latence {before[1]:.2f} ms (event.get en boucle) "
+          f"-> {after[0]:.0%}, {after[1]:.2f} ms (InputLoop)")
+
+
+def bench_particles(counts=(100, 1000, 4000), frames=10):
+    """Coût par image (mise à jour + dessin) du pool de particules, comparé au budget d'une image à 30 FPS."""
+    screen = pygame.display.set_mode((WIDTH + 250, HEIGHT))
+    budget = 1000 / 30
+    results = {}
+    for count in counts:
+        pool = ParticlePool(capacity=count)
+        # Moitié feu réparti sur la carte, moitié explosions (toutes encore vivantes sur ces images)
+        for i in range(count // 100):
+            cell = pygame.Rect((i * 7) % GRID_SIZE * CELL_SIZE, (i * 3) % GRID_SIZE * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            emit_fire(pool, cell, 50)
+            emit_explosion(pool, cell.center, 50)
+
+        def frame():
+            pool.update(1000 / 30)
+            pool.draw(screen)
+
+        results[count] = per_frame_ms(frame, frames)
+        print(f"Particules ({count}) : {results[count]:.2f} ms par image (budget {budget:.1f} ms à 30 FPS)")
+    return results
+
+
+def bench_cold_start():
+    """Chargement des images : décodage séquentiel contre l'écran de chargement à pool de threads, puis création du jeu."""
+    screen = pygame.display.set_mode((WIDTH + 250, HEIGHT))
+    assets.clear()
+    start = time.perf_counter()
+    for path, size in PRELOAD_IMAGES:
+        assets.image(path, size)
+    sequential = (time.perf_counter() - start) * 1000
+
+    assets.clear()
+    start = time.perf_counter()
+    with quiet():
+        show_loading_screen(screen)
+        Game(screen)
+    threaded = (time.perf_counter() - start) * 1000
+    fake_bar = 60 * 50 + 40 * 15  # Ancienne barre factice : pauses de 50 ms puis de 15 ms
+    print(f"Démarrage : {fake_bar} ms de barre factice + {sequential:.0f} ms de décodage séquentiel -> "
+          f"{threaded:.0f} ms (écran de chargement sur un pool de threads + création du jeu, {os.cpu_count()} CPU)")
+    return sequential, threaded
+
+
+def bench_unit_store(count=2000, queries=200):
+    """Mémoire par unité et requête « cible la plus proche » : colonnes NumPy contre boucle Python."""
+    game = Game(None)
+    game.unit_store = UnitStore()
+    classes = (Pyro, Medic, Sniper, Scout)
+    units = [classes[i % 4](random.randrange(GRID_SIZE), random.randrange(GRID_SIZE),
+                            "player" if i % 2 else "enemy", game) for i in range(count)]
+    store = game.unit_store
+    per_unit = sys.getsizeof(units[0]) + sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values())
+    players = [unit for unit in units if unit.team == "player"]
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        min(
+            (unit for unit in players if unit.health > 0),
+            key=lambda unit: abs(unit.x - 5) + abs(unit.y - 5),
+        )
+    loop = (time.perf_counter() - start) / queries * 1000
+    start = time.perf_counter()
+    for _ in range(queries):
+        store.closest(5, 5, "player")
+    vectorized = (time.perf_counter() - start) / queries * 1000
+    print(f"Unités : {per_unit} octets par unité (vue __slots__ + une ligne de colonnes) ; "
+          f"cible la plus proche parmi {len(players)} : {loop:.3f} ms (boucle) -> {vectorized:.3f} ms (colonnes)")
+
+
+def bench_skill_shapes(repeat=50):
+    """Aperçu de l'explosion du Pyro sur les 256 centres : listes de cases contre gabarit précalculé."""
+    game = Game(None)
+    units = game.player_units + game.enemy_units
+    enemies = game.occupancy.team_mask("enemy")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for x in range(GRID_SIZE):
+            for y in range(GRID_SIZE):
+                positions = [
+                    (x + dx, y + dy)
+                    for dx in range(-3, 4)
+                    for dy in range(-3, 4)
+                    if 0 <= x + dx < GRID_SIZE and 0 <= y + dy < GRID_SIZE and dx ** 2 + dy ** 2 <= 4
+                ]
+                sum(1 for unit in units if unit.team == "enemy" and (unit.x, unit.y) in positions)
+    lists = (time.perf_counter() - start) / repeat * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        best_placement(DISK_2, enemies)
+    stencil = (time.perf_counter() - start) / repeat * 1000
+    print(f"Aperçu d'une zone d'effet sur {GRID_SIZE * GRID_SIZE} centres : {lists:.2f} ms (listes) -> "
+          f"{stencil:.3f} ms (gabarit + coverage)")
+
+
+def bench_combat(attacks=1_000_000, loop_attacks=20000):
+    """Résolutions d'attaque Sniper contre Scout par seconde : Unit.attack une à une contre le simulateur vectorisé."""
+    game = Game(None)
+    sniper, scout = game.player_units[3], game.enemy_units[2]
+    health = scout.health
+    start = time.perf_counter()
+    with journal.silenced():
+        for _ in range(loop_attacks):
+            scout.health = health
+            sniper.attack(scout)
+    loop = loop_attacks / (time.perf_counter() - start)
+    start = time.perf_counter()
+    combat.simulate(combat.unit_stats(sniper), combat.unit_stats(scout), attacks // combat.MAX_TURNS)
+    vectorized = attacks / (time.perf_counter() - start)
+    print(f"Attaques simulées : {loop / 1e3:.0f} k/s (Unit.attack) -> {vectorized / 1e6:.1f} M/s (combat.simulate)")
+
+
+def bench_planner(budget=0.5, games=10, game_budget=0.05):
+    """Rollouts MCTS par tour ennemi, dans le processus du jeu puis avec un pool, et victoires contre l'IA des joueurs."""
+    workers = os.cpu_count() or 1
+    rates = {}
+    with journal.silenced():
+        for count in sorted({1, max(2, workers)}):
+            planner = Planner(budget, count)
+            planner.plan(Game(None))  # Démarre le pool
+            planner.plan(Game(None))
+            rates[count] = planner.iterations / budget
+            planner.close()
+        planner = Planner(game_budget, 1)
+        greedy = sum(simulation.play_headless_game(i)["winner"] == "enemy" for i in range(games))
+        mcts = sum(simulation.play_headless_game(i, planner=planner)["winner"] == "enemy" for i in range(games))
+    print(f"MCTS ({workers} CPU) : " + ", ".join(f"{rate:.0f} rollouts/s avec {count} processus" for count, rate in rates.items())
+          + f" ; victoires ennemies sur {games} parties : {greedy} (glouton) -> {mcts} (MCTS, {game_budget} s par tour)")
+
+
+def bench_replay(games=20, path="benchmark.rpl"):
+    """Taille des replays, relecture headless complète, et placement au dernier tour avec ou sans keyframes."""
+    sizes, turns, replays = 0, 0, []
+    with journal.silenced():
+        for seed in range(games):
+            simulation.play_headless_game(seed, record=path)
+            sizes += os.path.getsize(path)
+            replays.append(Replay.load(path))
+            turns += replays[-1].turns
+        os.remove(path)
+        start = time.perf_counter()
+        for replay in replays:
+            replay.play()
+        playback = games / (time.perf_counter() - start)
+        last = max(replays, key=lambda replay: replay.turns)
+        start = time.perf_counter()
+        last.game_at(last.turns)
+        seek = (time.perf_counter() - start) * 1000
+        keyframes, last.keyframes = last.keyframes, {}
+        start = time.perf_counter()
+        last.game_at(last.turns)
+        scratch = (time.perf_counter() - start) * 1000
+        last.keyframes = keyframes
+    print(f"Replays : {sizes / turns:.0f} octets par tour ; relecture {playback:.0f} parties/s ; "
+          f"tour {last.turns} atteint en {scratch:.1f} ms depuis le tour 0 -> {seek:.1f} ms depuis une keyframe")
+
+
+def bench_snapshot(repeat=2000, turns=15):
+    """Snapshot d'une partie en cours : taille et aller-retour."""
+    with journal.silenced():
+        game = Game(None, 0)
+        game.selected_mode = "Group"
+        simulation.play_game(game, turns, simulation.closest_enemy)
+        data = snapshot.dumps(game)
+        save = per_frame_ms(lambda: snapshot.dumps(game), repeat)
+        target = Game(None, 1)
+        load = per_frame_ms(lambda: snapshot.loads(target, data), repeat)
+        # Jeu affiché : les images viennent des unités remplacées, rien n'est décodé
+        screen_game = make_screen_game()
+        screen_load = per_frame_ms(lambda: snapshot.loads(screen_game, data), repeat // 10)
+    print(f"Snapshot : {len(data)} octets ; "
+          f"sauvegarde {save * 1000:.0f} µs, chargement {load * 1000:.0f} µs ({screen_load * 1000:.0f} µs avec affichage)")
+
+
+def bench_logging(count=50, calls=200000):
+    """Coût d'un message de journal coupé, et parties headless avec journal écrit (vers /dev/null) ou coupé."""
+    with journal.silenced():
+        start = time.perf_counter()
+        for i in range(calls):
+            journal.combat_log.info("%s inflige %s dégâts à %s.", "Pyro", i, "Sniper")
+        disabled = (time.perf_counter() - start) / calls * 1e9
+    with quiet():
+        start = time.perf_counter()
+        for i in range(count):
+            simulation.play_headless_game(i)
+        logged = count / (time.perf_counter() - start)
+    silenced = simulation.games_per_second(count)
+    print(f"Journal coupé : {disabled:.0f} ns par message ; "
+          f"parties headless : {logged:.1f}/s (journal écrit) -> {silenced:.1f}/s (journal coupé)")
+
+
+if __name__ == "__main__":
+    bench_headless_games()
+    bench_terrain_layer()
+    bench_dirty_rects()
+    bench_large_map()
+    bench_mapgen()
+    bench_pathfinding()
+    bench_move_range()
+    bench_assets()
+    bench_restart()
+    bench_input_loop()
+    bench_particles()
+    bench_cold_start()
+    bench_logging()
+    bench_unit_store()
+    bench_skill_shapes()
+    bench_combat()
+    bench_planner()
+    bench_replay()
+    bench_snapshot()
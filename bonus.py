@@ -1,14 +1,17 @@
 import pygame
 from abc import ABC, abstractmethod
+from assets import assets
+from journal import combat_log, ui_log
 
 class BonusItem(ABC):
     """
     Classe abstraite représentant un bonus générique dans le jeu.
     """
-    def __init__(self, x, y):
+    def __init__(self, x, y, headless=False):
         self.x = x
         self.y = y
-        self.image = self.load_bonus_image()
+        # En mode headless (simulation sans fenêtre), l'image n'est pas décodée
+        self.image = None if headless else self.load_bonus_image()
 
     @abstractmethod
     def load_bonus_image(self):
@@ -36,30 +39,28 @@ class BonusItem(ABC):
 class AttackBoost(BonusItem):
     def load_bonus_image(self):
         try:
-            image = pygame.image.load("pic/attack_boost.png")
-            return pygame.transform.scale(image, (60, 60))
+            return assets.image("pic/attack_boost.png", (60, 60))  # Partagée par tous les bonus
         except FileNotFoundError:
-            print("Image d'attaque introuvable, utilisation par défaut.")
+            ui_log.warning("Image d'attaque introuvable, utilisation par défaut.")
             image = pygame.Surface((60, 60))
             image.fill((255, 0, 0))  # Rouge pour attaque
             return image
 
     def apply_bonus(self, unit):
         unit.attack_power += 2
-        print(f"{unit.__class__.__name__} a reçu un boost d'attaque ! Nouvelle attaque : {unit.attack_power}")
+        combat_log.info("%s a reçu un boost d'attaque ! Nouvelle attaque : %s", unit.__class__.__name__, unit.attack_power)
 
 
 class DefenseBoost(BonusItem):
     def load_bonus_image(self):
         try:
-            image = pygame.image.load("pic/defense_boost.png")
-            return pygame.transform.scale(image, (60, 60))
+            return assets.image("pic/defense_boost.png", (60, 60))  # Partagée par tous les bonus
         except FileNotFoundError:
-            print("Image de défense introuvable, utilisation par défaut.")
+            ui_log.warning("Image de défense introuvable, utilisation par défaut.")
             image = pygame.Surface((60, 60))
             image.fill((0, 0, 255))  # Bleu pour défense
             return image
 
     def apply_bonus(self, unit):
         unit.defense += 1
-        print(f"{unit.__class__.__name__} a reçu un boost de défense ! Nouvelle défense : {unit.defense}")
+        combat_log.info("%s a reçu un boost de défense ! Nouvelle défense : %s", unit.__class__.__name__, unit.defense)
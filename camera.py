@@ -0,0 +1,104 @@
+"""
+Caméra : la fenêtre montre view_size x view_size cases d'une carte qui peut être bien plus grande.
+Tout ce qui est dessiné passe de la case à l'écran par la caméra, et seules les cases visibles sont dessinées :
+le coût d'une image dépend de la taille de la fenêtre, pas de celle de la carte.
+摄像机：窗口显示 view_size x view_size 个格子，地图可以大得多。只绘制可见的格子，每帧开销取决于窗口大小而非地图大小。
+"""
+
+import pygame
+
+
+class Camera:
+    """
+    Classe pour représenter la partie visible de la carte.
+    表示地图可见部分的类。
+
+    ...
+    Attributs
+    ---------
+    x, y : int
+        Case de la carte affichée en haut à gauche de la fenêtre.
+        窗口左上角显示的地图格子。
+    size : int
+        Cases visibles par côté (au plus la taille de la carte).
+        每边可见的格子数（不超过地图大小）。
+    version : int
+        Incrémenté à chaque déplacement, pour invalider ce qui est dessiné en cache (terrain, brouillard).
+        每次移动时递增，用于使缓存的绘制结果失效。
+
+    Méthodes
+    --------
+    move_to(x, y) / scroll(dx, dy) / center_on(x, y) / follow(x, y)
+        Déplace la caméra, sans jamais sortir de la carte.
+        移动摄像机（不会超出地图）。
+    rect(x, y) / center(x, y) / cells_rect(positions)
+        Case(s) de la carte -> pixels de l'écran.
+        地图格子 -> 屏幕像素。
+    cell_at(px, py)
+        Pixel de l'écran (clic de souris) -> case de la carte.
+        屏幕像素（鼠标点击）-> 地图格子。
+    contains(x, y) / bounds()
+        Cases visibles.
+        可见的格子。
+    """
+
+    def __init__(self, grid_size, view_size, cell_size):
+        self.grid_size = grid_size
+        self.size = min(view_size, grid_size)
+        self.cell_size = cell_size
+        self.x = self.y = 0
+        self.version = 0
+
+    def move_to(self, x, y):
+        """Place la case (x, y) en haut à gauche (bornée à la carte) ; vrai si la caméra a bougé."""
+        limit = self.grid_size - self.size
+        x, y = max(0, min(limit, x)), max(0, min(limit, y))
+        if (x, y) == (self.x, self.y):
+            return False
+        self.x, self.y = x, y
+        self.version += 1
+        return True
+
+    def scroll(self, dx, dy):
+        return self.move_to(self.x + dx, self.y + dy)
+
+    def center_on(self, x, y):
+        return self.move_to(x - self.size // 2, y - self.size // 2)
+
+    def follow(self, x, y, margin=2):
+        """Déplace la caméra juste assez pour garder (x, y) à margin cases du bord de la fenêtre."""
+        margin = min(margin, (self.size - 1) // 2)
+        dx = min(0, x - margin - self.x) + max(0, x + margin - (self.x + self.size - 1))
+        dy = min(0, y - margin - self.y) + max(0, y + margin - (self.y + self.size - 1))
+        return self.scroll(dx, dy)
+
+    def bounds(self):
+        """(x0, y0, x1, y1) : les cases visibles sont x0 <= x < x1 et y0 <= y < y1."""
+        return self.x, self.y, self.x + self.size, self.y + self.size
+
+    def contains(self, x, y):
+        return self.x <= x < self.x + self.size and self.y <= y < self.y + self.size
+
+    def point(self, x, y):
+        """Coin haut gauche de la case à l'écran, en pixels."""
+        return (x - self.x) * self.cell_size, (y - self.y) * self.cell_size
+
+    def center(self, x, y):
+        """Centre de la case à l'écran, en pixels."""
+        px, py = self.point(x, y)
+        return px + self.cell_size // 2, py + self.cell_size // 2
+
+    def rect(self, x, y):
+        return pygame.Rect(*self.point(x, y), self.cell_size, self.cell_size)
+
+    def cells_rect(self, positions):
+        """Rectangle écran englobant les cases données, coupé à la fenêtre, pour ne pousser que cette zone."""
+        rects = [self.rect(x, y) for x, y in positions]
+        if not rects:
+            return pygame.Rect(0, 0, 0, 0)
+        view = self.size * self.cell_size
+        return rects[0].unionall(rects[1:]).clip(0, 0, view, view)
+
+    def cell_at(self, px, py):
+        """Case de la carte sous un pixel de l'écran."""
+        return self.x + px // self.cell_size, self.y + py // self.cell_size
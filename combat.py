@@ -0,0 +1,166 @@
+"""
+Formule de combat partagée entre Unit.attack et un simulateur Monte Carlo vectorisé.
+Unit.attack 与向量化蒙特卡洛模拟器共用的战斗公式。
+
+Les fonctions de formule (hits, evades, is_critical, attack_damage, type_multiplier) acceptent
+des scalaires comme des tableaux NumPy : l'attaque en jeu les appelle avec un tirage à la fois,
+le simulateur avec des millions de tirages d'un coup, si bien que les deux ne peuvent pas diverger.
+
+Usage : python combat.py  (tableau des affrontements Pyro / Medic / Sniper / Scout)
+"""
+
+import numpy as np
+
+WEAKNESS_FACTOR = 1.5  # Dégâts contre une faiblesse
+RESISTANCE_FACTOR = 0.5  # Dégâts contre une résistance
+NO_DEFENSE_FACTOR = 1.2  # Bonus de dégâts contre une cible sans défense
+CRITICAL_FACTOR = 2  # Coup critique
+DEFAULT_ATTACKS = 1_000_000
+MAX_TURNS = 30  # Attaques simulées par séquence pour le nombre de tours avant la mort
+CHUNK = 50_000  # Séquences tirées à la fois (mémoire : 3 x CHUNK x MAX_TURNS flottants)
+
+
+def hits(roll, accuracy):
+    """L'attaque touche si le tirage uniforme [0, 1) ne dépasse pas la précision."""
+    return roll <= accuracy
+
+
+def evades(roll, evasion):
+    """La cible esquive si le tirage est sous son esquive."""
+    return roll < evasion
+
+
+def is_critical(roll, crit_chance):
+    return roll < crit_chance
+
+
+def attack_damage(attack_power, defense, critical):
+    """
+    Dégâts d'une attaque qui touche : attaque - défense (au moins 0), ou attaque x1.2 contre
+    une défense nulle, doublés sur un coup critique. Renvoie un tableau (0-d pour des scalaires).
+    """
+    damage = np.where(defense != 0, np.maximum(attack_power - defense, 0), attack_power * NO_DEFENSE_FACTOR)
+    return np.where(critical, damage * CRITICAL_FACTOR, damage)
+
+
+def type_multiplier(weak, resist):
+    """Multiplicateur de take_damage selon que la cible est faible et/ou résistante au type d'attaque."""
+    return np.where(weak, WEAKNESS_FACTOR, 1.0) * np.where(resist, RESISTANCE_FACTOR, 1.0)
+
+
+def unit_stats(unit, attack_type=None):
+    """
+    Statistiques d'une unité utiles au simulateur, sous forme de dict.
+
+    attack_type : str ou None
+        Type d'attaque subie (pour weak et resist) ; None pour l'attaque simple, qui les ignore.
+    """
+    return {
+        "attack_power": unit.attack_power,
+        "accuracy": unit.accuracy,
+        "crit_chance": unit.crit_chance,
+        "defense": unit.defense,
+        "evasion": unit.evasion,
+        "health": unit.health,
+        "weak": attack_type in unit.weakness,
+        "resist": attack_type in unit.resistance,
+    }
+
+
+def resolve_attacks(attacker, defender, rolls, attack_type=None):
+    """
+    Dégâts de chaque attaque pour des tirages donnés (0 si elle rate ou est esquivée).
+
+    Paramètres
+    ----------
+    attacker, defender : dict
+        Statistiques (voir unit_stats) : scalaires ou tableaux compatibles avec les tirages.
+    rolls : numpy.ndarray
+        Tirages uniformes [0, 1), de forme (3, ...) : précision, esquive, critique.
+    attack_type : str ou None
+        Si donné, les dégâts passent par la règle de take_damage (faiblesse, résistance, partie entière).
+    """
+    landed = hits(rolls[0], attacker["accuracy"]) & ~evades(rolls[1], defender["evasion"])
+    damage = attack_damage(attacker["attack_power"], defender["defense"], is_critical(rolls[2], attacker["crit_chance"]))
+    if attack_type is not None:
+        damage = np.maximum(0, np.trunc(damage * type_multiplier(defender["weak"], defender["resist"])))
+    return np.where(landed, damage, 0.0)
+
+
+def simulate(attacker, defender, attacks=DEFAULT_ATTACKS, max_turns=MAX_TURNS, attack_type=None, rng=None):
+    """
+    Simule attacks séquences de max_turns attaques de attacker contre defender (défense et PV de départ fixes).
+
+    Retourne un dict :
+        damage : (valeurs, probabilités) des dégâts d'une attaque
+        mean_damage : dégâts moyens par attaque
+        kill_probability : probabilité de tuer en une attaque depuis la santé de départ
+        kill_within : probabilité de tuer en max_turns attaques au plus
+        turns_to_kill : nombre moyen d'attaques pour tuer, parmi les séquences qui tuent (inf sinon)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    health = defender["health"]
+    values, counts = np.array([]), np.array([], dtype=np.int64)
+    kills = killed_within = turns_total = 0
+    done = 0
+    while done < attacks:
+        size = min(CHUNK, attacks - done)
+        damage = resolve_attacks(attacker, defender, rng.random((3, size, max_turns)), attack_type)
+
+        # Distribution d'une attaque : toutes les attaques sont indépendantes, chaque colonne en est un échantillon
+        chunk_values, chunk_counts = np.unique(damage[:, 0], return_counts=True)
+        values, inverse = np.unique(np.concatenate([values, chunk_values]), return_inverse=True)
+        merged = np.zeros(len(values), dtype=np.int64)
+        np.add.at(merged, inverse, np.concatenate([counts, chunk_counts]))
+        counts = merged
+        kills += int(np.count_nonzero(damage[:, 0] >= health))
+
+        # Première attaque où le cumul des dégâts atteint la santé
+        dead = np.cumsum(damage, axis=1) >= health
+        ended = dead.any(axis=1)
+        killed_within += int(np.count_nonzero(ended))
+        turns_total += int((dead[ended].argmax(axis=1) + 1).sum())
+        done += size
+
+    return {
+        "damage": (values, counts / attacks),
+        "mean_damage": float((values * counts).sum() / attacks),
+        "kill_probability": kills / attacks,
+        "kill_within": killed_within / attacks,
+        "turns_to_kill": turns_total / killed_within if killed_within else float("inf"),
+    }
+
+
+def matchups(attacks=DEFAULT_ATTACKS, max_turns=MAX_TURNS, attack_type=None, seed=None):
+    """
+    Simule toutes les paires attaquant / défenseur des quatre rôles, avec leurs statistiques de départ.
+
+    Retourne un dict {(nom de l'attaquant, nom du défenseur): résultat de simulate}.
+    """
+    from game import Game  # Import tardif : game importe unit, qui importe ce module
+
+    rng = np.random.default_rng(seed)
+    units = Game(None).player_units  # Une unité de chaque rôle, sans affichage
+    stats = {unit.__class__.__name__: unit_stats(unit, attack_type) for unit in units}
+    return {
+        (attacker, defender): simulate(stats[attacker], stats[defender], attacks, max_turns, attack_type, rng)
+        for attacker in stats
+        for defender in stats
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    import journal
+
+    start = time.perf_counter()
+    with journal.silenced():
+        table = matchups()
+    elapsed = time.perf_counter() - start
+    print(f"{'Attaquant':<8} {'Défenseur':<9} {'Dégâts moy.':>11} {'Tue (1 att.)':>12} "
+          f"{'Tue (' + str(MAX_TURNS) + ' att.)':>13} {'Attaques pour tuer':>18}")
+    for (attacker, defender), result in table.items():
+        print(f"{attacker:<8} {defender:<9} {result['mean_damage']:>11.3f} {result['kill_probability']:>12.2%} "
+              f"{result['kill_within']:>13.2%} {result['turns_to_kill']:>18.2f}")
+    print(f"{len(table)} affrontements x {DEFAULT_ATTACKS:,} séquences de {MAX_TURNS} attaques en {elapsed:.1f} s")
@@ -1,8 +1,33 @@
 import pygame
-import random
+import time
+import struct
+from collections import Counter
+import numpy as np
 
 from unit import *
 from bonus import AttackBoost, DefenseBoost
+from terrain import TerrainGrid, LAVA, WALL
+from render import Renderer
+from inputloop import InputLoop
+from occupancy import OccupancyGrid
+from pathfinding import PathFinder
+from vision import VisionMap
+from camera import Camera
+from unitstore import UnitStore
+from planner import Planner
+from rng import RandomStreams
+import snapshot
+import mapgen
+from replay import Recorder, REACT, DEFENSE, HEALTH, RESET, TURN, PLAN, encode_step
+from planner import ABILITIES
+from assets import assets
+from animation import Timeline, SPEEDS
+from particles import ParticlePool, emit_fire, emit_hearts, emit_explosion
+from journal import movement_log, combat_log, ai_log, map_log, ui_log
+
+ENEMY_AIS = ("Greedy", "Weakest", "MCTS")  # IA ennemies proposées dans les paramètres
+SCROLL_KEYS = {pygame.K_w: (0, -1), pygame.K_s: (0, 1), pygame.K_a: (-1, 0), pygame.K_d: (1, 0)}  # Défilement de la caméra
+QUICKSAVE_FILE = "quicksave.snap"  # Sauvegarde rapide (F5) et chargement rapide (F9), voir snapshot.py
 
 
 
@@ -25,160 +50,300 @@ class Game:
     enemy_units : list[Unit]
         La liste des unités de l'adversaire.
         敌方单位的列表。
+    unit_store : UnitStore
+        Les statistiques de toutes les unités, en colonnes NumPy (requêtes d'équipe vectorisées).
+        所有单位的数值属性，以 NumPy 列存储（向量化的队伍查询）。
+    headless : bool
+        Vrai si le jeu tourne sans fenêtre (simulation) : seules les règles sont exécutées.
+        无显示模式：只执行规则，不绘制也不等待。
+    winner : str ou None
+        L'équipe gagnante ('player' ou 'enemy') une fois la partie terminée.
+        获胜的队伍。
+    rng : RandomStreams
+        Les générateurs seedés de la partie (carte, combat, cosmétique).
+        对局的带种子随机数生成器（地图、战斗、外观）。
+    enemy_ai : str
+        IA des ennemis (ENEMY_AIS) : "Greedy" (cible la plus proche, chemin A*), "Weakest"
+        (joueur le plus faible, chemin A*) ou "MCTS" (planner.py).
+        敌方 AI："Greedy"（最近目标）、"Weakest"（最弱目标）或 "MCTS"（蒙特卡洛树搜索）。
+    counters : collections.Counter
+        Événements de la partie par équipe, ex. counters["bonus", "player"], counters["bomb", "enemy"].
+        按队伍统计的对局事件（拾取奖励、触发炸弹）。
+    grid_size : int
+        Côté de la carte en cases (GRID_SIZE par défaut, 256 et plus pour les grandes cartes).
+        地图边长（格），默认 GRID_SIZE。
+    camera : Camera
+        La partie visible de la carte ; le dessin et les clics passent par elle.
+        地图的可见部分；绘制和点击都经由它换算。
     """
 
-    def __init__(self, screen):
+    def __init__(self, screen=None, seed=None, grid_size=GRID_SIZE):
         """
         Construit le jeu avec la surface de la fenêtre.
         构建游戏实例并传入窗口绘制表面。
 
         Paramètres
         ----------
-        screen : pygame.Surface
-            La surface de la fenêtre du jeu.
-            游戏的窗口绘制表面。
+        screen : pygame.Surface ou None
+            La surface de la fenêtre du jeu. Avec None, le jeu est headless :
+            aucune image n'est chargée, aucune animation ni pause n'est jouée.
+            游戏的窗口绘制表面。为 None 时为无显示模式。
+        seed : int ou None
+            Graine de la partie (carte, combat, effets) ; tirée au hasard si None.
+            对局种子；为 None 时随机选取。
+        grid_size : int
+            Côté de la carte en cases ; au-delà de VIEW_SIZE, la fenêtre suit une caméra.
+            地图边长（格）；超过 VIEW_SIZE 时窗口由摄像机滚动显示。
         """
+        self.screen = screen
+        self.grid_size = grid_size
+        # Partie visible de la carte : tout le dessin passe par la caméra (cases -> pixels)
+        self.camera = Camera(grid_size, VIEW_SIZE, CELL_SIZE)
+        self.recorder = None  # Enregistrement du replay en cours (replay.Recorder), s'il y en a un
+        # Présentation par rectangles modifiés (renderer.dirty_rects = False : display.flip complet)
+        self.renderer = None if screen is None else Renderer(screen)
+        # Entrées attendues dans pygame.event.wait : les écrans en attente d'un clic ne tournent plus à vide
+        self.input = None if screen is None else InputLoop()
+        self.frame_state = {}  # Ce qui a été dessiné à la dernière image, pour trouver les zones abîmées
+        # Vision de l'équipe, mise à jour seulement quand une unité bouge ou meurt
+        self.vision = VisionMap(self.grid_size)
+        self.frame_vision = np.zeros((self.camera.size, self.camera.size), dtype=bool)  # Brouillard de la fenêtre
+        self.frame_camera = -1  # Version de la caméra à la dernière image
+        self.fog_surface = None
+        self.fog_version = -1
+        # Effets visuels joués image par image par la boucle principale, sans bloquer les entrées
+        self.timeline = Timeline(FPS)
+        self.particles = ParticlePool()  # Feu, cœurs et explosions
+        self.launch_time = None  # Instant du lancement (main), pour mesurer le démarrage à froid
+
         #ajout des zones des coeur pour augmenter santer 
+        self.health_image = self.load_scaled_image("pic/heart.png")  # Image du cœur
+        #ajout des zones des bombes contre les enmis 
+        self.bomb_image = self.load_scaled_image("pic/16_bit_bomb2.png")  # Image de la bombe
+
+        self.terrain_images = {
+            "grass": [self.load_scaled_image(f"pic/prairie_{i}.png") for i in range(1, 2)],  # 假设有两张草地图片
+            "road": self.load_scaled_image("pic/rue1.png"),
+            "water": [self.load_scaled_image(f"pic/eau_{i}.png") for i in range(1, 3)],
+            "lava": self.load_scaled_image("pic/magma.png"),
+            "tree": self.load_scaled_image("pic/Arbre.png"),
+            "wall": self.load_scaled_image("pic/mur.png") ,  # Nouveau type de terrain : mur
+
+         }
+        # Grille compacte : codes uint8 + variantes d'image (terrain[x][y] reste utilisable)
+        self.terrain = TerrainGrid(self.grid_size, None if self.headless else self.terrain_images)
+        self.terrain_layer = None  # Fond du terrain pré-composé (voir update_terrain_layer)
+        self.terrain_origin = (0, 0)  # Case de la carte en haut à gauche du fond en cache
+        # Index des unités par case, tenu à jour par les déplacements et les morts
+        self.occupancy = OccupancyGrid(self.grid_size)
+        # Chemins A* des ennemis, en cache tant que ni la carte ni l'ennemi ni sa cible n'ont bougé
+        self.pathfinder = PathFinder(self.terrain, self.occupancy)
+
+        self.selected_mode = "One Player"
+        self.selected_unit = "Pyro"
+        # IA ennemie : MCTS se choisit dans les paramètres ; elle lance un pool de processus
+        # et réfléchit PLAN_BUDGET secondes par tour, trop pour un défaut (et pour les simulations headless)
+        self.enemy_ai = "Greedy"
+        self.planner = None  # Créé au premier tour MCTS (avec son pool de processus)
+        self.new_game(seed)
+
+    def new_game(self, seed=None):
+        """
+        Tire une nouvelle partie (carte, unités, bonus, zones de soin et bombes) sans rien recharger :
+        images, grilles, pools de particules et de processus, fenêtre et réglages sont réutilisés.
+        新开一局（地图、单位、奖励、回血区和炸弹），复用已加载的图片、网格、粒子池、进程池和设置。
+        """
+        # Flux aléatoires seedés : carte, combat et cosmétique (rng.py)
+        self.rng = RandomStreams(seed)
+        self.particles.rng = self.rng.particles
+        self.particles.clear()
+        self.timeline.clear()
+        self.winner = None
+        self.frame_state = {}  # Tout est à redessiner
+        self.camera.move_to(0, 0)  # Les joueurs apparaissent en haut à gauche
+
         self.health_zones = []  # Liste des positions des zones de santé
-        self.health_image = pygame.image.load("pic/heart.png")  # Image du cœur
-        self.health_image = pygame.transform.scale(self.health_image, (CELL_SIZE, CELL_SIZE))
         self.generate_health_zones()  # Générer les zones de santé
-        
-
-        #ajout des zones des bombes contre les enmis 
         self.bomb_zones = []  # Liste des positions des bombes
-        self.bomb_image = pygame.image.load("pic/16_bit_bomb2.png")  # Image de la bombe
-        self.bomb_image = pygame.transform.scale(self.bomb_image, (CELL_SIZE, CELL_SIZE))
         self.generate_bomb_zones()  # Générer les positions des bombes
 
+        # État numérique de toutes les unités, en colonnes (les unités n'en sont que des vues)
+        self.unit_store = UnitStore(rng=self.rng.combat)
 
-        #己方随机3*3生成
-        self.screen = screen
-        self.player_units = [Pyro(random.randint(0,2), random.randint(0,2), 'player'),
-                             Medic(random.randint(0,2), random.randint(0,2), 'player'),
-                             Scout(random.randint(0,2), random.randint(0,2), 'player'),
-                             Sniper(random.randint(0,2), random.randint(0,2), 'player')]
+        #己方随机3*3生成 (cases distinctes : une seule unité par case)
+        spawn = self.spawn_positions(0, 0)
+        self.player_units = [Pyro(*spawn[0], 'player', self),
+                             Medic(*spawn[1], 'player', self),
+                             Scout(*spawn[2], 'player', self),
+                             Sniper(*spawn[3], 'player', self)]
 
         # 动态计算敌方单位的生成位置，并添加随机性
         # Généré aléatoirement dans la zone 3x3 en bas à droite
-        self.enemy_units = [Pyro(random.randint(GRID_SIZE - 3, GRID_SIZE - 1), random.randint(GRID_SIZE - 3, GRID_SIZE - 1),'enemy'),
-                            Medic(random.randint(GRID_SIZE - 3, GRID_SIZE - 1), random.randint(GRID_SIZE - 3, GRID_SIZE - 1), 'enemy'),
-                            Scout(random.randint(GRID_SIZE - 3, GRID_SIZE - 1), random.randint(GRID_SIZE - 3, GRID_SIZE - 1), 'enemy'),
-                            Sniper(random.randint(GRID_SIZE - 3, GRID_SIZE - 1), random.randint(GRID_SIZE - 3, GRID_SIZE - 1), 'enemy')]
-        
-        self.terrain = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        
-        self.terrain_images = {
-            "grass": [pygame.transform.scale(pygame.image.load(f"pic/prairie_{i}.png"), (CELL_SIZE, CELL_SIZE)) for i in range(1, 2)],  # 假设有两张草地图片
-            "road": pygame.transform.scale(pygame.image.load("pic/rue1.png"), (CELL_SIZE, CELL_SIZE)),
-            "water": [pygame.transform.scale(pygame.image.load(f"pic/eau_{i}.png"), (CELL_SIZE, CELL_SIZE)) for i in range(1, 3)],
-            "lava": pygame.transform.scale(pygame.image.load("pic/magma.png"), (CELL_SIZE, CELL_SIZE)),
-            "tree": pygame.transform.scale(pygame.image.load("pic/Arbre.png"), (CELL_SIZE, CELL_SIZE)),
-            "wall": pygame.transform.scale(pygame.image.load("pic/mur.png"), (CELL_SIZE, CELL_SIZE)) ,  # Nouveau type de terrain : mur
+        spawn = self.spawn_positions(self.grid_size - 3, self.grid_size - 3)
+        self.enemy_units = [Pyro(*spawn[0], 'enemy', self),
+                            Medic(*spawn[1], 'enemy', self),
+                            Scout(*spawn[2], 'enemy', self),
+                            Sniper(*spawn[3], 'enemy', self)]
+        self.occupancy.rebuild(self.player_units + self.enemy_units)
 
-         }
         self.bonus_items = []  # Liste pour stocker les bonus
-        
         self.generate_bonus_items()  # Générer les bonus dès l'initialisation
 
-        
-        self.selected_mode = "One Player"
-        self.selected_unit = "Pyro"
         self.active_unit = None
+        self.counters = Counter()  # Bonus ramassés et bombes déclenchées, par équipe
         self.generate_map()
+        self.terrain.full_redraw = True  # Le fond en cache est redessiné en entier, sur la même surface
+        self.terrain.dirty_cells = set()
+        self.pathfinder.clear()
+
+    @property
+    def headless(self):
+        """Vrai si le jeu n'a pas de fenêtre : les règles tournent sans affichage ni pause."""
+        return self.screen is None
+
+    def spawn_positions(self, x0, y0, count=4):
+        """Tire count cases distinctes dans la zone 3x3 qui commence en (x0, y0)."""
+        cells = [(x0 + dx, y0 + dy) for dx in range(3) for dy in range(3)]
+        return self.rng.map.sample(cells, count)
+
+    def remove_unit(self, unit):
+        """Retire une unité de son équipe et de l'index des cases."""
+        units = self.player_units if unit.team == "player" else self.enemy_units
+        if unit in units:
+            units.remove(unit)
+        self.unit_store.remove(unit)
+        self.occupancy.remove(unit)
+        self.pathfinder.forget(unit)
+
+    def record(self, kind, unit=None, a=0, b=0):
+        """Ajoute une commande au replay en cours ; seules les unités du joueur sont enregistrées (l'IA ennemie est rejouée)."""
+        if self.recorder is not None and (unit is None or unit.team == "player"):
+            self.recorder.command(kind, 0 if unit is None else unit.index, a, b)
+
+    def start_recording(self, path):
+        """Commence à enregistrer la partie (graine, réglages et commandes) dans un fichier replay."""
+        self.stop_recording()
+        self.recorder = Recorder(self, path)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def quick_save(self, path=QUICKSAVE_FILE):
+        """Écrit un snapshot binaire de la partie (snapshot.py)."""
+        snapshot.save(self, path)
+        ui_log.info("Partie sauvegardée dans %s.", path)
+
+    def quick_load(self, path=QUICKSAVE_FILE):
+        """Recharge un snapshot ; vrai si la partie a été remplacée."""
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            ui_log.info("Aucune sauvegarde rapide (%s).", path)
+            return False
+        self.finish_animations()  # Les animations en cours visent les unités remplacées
+        # Un fichier tronqué ou corrompu peut échouer après avoir remplacé une partie de l'état : on le remet
+        backup, streams = snapshot.dumps(self), self.rng.dumps()
+        try:
+            snapshot.loads(self, data)
+        except (ValueError, IndexError, struct.error) as error:
+            snapshot.loads(self, backup)
+            self.rng.loads(streams)
+            ui_log.warning("Sauvegarde rapide illisible (%s) : %s", path, error)
+            return False
+        self.stop_recording()  # Le replay ne correspondrait plus à sa graine
+        ui_log.info("Partie chargée depuis %s.", path)
+        return True
+
+    def present(self, rects=None):
+        """Pousse à l'écran les zones dessinées (tout l'écran si rects vaut None)."""
+        if self.renderer:
+            self.renderer.present(rects)
+            self.input.presented()
+
+    def tick(self, overlay=None):
+        """
+        Avance d'une image : l'horloge limite la boucle à FPS et, si des animations sont en cours,
+        l'écran est redessiné puis chaque animation dessine son image courante.
 
-    
+        Paramètres
+        ----------
+        overlay : callable ou None
+            Dessin à refaire par-dessus chaque image (portée de déplacement par exemple), qui renvoie son rectangle.
+        """
+        if self.headless:
+            return
+        dt = self.timeline.tick()
+        if not self.animating:
+            return
+        self.timeline.advance(dt)
+        self.particles.update(dt * self.timeline.speed)
+        self.flip_display()  # Efface aussi l'image précédente des animations
+        rects = self.timeline.draw(self.screen) + self.particles.draw(self.screen)
+        if overlay:
+            rects.append(overlay())
+        self.present(rects)
+
+    @property
+    def animating(self):
+        """Vrai si des animations ou des particules sont en cours."""
+        return self.timeline.active or self.particles.active
+
+    def play_particles(self, preset, *args):
+        """Lance un préréglage de particules (emit_fire, emit_hearts...), sauf sans affichage ou animations désactivées."""
+        if self.headless or self.timeline.skip:
+            return
+        preset(self.particles, *args)
 
-    def generate_map(self):
-        # 草地prairie
-        for x in range(GRID_SIZE):
-            for y in range(GRID_SIZE):
-                # 检查是否是单位生成区域
-                if (0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE):
-                    # 单位生成区域强制为草地
-                    self.terrain[x][y] = {"type": "grass", "image": random.choice(self.terrain_images["grass"])}
-                else:
-                    # 其他区域默认也生成草地
-                    self.terrain[x][y] = {"type": "grass", "image": random.choice(self.terrain_images["grass"])}
-
-        # 道路rue
-        for _ in range(2):  # 道路数量
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            for _ in range(12):  # 道路长度
-                if not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
-                    self.terrain[x][y] = {"type": "road", "image": self.terrain_images["road"]}
-                x += random.choice([-1, 0, 1])
-                y += random.choice([-1, 0, 1])
-                x = max(0, min(GRID_SIZE - 1, x))
-                y = max(0, min(GRID_SIZE - 1, y))
-
-        # 水eau
-        for _ in range(3):  # 水域数量 # Nombre de zones d'eau
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            for _ in range(12):  # 水域长度 longueur de chaque zone d'eau
-                if not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
-                    self.terrain[x][y] = {"type": "water", "image": random.choice(self.terrain_images["water"])}
-                x += random.choice([-1, 0, 1])
-                y += random.choice([-1, 0, 1])
-                x = max(0, min(GRID_SIZE - 1, x))
-                y = max(0, min(GRID_SIZE - 1, y))
-
-        # 岩浆magma
-        for _ in range(4):  # 每组岩浆生成4组区域
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            cluster_size = random.randint(2, 3)  # 每组岩浆大小为2到3块
-            for _ in range(cluster_size):
-                if not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
-                    self.terrain[x][y] = {"type": "lava", "image": self.terrain_images["lava"]}
-                x += random.choice([-1, 0, 1])
-                y += random.choice([-1, 0, 1])
-                x = max(0, min(GRID_SIZE - 1, x))
-                y = max(0, min(GRID_SIZE - 1, y))
-
-
-        # 树Arbre
-        for _ in range(8):  # 随机树
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            if self.terrain[x][y]["type"] == "grass" and not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
-                self.terrain[x][y] = {"type": "tree", "image": self.terrain_images["tree"]}
-        
+    def finish_animations(self):
+        """Joue jusqu'au bout les animations en cours (avant un message de fin par exemple)."""
+        while self.animating and not self.headless:
+            pygame.event.pump()
+            self.tick()
 
-         # Génération des murs
-        for _ in range(5):  # Crée 5 clusters de murs
-           x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-           cluster_size = random.randint(3, 6)  # Chaque cluster contient 3 à 6 murs
-           for _ in range(cluster_size):
-              # Vérifie que les murs ne sont pas dans les zones de génération des unités
-            if not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
-                self.terrain[x][y] = {"type": "wall", "image": self.terrain_images["wall"]}
-            # Déplace le cluster légèrement
-            x += random.choice([-1, 0, 1])
-            y += random.choice([-1, 0, 1])
-            x = max(0, min(GRID_SIZE - 1, x))  # Garde x dans les limites de la grille
-            y = max(0, min(GRID_SIZE - 1, y))  # Garde y dans les limites de la 
-            
+    def load_scaled_image(self, path):
+        """Charge une image à la taille d'une case, ou None en mode headless."""
+        if self.headless:
+            return None
+        return assets.image(path, (CELL_SIZE, CELL_SIZE))
+
+    def generate_map(self):
+        """
+        Tire la carte avec mapgen (seedée, par blocs, vectorisée) : les zones d'apparition 3x3 restent en herbe
+        et se rejoignent pour chaque classe et chaque équipe. La lave compte comme bloquante : les ennemis
+        ne la traversent pas (A*) et elle blesse les joueurs.
+        """
+        rules = {unit_class.blocked_terrain(team) + ("lava",)
+                 for unit_class in (Pyro, Medic, Scout, Sniper) for team in ("player", "enemy")}
+        variant_counts = {name: len(self.terrain_images[name]) for name in ("grass", "water")}
+        types, variants = mapgen.generate(self.grid_size, self.rng.map.getrandbits(64), variant_counts, sorted(rules))
+        self.terrain.replace(types, variants)
 
     def generate_bonus_items(self):
         """Créer des objets bonus spécifiques sur le terrain."""
         for _ in range(3):  # Générer 3 bonus d'attaque
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            bonus = AttackBoost(x, y)  # Instancie la sous-classe AttackBoost
+            x, y = self.rng.map.randint(0, self.grid_size - 1), self.rng.map.randint(0, self.grid_size - 1)
+            bonus = AttackBoost(x, y, self.headless)  # Instancie la sous-classe AttackBoost
             self.bonus_items.append(bonus)
-            print(f"Bonus d'attaque généré à la position ({bonus.x}, {bonus.y})")
+            map_log.debug("Bonus d'attaque généré à la position (%s, %s)", bonus.x, bonus.y)
 
         for _ in range(4):  # Générer 4 bonus de défense
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            bonus = DefenseBoost(x, y)  # Instancie la sous-classe DefenseBoost
+            x, y = self.rng.map.randint(0, self.grid_size - 1), self.rng.map.randint(0, self.grid_size - 1)
+            bonus = DefenseBoost(x, y, self.headless)  # Instancie la sous-classe DefenseBoost
             self.bonus_items.append(bonus)
-            print(f"Bonus de défense généré à la position ({bonus.x}, {bonus.y})")
+            map_log.debug("Bonus de défense généré à la position (%s, %s)", bonus.x, bonus.y)
 
     #ramasser les bonus 
     def handle_bonus_items(self, unit):
         """Gérer les objets ramassés par une unité."""
+        position = unit.position
         for item in self.bonus_items[:]:  # Crée une copie pour éviter les erreurs lors de la suppression
-            if (unit.x, unit.y) == (item.x, item.y):  # Vérifiez si l'unité est sur le bonus
+            if position == (item.x, item.y):  # Vérifiez si l'unité est sur le bonus
                 item.apply_bonus(unit)  # Appelle la méthode polymorphique de la sous-classe
-                print(f"{unit.__class__.__name__} a ramassé un {item.__class__.__name__} !")
+                self.counters["bonus", unit.team] += 1
+                map_log.info("%s a ramassé un %s !", unit.__class__.__name__, item.__class__.__name__)
                 
                 # Ajouter un feedback visuel (optionnel)
                 self.display_bonus_effect(item, f"Bonus appliqué !")
@@ -189,12 +354,12 @@ class Game:
 
     def display_bonus_effect(self, item, message):
         """Afficher un effet visuel temporaire pour un bonus."""
-        font = pygame.font.Font(None, 36)
-        text = font.render(message, True, (0, 255, 0))  # Texte vert
-        text_rect = text.get_rect(center=(item.x * CELL_SIZE + CELL_SIZE // 2, item.y * CELL_SIZE + CELL_SIZE // 2))
-        self.screen.blit(text, text_rect)
-        pygame.display.flip()
-        pygame.time.delay(500)  # Affiche pendant 500ms
+        if self.headless:
+            return
+        font = assets.font(None, 36)
+        text = assets.render(font, message, True, (0, 255, 0))  # Texte vert
+        text_rect = text.get_rect(center=self.camera.center(item.x, item.y))
+        self.timeline.play(1, 500, lambda screen, frame: screen.blit(text, text_rect))  # Affiche pendant 500ms
 
     
    
@@ -207,16 +372,17 @@ class Game:
     def generate_health_zones(self):
         """Générer des zones de santé aléatoires sur la carte."""
         for _ in range(3):  # Ajouter 3 zones de santé
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
+            x, y = self.rng.map.randint(0, self.grid_size - 1), self.rng.map.randint(0, self.grid_size - 1)
             self.health_zones.append((x, y))
 
     #Lorsqu'une unité entre dans une zone de santé et l'utilise, la position est supprimée de
     def handle_health_zones(self, unit):
         """Soigner une unité si elle entre dans une zone de santé et supprimer la zone après utilisation."""
-        if (unit.x, unit.y) in self.health_zones:
+        self.record(HEALTH, unit)  # Fin de l'action de l'unité (les deux boucles de tour l'appellent ici)
+        if unit.position in self.health_zones:
             unit.health = min(20, unit.health + 5)  # Augmenter la santé jusqu'à un maximum de 20
             self.trigger_healing_animation(unit)  # Déclencher l'animation de guérison
-            print(f"{unit.__class__.__name__} a récupéré de la santé ! Santé actuelle : {unit.health}")
+            map_log.info("%s a récupéré de la santé ! Santé actuelle : %s", unit.__class__.__name__, unit.health)
             self.health_zones.remove((unit.x, unit.y))  # Supprimer la zone de santé utilisée
 
     
@@ -225,68 +391,43 @@ class Game:
         """
         Afficher une animation de guérison où des cœurs flottent vers le haut.
         """
-        heart_image = pygame.image.load("pic/heart_frame1.png").convert_alpha()  # Charger l'image du cœur
-        heart_image = pygame.transform.scale(heart_image, (20, 20))  # Redimensionner le cœur si nécessaire
-
-        floating_hearts = []  # Liste des cœurs flottants
-        for _ in range(8):  # Créer 8 cœurs flottants
-            floating_hearts.append({
-                "x": unit.x * CELL_SIZE + random.randint(-10, 30),  # Position horizontale initiale
-                "y": unit.y * CELL_SIZE + random.randint(-10, 10),  # Position verticale initiale
-                "speed": random.randint(-2, -1)  # Vitesse verticale (négative pour monter)
-            })
-
-        for frame in range(30):  # Animation sur 30 frames (environ 1,5 seconde)
-            self.flip_display()  # Rafraîchir l'écran pour éviter des artefacts visuels
-
-            for heart in floating_hearts:
-                heart["y"] += heart["speed"]  # Faire flotter le cœur vers le haut
-                self.screen.blit(heart_image, (heart["x"], heart["y"]))  # Afficher le cœur à sa nouvelle position
-
-            pygame.display.flip()  # Mettre à jour l'écran
-            pygame.time.delay(50)  # Pause de 50 ms entre les frames
+        if self.headless:
+            return
+        heart_image = assets.image("pic/heart_frame1.png", (20, 20))  # Cœur décodé une seule fois, partagé entre les soins
+        # 8 cœurs qui flottent vers le haut pendant environ 1 seconde
+        self.play_particles(emit_hearts, self.camera.cells_rect([(unit.x, unit.y)]), heart_image)
 
 
 
     def generate_bomb_zones(self):
         """Générer des bombes aléatoires sur le terrain."""
         for _ in range(3):  # Ajouter 3 bombes
-            x, y = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
+            x, y = self.rng.map.randint(0, self.grid_size - 1), self.rng.map.randint(0, self.grid_size - 1)
             # Vérifie que la bombe n'est pas placée dans une zone interdite
-            if not ((0 <= x < 3 and 0 <= y < 3) or (GRID_SIZE - 3 <= x < GRID_SIZE and GRID_SIZE - 3 <= y < GRID_SIZE)):
+            if not ((0 <= x < 3 and 0 <= y < 3) or (self.grid_size - 3 <= x < self.grid_size and self.grid_size - 3 <= y < self.grid_size)):
                 self.bomb_zones.append((x, y))
     #méthode pour gérer l'effet des bombes lorsqu'un ennemi entre dans une zone.
    
     def handle_bomb_zones(self, unit):
         """Réduire la santé de l'unité et la tuer si elle entre dans une zone de bombe."""
-        if (unit.x, unit.y) in self.bomb_zones:
-            print(f"{unit.__class__.__name__} a déclenché une bombe à ({unit.x}, {unit.y}) !")
+        position = unit.position
+        if position in self.bomb_zones:
+            map_log.info("%s a déclenché une bombe à (%s, %s) !", unit.__class__.__name__, *position)
             self.trigger_explosion_animation(unit)  # Déclencher une animation d'explosion
-            self.bomb_zones.remove((unit.x, unit.y))  # Supprimer la bombe utilisée
+            self.bomb_zones.remove(position)  # Supprimer la bombe utilisée
+            self.counters["bomb", unit.team] += 1
             if unit in self.enemy_units:  # Supprimer l'unité ennemie si elle est dans la liste
-                self.enemy_units.remove(unit)
-            print(f"{unit.__class__.__name__} est mort suite à l'explosion.")
+                self.remove_unit(unit)
+            combat_log.info("%s est mort suite à l'explosion.", unit.__class__.__name__)
 
 
     #méthode pour afficher une animation lorsqu'une bombe explose :
     def trigger_explosion_animation(self, unit):
         """Afficher une animation de grosse explosion et tuer l'ennemi."""
-        explosion_colors = [(255, 255, 0), (255, 165, 0), (255, 0, 0)]  # Jaune, orange, rouge
-        for i in range(10):  # L'animation dure 10 frames
-            for color in explosion_colors:
-                # Dessiner un cercle de plus en plus grand
-                surface = pygame.Surface((CELL_SIZE * 3, CELL_SIZE * 3), pygame.SRCALPHA)  # Cercle plus grand
-                pygame.draw.circle(
-                    surface, 
-                    (*color, 200 - i * 20),  # Couleur avec transparence décroissante
-                    (CELL_SIZE * 3 // 2, CELL_SIZE * 3 // 2), 
-                    CELL_SIZE // 2 + i * 5  # Rayon croissant
-                )
-                self.screen.blit(surface, ((unit.x - 1) * CELL_SIZE, (unit.y - 1) * CELL_SIZE))  # Centrer sur l'ennemi
-                pygame.display.flip()
-                pygame.time.delay(50)  # Pause entre chaque frame
-
-
+        if self.headless:
+            return
+        # Éclats jaunes, orange et rouges projetés autour de l'ennemi
+        self.play_particles(emit_explosion, self.camera.center(unit.x, unit.y))
 
     def display_skill_menu(self, selected_unit, position):
         """显示技能菜单"""
@@ -296,16 +437,15 @@ class Game:
         menu_surface.fill((200, 200, 200))  # 菜单背景颜色
 
         # 菜单项
-        font = pygame.font.Font(None, 24)
+        font = assets.font(None, 24)
         skills = ["attaque unique", "attaque de groupe", "défense"]
         for i, skill in enumerate(skills):
-            text_surface = font.render(skill, True, (0, 0, 0))
+            text_surface = assets.render(font, skill, True, (0, 0, 0))
             menu_surface.blit(text_surface, (10, 10 + i * item_height))  # 每项技能的垂直间隔为30像素
 
         # 获取鼠标位置并绘制菜单
         x, y = position
-        self.screen.blit(menu_surface, (x, y))
-        pygame.display.flip()
+        self.present(self.screen.blit(menu_surface, (x, y)))
 
 
     def detect_skill_click(self, click_pos, menu_pos):
@@ -334,7 +474,7 @@ class Game:
         self.display_skill_menu(selected_unit, menu_pos)  # 显示技能菜单
 
         while running:
-            for event in pygame.event.get():
+            for event in self.input.events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     exit()
@@ -363,6 +503,7 @@ class Game:
                         elif isinstance(selected_unit, Scout):
                             selected_unit.handle_group_attack(self)
                     elif skill_index == 2:  # 防御
+                        self.record(DEFENSE, selected_unit)
                         if isinstance(selected_unit, Pyro):
                             selected_unit.handle_defense(selected_unit)
                         elif isinstance(selected_unit, Medic):
@@ -377,70 +518,83 @@ class Game:
 
     def draw_skill_range(self, positions):
         """绘制技能范围"""
+        if self.headless:
+            return
         surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         for x, y in positions:
-            if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(surface, (255, 255, 0, 100), rect)  # 半透明黄色
+            if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+                pygame.draw.rect(surface, (255, 255, 0, 100), self.camera.rect(x, y))  # 半透明黄色
         self.screen.blit(surface, (0, 0))
-        pygame.display.flip()
+        self.present(self.camera.cells_rect(positions))
 
     def draw_skill_effect(self, positions):
         """绘制技能效果"""
+        if self.headless:
+            return
         surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         for x, y in positions:
-            if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(surface, (255, 0, 0, 150), rect)  # 半透明红色
-        self.screen.blit(surface, (0, 0))
-        pygame.display.flip()
-        pygame.time.delay(500)  # 延迟以显示技能效果
+            if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+                pygame.draw.rect(surface, (255, 0, 0, 150), self.camera.rect(x, y))  # 半透明红色
+        area = self.camera.cells_rect(positions)
+        self.timeline.play(1, 500, lambda screen, frame: screen.blit(surface, area, area))  # 延迟以显示技能效果
 
     def get_combined_vision(self):
         """合并己方所有单位的视野范围"""
-        combined_vision = set()
-        for unit in self.player_units:
-            if unit.health > 0:  # 仅健康单位提供视野
-                combined_vision.update(unit.get_vision())
-        return combined_vision
+        # Seules les unités qui ont bougé ou sont mortes depuis l'appel précédent sont recalculées ;
+        # (x, y) in vision est en temps constant
+        return self.vision.sync(self.player_units)
 
 
     def draw_fog_of_war(self, combined_vision):
         """绘制战争迷雾"""
-        fog_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        fog_surface.fill((0, 0, 0, 150))  # 半透明黑色覆盖全屏
+        # Le voile n'est reconstruit que si la vision a changé ou si la caméra a bougé
+        version = (combined_vision.version, self.camera.version)
+        if self.fog_surface is None or self.fog_version != version:
+            if self.fog_surface is None:
+                self.fog_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            self.fog_surface.fill((0, 0, 0, 150))  # 半透明黑色覆盖全屏
 
-        # 清除视野内的迷雾
-        for x, y in combined_vision:
-            rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(fog_surface, (0, 0, 0, 0), rect)  # 清除迷雾
+            # 清除视野内的迷雾 (cases vues dans la fenêtre seulement)
+            x0, y0, x1, y1 = self.camera.bounds()
+            for x, y in np.argwhere(combined_vision.visible[x0:x1, y0:y1]):
+                pygame.draw.rect(self.fog_surface, (0, 0, 0, 0), self.camera.rect(x0 + x, y0 + y))  # 清除迷雾
+            self.fog_version = version
 
-        self.screen.blit(fog_surface, (0, 0))
+        self.screen.blit(self.fog_surface, (0, 0))
 
 
 
     def reset_actions(self):
         """Réinitialiser le nombre d'actions pour chaque unité au début du tour."""
-        for unit in self.player_units + self.enemy_units:
-            if unit.health > 0:  # Ne réinitialiser que pour les unités vivantes
-                unit.actions_left = 1
-
+        self.record(RESET)
+        self.unit_store.reset_actions(1)  # Seulement les unités vivantes
 
     def handle_player_turn(self):
         """Gérer le tour du joueur avec les flèches pour bouger, espace pour changer d'unité (mode Group uniquement)."""
-        current_unit_index = 0  # Index de l'unité actuellement contrôlée
+        # Un chargement rapide (F9) relance le tour sur la partie chargée : une boucle et non une récursion,
+        # pour que des rechargements répétés ne fassent pas grandir la pile
+        while True:
+            # Si le mode est "One Player", l'unité active est fixée
+            if self.selected_mode == "One Player":
+                units_to_control = [self.active_unit] if self.active_unit else []
+            else:
+                # Mode "Group", gérer toutes les unités des joueurs
+                units_to_control = [unit for unit in self.player_units if unit.health > 0]
+
+            # Vérification : s'assurer qu'il y a des unités à contrôler
+            if not units_to_control:
+                movement_log.info("Aucune unité à contrôler.")
+                return
+            if not self.play_player_units(units_to_control):
+                break
 
-        # Si le mode est "One Player", l'unité active est fixée
-        if self.selected_mode == "One Player":
-            units_to_control = [self.active_unit] if self.active_unit else []
-        else:
-            # Mode "Group", gérer toutes les unités des joueurs
-            units_to_control = [unit for unit in self.player_units if unit.health > 0]
+        # Une fois toutes les unités du joueur terminées, lancer le tour des ennemis
+        self.check_victory()  # Vérifiez une dernière fois avant de passer aux ennemis
+        self.handle_enemy_turn()
 
-        # Vérification : s'assurer qu'il y a des unités à contrôler
-        if not units_to_control:
-            print("Aucune unité à contrôler.")
-            return
+    def play_player_units(self, units_to_control):
+        """Fait agir chaque unité de units_to_control ; vrai si un chargement rapide (F9) a remplacé la partie."""
+        current_unit_index = 0  # Index de l'unité actuellement contrôlée
 
         # Initialisation d'un drapeau pour vérifier si toutes les unités ont agi
         units_have_acted = [False] * len(units_to_control)
@@ -457,17 +611,22 @@ class Game:
 
             has_acted = False
             selected_unit.is_selected = True
+            self.camera.follow(selected_unit.x, selected_unit.y)  # L'unité à jouer reste dans la fenêtre
             self.flip_display()
 
             while not has_acted:
-                for event in pygame.event.get():
+                # Portée de déplacement, redessinée seulement quand l'image en dessous l'a effacée
+                # (pas à chaque événement : le bleu translucide s'accumulait à chaque mouvement de souris)
+                if not self.renderer.overlaid:
+                    self.present(selected_unit.draw_move_range(self.screen, self))
+                # Endormi jusqu'à la prochaine entrée, sauf pendant les animations (cadence de tick)
+                for event in self.input.events(busy=self.animating):
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         exit()
-
-                    # Afficher la portée de mouvement
-                    selected_unit.draw_move_range(self.screen, self)
-                    pygame.display.flip()
+                    if self.input.exposed(event):
+                        self.renderer.invalidate()
+                        self.flip_display()
 
                     # Clic droit pour ouvrir le menu des compétences
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
@@ -476,22 +635,34 @@ class Game:
                     
                     # Clic gauche pour déplacer les unités
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                        mouse_x, mouse_y = pygame.mouse.get_pos()
-                        grid_x, grid_y = mouse_x // CELL_SIZE, mouse_y // CELL_SIZE
+                        grid_x, grid_y = self.camera.cell_at(*pygame.mouse.get_pos())  # Décalage de la caméra compris
 
                         dx, dy = grid_x - selected_unit.x, grid_y - selected_unit.y
                         distance = abs(dx) + abs(dy)
                         # Vérifier si le mouvement est hors de portée
                         if distance > selected_unit.move_range:
-                            print(f"{selected_unit.__class__.__name__} : Mouvement hors de portée (limite : {selected_unit.move_range}).")
+                            movement_log.info("%s : Mouvement hors de portée (limite : %s).", selected_unit.__class__.__name__, selected_unit.move_range)
                             continue
                         if selected_unit.move(dx, dy, self):
-                           print(f"{selected_unit.__class__.__name__} s'est déplacé à ({selected_unit.x}, {selected_unit.y}).")
+                           movement_log.info("%s s'est déplacé à (%s, %s).", selected_unit.__class__.__name__, selected_unit.x, selected_unit.y)
                            has_acted = True
                             # Ouvrir le menu pause avec ESCAPE
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                         self.pause_menu()  # Affiche le menu pause
                         self.flip_display()
+                    # Faire défiler la carte (W, A, S, D) ; C recentre la caméra sur l'unité à jouer
+                    if event.type == pygame.KEYDOWN and event.key in SCROLL_KEYS:
+                        if self.camera.scroll(*SCROLL_KEYS[event.key]):
+                            self.flip_display()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                        if self.camera.center_on(selected_unit.x, selected_unit.y):
+                            self.flip_display()
+                    # Sauvegarde rapide (F5) et chargement rapide (F9) : le tour du joueur reprend sur la partie chargée
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                        self.quick_save()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F9 and self.quick_load():
+                        self.flip_display()
+                        return True
                     # Changer d'unité avec la barre d'espace (mode Group uniquement)
                     if self.selected_mode == "Group" and event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                         selected_unit.is_selected = False
@@ -512,12 +683,12 @@ class Game:
                     # Vérifier si le mouvement est hors de portée
                         distance = abs(dx) + abs(dy)
                         if distance > selected_unit.move_range:
-                            print(f"Mouvement hors de portée pour {selected_unit.__class__.__name__}.")
+                            movement_log.info("Mouvement hors de portée pour %s.", selected_unit.__class__.__name__)
                             continue
 
                         # Déplacer l'unité
                         if selected_unit.move(dx, dy, self):
-                            print(f"{selected_unit.__class__.__name__} s'est déplacé à ({selected_unit.x}, {selected_unit.y}).")
+                            movement_log.info("%s s'est déplacé à (%s, %s).", selected_unit.__class__.__name__, selected_unit.x, selected_unit.y)
                             has_acted = True
                             self.handle_enemy_reaction(selected_unit)
                         # Attaquer avec le clic droit
@@ -526,6 +697,9 @@ class Game:
                             self.flip_display()
                             has_acted = True
 
+                # Une image : les animations en cours avancent pendant que les entrées restent traitées
+                self.tick(lambda: selected_unit.draw_move_range(self.screen, self))
+
             # Vérifie si l'unité entre dans une zone de santé
             self.handle_health_zones(selected_unit)
             # Désélectionner l'unité après son action
@@ -539,43 +713,54 @@ class Game:
             # Passer à l'unité suivante
             current_unit_index = (current_unit_index + 1) % len(units_to_control)
 
-        # Une fois toutes les unités du joueur terminées, lancer le tour des ennemis
-        self.check_victory()  # Vérifiez une dernière fois avant de passer aux ennemis
-        self.handle_enemy_turn()
+        return False
        
 
-    def handle_enemy_turn(self):
+    def handle_enemy_turn(self, plan=None):
+        """Tour des ennemis avec l'IA choisie (enemy_ai) ; plan : actions MCTS déjà choisies (replay)."""
+        self.record(TURN)
+        if self.enemy_ai == "MCTS":
+            self.handle_planned_enemy_turn(plan)
+        else:
+            self.handle_greedy_enemy_turn()
+        if self.recorder is not None:
+            self.recorder.end_turn(self)
+
+    def handle_greedy_enemy_turn(self):
         """Logique améliorée pour les ennemis."""
+        # Statistiques lues directement dans les colonnes du UnitStore : une lecture par valeur utile
+        store = self.unit_store
         for enemy in self.enemy_units:
             # Ignorer les ennemis déjà morts
-            if enemy.health <= 0:
-                print(f"{enemy.__class__.__name__} est mort. Passe au prochain ennemi.")
+            if store.health.item(enemy.index) <= 0:
+                ai_log.debug("%s est mort. Passe au prochain ennemi.", enemy.__class__.__name__)
                 continue
 
             # Étape 1 : Trouver la cible prioritaire
             #target = self.find_high_priority_target(enemy)
-            target= self.find_closest_target(enemy)
+            target = self.find_weakest_target() if self.enemy_ai == "Weakest" else self.find_closest_target(enemy)
             if not target:
-                print(f"{enemy.__class__.__name__} n'a trouvé aucune cible valide.")
+                ai_log.info("%s n'a trouvé aucune cible valide.", enemy.__class__.__name__)
                 continue
 
-            print(f"{enemy.__class__.__name__} cible {target.__class__.__name__} à ({target.x}, {target.y}).")
+            target_position = target.position
+            ai_log.debug("%s cible %s à (%s, %s).", enemy.__class__.__name__, target.__class__.__name__, *target_position)
 
             # Étape 2 : Déplacer l'ennemi vers la cible
             moved = self.move_enemy_towards_target(enemy, target)
             if moved:
-                print(f"{enemy.__class__.__name__} s'est déplacé vers ({enemy.x}, {enemy.y}).")
+                ai_log.info("%s s'est déplacé vers (%s, %s).", enemy.__class__.__name__, *enemy.position)
             else:
-                print(f"{enemy.__class__.__name__} ne peut pas se déplacer vers {target.__class__.__name__}.")
+                ai_log.debug("%s ne peut pas se déplacer vers %s.", enemy.__class__.__name__, target.__class__.__name__)
 
             # Étape 3 : Vérifier si l'ennemi peut attaquer après s'être déplacé
             if self.is_target_in_range(enemy, target):
-                print(f"{enemy.__class__.__name__} attaque {target.__class__.__name__} à ({target.x}, {target.y}).")
+                combat_log.info("%s attaque %s à (%s, %s).", enemy.__class__.__name__, target.__class__.__name__, *target_position)
                 enemy.draw_enemy_attack(self, target)
-                target.take_damage(enemy.attack_power, "melee")
-                if target.health <= 0:
-                    print(f"{target.__class__.__name__} est mort. Retiré des unités du joueur.")
-                    self.player_units.remove(target)
+                target.take_damage(store.attack_power.item(enemy.index), "melee")
+                if store.health.item(target.index) <= 0:
+                    combat_log.info("%s est mort. Retiré des unités du joueur.", target.__class__.__name__)
+                    self.remove_unit(target)
 
             # Étape 4 : Vérifier les effets des terrains ou bonus
             self.handle_bomb_zones(enemy)
@@ -583,29 +768,102 @@ class Game:
         # Vérifier les conditions de victoire après le tour des ennemis
         self.check_victory()
 
+    def close_planner(self):
+        """Arrête le pool de processus MCTS s'il a été lancé (changement d'IA, fin du jeu) ; il se relance au besoin."""
+        if self.planner is not None:
+            self.planner.close()
+
+    def handle_planned_enemy_turn(self, plan=None):
+        """Tour ennemi choisi par MCTS (planner.py) : chaque action du plan est jouée avec les règles du jeu."""
+        if plan is None:
+            if self.planner is None:
+                self.planner = Planner()
+            plan = self.planner.plan(self)
+            ai_log.info("Plan MCTS : %s rollouts.", self.planner.iterations)
+        if self.recorder is not None:
+            for enemy, (dx, dy, ability) in plan:
+                self.recorder.command(PLAN, enemy.index, encode_step(dx, dy), ABILITIES.index(ability))
+
+        for enemy, (dx, dy, ability) in plan:
+            if enemy.health <= 0:
+                continue
+
+            # Étape 1 : Un pas (ou rester), avec les mêmes restrictions que move_enemy_towards_target
+            x, y = enemy.position
+            new_x, new_y = x + dx, y + dy
+            if (dx or dy) and self.occupancy.is_free(new_x, new_y) and self.terrain.code_at(new_x, new_y) not in (WALL, LAVA):
+                self.occupancy.move(enemy, new_x, new_y)
+                ai_log.info("%s s'est déplacé vers (%s, %s).", enemy.__class__.__name__, new_x, new_y)
+
+            # Étape 2 : La capacité choisie
+            if ability == "attack":
+                target = self.find_closest_target(enemy)
+                if target and self.is_target_in_range(enemy, target):
+                    combat_log.info("%s attaque %s à (%s, %s).", enemy.__class__.__name__, target.__class__.__name__, target.x, target.y)
+                    enemy.draw_enemy_attack(self, target)
+                    target.take_damage(enemy.attack_power, "melee")
+            elif ability == "single" and isinstance(enemy, Pyro):
+                target = self.closest_opponent_in(enemy, SQUARE_1)
+                if target:
+                    enemy.handle_single_attack(self, target=target.position)
+            elif ability == "single" and isinstance(enemy, Medic):
+                target = self.closest_opponent_in(enemy, DIAMOND_3)
+                if target:
+                    enemy.handle_single_attack(self, target=target)
+            elif ability == "single":
+                enemy.handle_single_attack(self)
+            elif ability == "group":
+                enemy.handle_group_attack(self)
+
+            for unit in list(self.player_units):
+                if unit.health <= 0:
+                    combat_log.info("%s est mort. Retiré des unités du joueur.", unit.__class__.__name__)
+                    self.remove_unit(unit)
+
+            # Étape 3 : Vérifier les effets des terrains ou bonus
+            self.handle_bomb_zones(enemy)
+
+        self.check_victory()
+
+    def closest_opponent_in(self, unit, shape):
+        """Adversaire vivant couvert par la forme centrée sur l'unité, le plus proche en distance de Manhattan, ou None."""
+        store = self.unit_store
+        n = store.count
+        x, y = unit.position
+        distance = np.abs(store.x[:n] - x) + np.abs(store.y[:n] - y)
+        return store.nearest(store.area(shape, x, y, unit.opponents) & store.live(), distance)
+
     def move_enemy_towards_target(self, enemy, target):
-        """Déplace un ennemi vers une cible spécifiée."""
+        """Déplace un ennemi d'une case vers une cible spécifiée, en suivant le chemin A*."""
+        path = self.pathfinder.path_to(enemy, target)
+        if path is not None:
+            if len(path) <= 2:
+                return False  # Déjà au contact de la cible
+            self.occupancy.move(enemy, *path[1])
+            return True
+
+        # Aucun chemin (cible encerclée) : se rapprocher au mieux, une case à la fois
+        (x, y), (target_x, target_y) = enemy.position, target.position
         directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        directions.sort(key=lambda d: abs((enemy.x + d[0]) - target.x) + abs((enemy.y + d[1]) - target.y))
+        directions.sort(key=lambda d: abs((x + d[0]) - target_x) + abs((y + d[1]) - target_y))
 
         for dx, dy in directions:
-            new_x, new_y = enemy.x + dx, enemy.y + dy
+            new_x, new_y = x + dx, y + dy
 
             # Vérifier les limites de la grille
-            if not (0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE):
+            if not (0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size):
                 continue
 
             # Vérifier le type de terrain
-            terrain_type = self.terrain[new_x][new_y]["type"]
-            if terrain_type in ["wall", "lava"]:
+            if self.terrain.code_at(new_x, new_y) in (WALL, LAVA):
                 continue
 
             # Vérifier si la case est occupée
-            if any(unit.x == new_x and unit.y == new_y for unit in self.player_units + self.enemy_units):
+            if not self.occupancy.is_free(new_x, new_y):
                 continue
 
             # Déplacer l'ennemi
-            enemy.x, enemy.y = new_x, new_y
+            self.occupancy.move(enemy, new_x, new_y)
             return True
 
         return False
@@ -613,20 +871,22 @@ class Game:
     def is_target_in_range(self, enemy, target):
         """Vérifie si une cible est à portée d'attaque."""
         attack_range = getattr(enemy, "attack_range", 1)  # Par défaut : 1
-        return abs(enemy.x - target.x) + abs(enemy.y - target.y) <= attack_range
+        (x, y), (target_x, target_y) = enemy.position, target.position
+        return abs(x - target_x) + abs(y - target_y) <= attack_range
 
     def handle_enemy_reaction(self, player_unit):
         """Déclenche un déplacement ennemi après une action du joueur."""
+        self.record(REACT, player_unit)
         for enemy in self.enemy_units:
             if enemy.health > 0:
                 target = player_unit  # Réagit à l'unité qui vient de jouer
                 moved = self.move_enemy_towards_target(enemy, target)
                 if moved:
-                    print(f"{enemy.__class__.__name__} réagit en se déplaçant vers ({enemy.x}, {enemy.y}).")
+                    ai_log.info("%s réagit en se déplaçant vers (%s, %s).", enemy.__class__.__name__, enemy.x, enemy.y)
 
                     # Vérifier si l'ennemi peut attaquer après le déplacement
                     if self.is_target_in_range(enemy, target):
-                        print(f"{enemy.__class__.__name__} attaque {target.__class__.__name__} !")
+                        combat_log.info("%s attaque %s !", enemy.__class__.__name__, target.__class__.__name__)
                         #enemy.attack(target)
                         enemy.draw_enemy_attack(self, target)
                     return  # Stopper après une action
@@ -634,48 +894,27 @@ class Game:
 
     def find_closest_target(self, enemy):
         """Trouve la cible la plus proche parmi les unités ennemies ou alliées."""
-        closest_target = None
-        min_distance = float('inf')
-
-        for unit in self.player_units:
-            if unit.health > 0:  # Ignore les unités mortes
-                distance = abs(unit.x - enemy.x) + abs(unit.y - enemy.y)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_target = unit
+        # Distance de Manhattan aux joueurs vivants, en une passe sur les colonnes
+        closest_target = self.unit_store.closest(*enemy.position, "player")
 
         if closest_target:
-            print(f"{enemy.__class__.__name__} identifie {closest_target.__class__.__name__} comme la cible la plus proche.")
+            ai_log.debug("%s identifie %s comme la cible la plus proche.", enemy.__class__.__name__, closest_target.__class__.__name__)
         else:
-            print(f"{enemy.__class__.__name__} ne trouve aucune cible valide.")
+            ai_log.debug("%s ne trouve aucune cible valide.", enemy.__class__.__name__)
         return closest_target
     
         
     def handle_medic_heal(self, medic):
         """Fait en sorte qu'un Medic soigne l'unité alliée la plus proche qui a besoin de soin."""
-        weakest_ally = None
-        min_health = float('inf')
-
-        for unit in self.enemy_units:
-            if unit.health < min_health and unit.health > 0:  # Cherche l'allié le plus faible
-                min_health = unit.health
-                weakest_ally = unit
+        weakest_ally = self.unit_store.weakest("enemy")  # Cherche l'allié le plus faible
 
         if weakest_ally:
             medic.handle_group_attack(self)  # Utiliser l'attaque de groupe pour soigner
-            print(f"{medic.__class__.__name__} soigne {weakest_ally.__class__.__name__} !")
+            ai_log.info("%s soigne %s !", medic.__class__.__name__, weakest_ally.__class__.__name__)
 
     def find_weakest_target(self):
         """Trouve l'unité la plus faible dans l'équipe adverse."""
-        weakest_target = None
-        min_health = float('inf')
-
-        for unit in self.player_units:
-            if unit.health < min_health and unit.health > 0:  # Cherche l'unité la plus faible
-                min_health = unit.health
-                weakest_target = unit
-
-        return weakest_target
+        return self.unit_store.weakest("player")
 
     def hide_enemy_behind_wall(self, enemy):
         """Fait en sorte qu'un Sniper se cache derrière un mur s'il est à proximité."""
@@ -685,25 +924,30 @@ class Game:
 
     def flip_display(self):
         """刷新屏幕显示"""
+        if self.headless:
+            return
         self.screen.fill(BLACK)
 
-        for x in range(GRID_SIZE):
-            for y in range(GRID_SIZE):
-                terrain = self.terrain[x][y]
-                self.screen.blit(terrain["image"], (x * CELL_SIZE, y * CELL_SIZE))
+        # Le terrain est pré-composé : un seul blit au lieu d'un par case
+        terrain_cells = self.update_terrain_layer()
+        self.screen.blit(self.terrain_layer, (0, 0))
 
-        # Afficher les unités du joueur
+        camera = self.camera
+        drawn_units = []
+        # Afficher les unités du joueur (seulement celles dans la fenêtre)
         for unit in self.player_units:
-            if unit.health > 0 and getattr(unit, "visible", True):  # Vérifie si l'unité est visible
+            if unit.health > 0 and getattr(unit, "visible", True) and camera.contains(unit.x, unit.y):  # Vérifie si l'unité est visible
                 unit.draw(self.screen,self)
+                drawn_units.append(unit)
 
        # Afficher les ennemis (en fonction de la vision combinée)
         combined_vision = self.get_combined_vision()
 
         # 绘制敌方单位，仅绘制在视野内的敌方单位
         for unit in self.enemy_units:
-            if unit.health > 0 and (unit.x, unit.y) in combined_vision:
+            if unit.health > 0 and (unit.x, unit.y) in combined_vision and camera.contains(unit.x, unit.y):
                 unit.draw(self.screen,self)
+                drawn_units.append(unit)
 
         # 绘制战争迷雾
         self.draw_fog_of_war(combined_vision)
@@ -711,55 +955,149 @@ class Game:
 
         # Dessiner les zones de santé
         for x, y in self.health_zones:
-            self.screen.blit(self.health_image, (x * CELL_SIZE, y * CELL_SIZE))
+            if camera.contains(x, y):
+                self.screen.blit(self.health_image, camera.point(x, y))
 
         # Dessiner les bombes
         for x, y in self.bomb_zones:
-            self.screen.blit(self.bomb_image, (x * CELL_SIZE, y * CELL_SIZE))
+            if camera.contains(x, y):
+                self.screen.blit(self.bomb_image, camera.point(x, y))
         # Dessiner les bonus
         for item in self.bonus_items:
-            self.screen.blit(item.image, (item.x * CELL_SIZE, item.y * CELL_SIZE))
+            if camera.contains(item.x, item.y):
+                self.screen.blit(item.image, camera.point(item.x, item.y))
         #Afficher le panneau des unités
-        self.draw_unit_info_panel()
+        panel_rows = self.draw_unit_info_panel()
 
-        pygame.display.flip()
+        # Ne pousser que ce qui a changé depuis l'image précédente
+        damage = self.frame_damage(drawn_units, combined_vision, panel_rows)
+        damage.append(camera.cells_rect(terrain_cells))
+        self.renderer.present_frame(damage)
+        self.input.presented()
+
+    def frame_damage(self, drawn_units, combined_vision, panel_rows):
+        """
+        Compare ce qui vient d'être dessiné avec l'image précédente
+        et renvoie les rectangles abîmés : unités déplacées, barres de vie,
+        brouillard, objets ramassés et lignes du panneau modifiées.
+        Si la caméra a bougé, toute la fenêtre est poussée.
+        """
+        camera = self.camera
+        if self.frame_camera != camera.version:
+            self.renderer.invalidate()
+            self.frame_camera = camera.version
+        state = {}
+        for unit in drawn_units:
+            # La case et les barres de vie/défense dessinées au-dessus
+            left, top = camera.point(unit.x, unit.y)
+            rect = pygame.Rect(left, top - 14, CELL_SIZE, CELL_SIZE + 14)
+            state[("unit", id(unit))] = ((unit.x, unit.y, unit.health, unit.defense, unit.is_hidden), rect)
+        for x, y in self.health_zones:
+            if camera.contains(x, y):
+                state[("heart", x, y)] = (True, camera.rect(x, y))
+        for x, y in self.bomb_zones:
+            if camera.contains(x, y):
+                state[("bomb", x, y)] = (True, camera.rect(x, y))
+        for item in self.bonus_items:
+            if camera.contains(item.x, item.y):
+                state[("bonus", id(item))] = ((item.x, item.y), camera.rect(item.x, item.y))
+        for key, signature, rect in panel_rows:
+            state[("panel", key)] = (signature, rect)
+
+        damage = []
+        previous = self.frame_state
+        for key in state.keys() | previous.keys():
+            old, new = previous.get(key), state.get(key)
+            if old is None or new is None or old[0] != new[0]:
+                if old is not None:
+                    damage.append(old[1])
+                if new is not None and (old is None or old[1] != new[1]):
+                    damage.append(new[1])
+        # Cases de la fenêtre qui entrent ou sortent du brouillard
+        x0, y0, x1, y1 = camera.bounds()
+        visible = combined_vision.visible[x0:x1, y0:y1]
+        changed = visible != self.frame_vision
+        damage.extend(camera.rect(x0 + int(x), y0 + int(y)) for x, y in np.argwhere(changed))
+
+        self.frame_state = state
+        self.frame_vision = visible.copy()
+        return damage
  
 
+    def update_terrain_layer(self):
+        """
+        Met à jour le fond du terrain en cache.
+        Le fond ne couvre que la fenêtre : toutes ses cases sont dessinées la première fois
+        (ou après TerrainGrid.fill, ou un grand saut de la caméra), ensuite seules les cases modifiées
+        (ex. lave de Pyro) et, quand la caméra défile, les bandes découvertes sont redessinées.
+        """
+        full, dirty = self.terrain.take_dirty()
+        camera = self.camera
+        x0, y0, x1, y1 = camera.bounds()
+        if self.terrain_layer is None:
+            self.terrain_layer = pygame.Surface((WIDTH, HEIGHT)).convert()  # Réutilisée d'une partie à l'autre
+            full = True
+        dx, dy = x0 - self.terrain_origin[0], y0 - self.terrain_origin[1]
+        if (dx or dy) and not full and abs(dx) < camera.size and abs(dy) < camera.size:
+            # Petit défilement : le fond glisse et seules les bandes découvertes sont dessinées
+            self.terrain_layer.scroll(-dx * CELL_SIZE, -dy * CELL_SIZE)
+            columns = range(x1 - dx, x1) if dx > 0 else range(x0, x0 - dx)
+            rows = range(y1 - dy, y1) if dy > 0 else range(y0, y0 - dy)
+            dirty = set(dirty)
+            dirty.update((x, y) for x in columns for y in range(y0, y1))
+            dirty.update((x, y) for x in range(x0, x1) for y in rows)
+        elif dx or dy:
+            full = True
+        self.terrain_origin = (x0, y0)
+        if full:
+            cells = [(x, y) for x in range(x0, x1) for y in range(y0, y1)]
+        else:
+            cells = [(x, y) for x, y in dirty if x0 <= x < x1 and y0 <= y < y1]
+        for x, y in cells:
+            rect = camera.rect(x, y)
+            self.terrain_layer.fill(BLACK, rect)  # Les images avec transparence ne laissent pas voir l'ancienne case
+            self.terrain_layer.blit(self.terrain.image_at(x, y), rect)
+        return cells
+
     def pause_menu(self):
         """Afficher le menu de pause avec une image d'arrière-plan."""
         # Charger l'image d'arrière-plan
-        bg_image = pygame.image.load("pic/pause_bg.jpg")  # Assurez-vous que le chemin est correct
-        bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
+        bg_image = assets.image("pic/pause_bg.jpg", (WIDTH, HEIGHT))  # Chargée et redimensionnée une seule fois
 
         # Configuration des polices pour le titre et les options
-        font_title = pygame.font.Font(None, 72)
-        font_option = pygame.font.Font(None, 48)
+        font_title = assets.font(None, 72)
+        font_option = assets.font(None, 48)
 
         # Texte du titre "Pause"
-        paused_text = font_title.render("Jeu en pause", True, (255, 255, 255))
+        paused_text = assets.render(font_title, "Jeu en pause", True, (255, 255, 255))
         paused_rect = paused_text.get_rect(center=(WIDTH // 2, HEIGHT // 4))
 
         # Options du menu pause
         options = ["Resume", "Menu Principal", "Quit"]
         option_rects = []
         for i, option in enumerate(options):
-            option_text = font_option.render(option, True, (255, 255, 255))
+            option_text = assets.render(font_option, option, True, (255, 255, 255))
             option_rect = option_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + i * 60))
             option_rects.append((option_text, option_rect))
 
         paused = True
+        redraw = True
         while paused:
-            # Afficher l'image d'arrière-plan
-            self.screen.blit(bg_image, (0, 0))
-
-            # Afficher le texte et les options
-            self.screen.blit(paused_text, paused_rect)
-            for option_text, option_rect in option_rects:
-                self.screen.blit(option_text, option_rect)
-            pygame.display.flip()
-
-            # Gestion des interactions utilisateur
-            for event in pygame.event.get():
+            # Le menu ne change pas : il n'est redessiné que si la fenêtre l'a perdu
+            if redraw:
+                # Afficher l'image d'arrière-plan
+                self.screen.blit(bg_image, (0, 0))
+
+                # Afficher le texte et les options
+                self.screen.blit(paused_text, paused_rect)
+                for option_text, option_rect in option_rects:
+                    self.screen.blit(option_text, option_rect)
+                self.present()  # Menu plein écran
+                redraw = False
+
+            # Gestion des interactions utilisateur (attente sans occuper le processeur)
+            for event in self.input.events():
+                redraw = redraw or self.input.exposed(event)
                 if event.type == pygame.QUIT:  # Quitter le jeu
                     pygame.quit()
                     exit()
@@ -783,18 +1121,17 @@ class Game:
 
 
     def show_menu(self):
-        print("Menu principal affiché.")
+        ui_log.debug("Menu principal affiché.")
         """Afficher le menu principal du jeu."""
-        bg_image = pygame.image.load("pic/bg.jpg")
-        bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
+        bg_image = assets.image("pic/bg.jpg", (WIDTH, HEIGHT))
 
-        font_title = pygame.font.Font(None, 72)
-        font_option = pygame.font.Font(None, 48)
+        font_title = assets.font(None, 72)
+        font_option = assets.font(None, 48)
 
-        title_surface = font_title.render("Game Python", True, (255, 255, 255))
-        play_surface = font_option.render("1. Play", True, (255, 255, 255))
-        setting_surface = font_option.render("2. Setting", True, (255, 255, 255))
-        quit_surface = font_option.render("3. Quit", True, (255, 255, 255))
+        title_surface = assets.render(font_title, "Game Python", True, (255, 255, 255))
+        play_surface = assets.render(font_option, "1. Play", True, (255, 255, 255))
+        setting_surface = assets.render(font_option, "2. Setting", True, (255, 255, 255))
+        quit_surface = assets.render(font_option, "3. Quit", True, (255, 255, 255))
 
         title_rect = title_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4))
         play_rect = play_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
@@ -802,8 +1139,22 @@ class Game:
         quit_rect = quit_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 120))
 
         running = True
+        redraw = True
         while running:
-            for event in pygame.event.get():
+            # Redessiné seulement au premier affichage, au retour des paramètres ou si la fenêtre l'a perdu
+            if redraw:
+                self.screen.blit(bg_image, (0, 0))
+                self.screen.blit(title_surface, title_rect)
+                self.screen.blit(play_surface, play_rect)
+                self.screen.blit(setting_surface, setting_rect)
+                self.screen.blit(quit_surface, quit_rect)
+
+                self.present()  # Menu plein écran
+                self.report_cold_start()
+                redraw = False
+
+            for event in self.input.events():
+                redraw = redraw or self.input.exposed(event)
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     exit()
@@ -814,19 +1165,21 @@ class Game:
                         running = False
                     elif setting_rect.collidepoint(mouse_x, mouse_y):
                         self.show_settings()
+                        redraw = True
                     elif quit_rect.collidepoint(mouse_x, mouse_y):
                         pygame.quit()
                         exit()
 
-            self.screen.blit(bg_image, (0, 0))
-            self.screen.blit(title_surface, title_rect)
-            self.screen.blit(play_surface, play_rect)
-            self.screen.blit(setting_surface, setting_rect)
-            self.screen.blit(quit_surface, quit_rect)
-
-            pygame.display.flip()
-
         
+    def report_cold_start(self):
+        """Affiche une seule fois le temps entre le lancement et le premier écran interactif du menu."""
+        if self.launch_time is None:
+            return None
+        elapsed = (time.perf_counter() - self.launch_time) * 1000
+        self.launch_time = None
+        ui_log.info("Démarrage à froid : premier écran du menu après %.0f ms", elapsed)
+        return elapsed
+
     # quand je vais choisir un jouer mode one player pouvoir jouer avec un seule 
      
     def set_active_unit(self):
@@ -852,22 +1205,45 @@ class Game:
 
     def show_settings(self):
         """Afficher le menu des paramètres permettant de sélectionner le mode et l'unité."""
-        font = pygame.font.Font(None, 48)
-        mode_text = font.render("Mode: " + self.selected_mode, True, (255, 255, 255))
-        unit_text = font.render("Unit: " + self.selected_unit, True, (255, 255, 255))
-        return_text = font.render("Play", True, (255, 255, 255))
+        font = assets.font(None, 48)
+        mode_text = assets.render(font, "Mode: " + self.selected_mode, True, (255, 255, 255))
+        unit_text = assets.render(font, "Unit: " + self.selected_unit, True, (255, 255, 255))
+        animation_text = assets.render(font, "Animations: " + self.animation_setting(), True, (255, 255, 255))
+        enemy_ai_text = assets.render(font, "Enemy AI: " + self.enemy_ai, True, (255, 255, 255))
+        return_text = assets.render(font, "Play", True, (255, 255, 255))
 
         mode_rect = mode_text.get_rect(center=(WIDTH // 2, HEIGHT // 3))
         unit_rect = unit_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 60))
-        return_rect = return_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 120))
+        animation_rect = animation_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 120))
+        enemy_ai_rect = enemy_ai_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 180))
+        return_rect = return_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 240))
 
         running = True
+        redraw = True
         while running:
-            for event in pygame.event.get():
+            # Les textes ne sont refaits qu'après un clic qui change un réglage
+            if redraw:
+                self.screen.fill((0, 0, 0))
+                mode_text = assets.render(font, "Mode: " + self.selected_mode, True, (255, 255, 255))
+                unit_text = assets.render(font, "Unit: " + self.selected_unit, True, (255, 255, 255))
+                animation_text = assets.render(font, "Animations: " + self.animation_setting(), True, (255, 255, 255))
+                enemy_ai_text = assets.render(font, "Enemy AI: " + self.enemy_ai, True, (255, 255, 255))
+                self.screen.blit(mode_text, mode_rect)
+                self.screen.blit(unit_text, unit_rect)
+                self.screen.blit(animation_text, animation_rect)
+                self.screen.blit(enemy_ai_text, enemy_ai_rect)
+                self.screen.blit(return_text, return_rect)
+
+                self.present()  # Menu plein écran
+                redraw = False
+
+            for event in self.input.events():
+                redraw = redraw or self.input.exposed(event)
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     exit()
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    redraw = True
                     mouse_x, mouse_y = event.pos
                     if mode_rect.collidepoint(mouse_x, mouse_y):
                         # Alterne entre "Group" et "One Player"
@@ -880,56 +1256,81 @@ class Game:
                             "Scout": "Sniper",
                             "Sniper": "Pyro"
                         }[self.selected_unit]
+                    elif animation_rect.collidepoint(mouse_x, mouse_y):
+                        # Vitesse des animations : x1 -> x2 -> x4 -> Off -> x1
+                        self.cycle_animation_setting()
+                    elif enemy_ai_rect.collidepoint(mouse_x, mouse_y):
+                        # IA ennemie suivante : Greedy -> Weakest -> MCTS -> Greedy
+                        self.enemy_ai = ENEMY_AIS[(ENEMY_AIS.index(self.enemy_ai) + 1) % len(ENEMY_AIS)]
+                        if self.enemy_ai != "MCTS":
+                            self.close_planner()  # Plus de processus MCTS qui attendent pour rien
                     elif return_rect.collidepoint(mouse_x, mouse_y):
                         # Quitte le menu des paramètres et commence le jeu
                         self.set_active_unit()
                         running = False
 
-            self.screen.fill((0, 0, 0))
-            mode_text = font.render("Mode: " + self.selected_mode, True, (255, 255, 255))
-            unit_text = font.render("Unit: " + self.selected_unit, True, (255, 255, 255))
-            self.screen.blit(mode_text, mode_rect)
-            self.screen.blit(unit_text, unit_rect)
-            self.screen.blit(return_text, return_rect)
 
-            pygame.display.flip()
 
+    def animation_setting(self):
+        """Réglage courant des animations, tel qu'affiché dans les paramètres ("x1", "x2", "x4" ou "Off")."""
+        return "Off" if self.timeline.skip else f"x{self.timeline.speed}"
 
+    def cycle_animation_setting(self):
+        """Passe à la vitesse d'animation suivante, puis au mode sans animation."""
+        if self.timeline.skip:
+            self.timeline.skip = False
+            self.timeline.speed = SPEEDS[0]
+        elif self.timeline.speed == SPEEDS[-1]:
+            self.timeline.skip = True
+            self.timeline.clear()
+        else:
+            self.timeline.speed = SPEEDS[SPEEDS.index(self.timeline.speed) + 1]
 
     def check_victory(self):
-        """Vérifiez les conditions gagnantes et perdantes."""
+        """Vérifiez les conditions gagnantes et perdantes.
+
+        Retourne l'équipe gagnante ('player' ou 'enemy') ou None si la partie continue.
+        En mode headless, le résultat est seulement enregistré dans self.winner.
+        """
         # Victoire
-        if all(unit.health <= 0 for unit in self.enemy_units):
-            print("Victoire détectée !")
-            self.display_message("Victoire !")
-            pygame.time.delay(2000)
-            self.return_to_main_menu()
-            return
+        if not self.unit_store.live("enemy").any():
+            combat_log.info("Victoire détectée !")
+            return self.end_game("player", "Victoire !")
 
         # Défaite en mode Group
-        if self.selected_mode == "Group" and all(unit.health <= 0 for unit in self.player_units):
-            print("Game Over détecté en mode Group !")
-            self.display_message("Game Over - Tous vos joueurs sont morts.")
-            pygame.time.delay(2000)
-            self.return_to_main_menu()
-            return
+        if self.selected_mode == "Group" and not self.unit_store.live("player").any():
+            combat_log.info("Game Over détecté en mode Group !")
+            return self.end_game("enemy", "Game Over - Tous vos joueurs sont morts.")
 
         # Défaite en mode One Player
         if self.selected_mode == "One Player" and self.active_unit and self.active_unit.health <= 0:
-            print("Game Over détecté en mode One Player !")
-            self.display_message("Game Over - Vous avez perdu.")
-            pygame.time.delay(2000)
-            self.return_to_main_menu()
-            return
+            combat_log.info("Game Over détecté en mode One Player !")
+            return self.end_game("enemy", "Game Over - Vous avez perdu.")
+        return None
+
+    def end_game(self, winner, message):
+        """Enregistre le gagnant puis, avec une fenêtre, affiche le message et revient au menu."""
+        self.winner = winner
+        if self.headless:
+            return winner
+        self.finish_animations()  # Laisser finir la dernière attaque avant le message
+        self.display_message(message)
+        pygame.time.delay(2000)
+        self.return_to_main_menu()
+        return winner
         
     # cette fonction pour pouvoir recommancer a nouveau ou  cas ou on a perdu la partie on peu directement commancer une nouvelle sans quitter le jeu a chaque fois et reentrer dans jeu 
 
     def return_to_main_menu(self):
         """Réinitialiser le jeu et revenir au menu principal."""
-        print("Retour au menu principal avec réinitialisation...")
+        ui_log.info("Retour au menu principal avec réinitialisation...")
 
-        # Réinitialiser les attributs du jeu
-        self.__init__(self.screen)  # Réinitialiser toutes les configurations
+        # Le replay de la partie terminée est fermé ; la suivante est enregistrée dans le même fichier
+        recording = self.recorder.path if self.recorder is not None else None
+        self.stop_recording()
+
+        # Nouvelle partie sur les ressources déjà chargées (images, grilles, pools) : pas de __init__ complet
+        self.new_game()
 
         # Réinitialiser les sélections
         self.selected_mode = "One Player"
@@ -938,30 +1339,36 @@ class Game:
 
         # Afficher le menu principal
         self.show_menu()
+        if recording is not None:
+            self.start_recording(recording)
 
     def draw_unit_info_panel(self):
-            """Affiche les informations des unités dans un panneau à droite de la zone de jeu."""
+            """Affiche les informations des unités dans un panneau à droite de la zone de jeu.
+
+            Retourne les lignes dessinées (clé, contenu, rectangle) pour le suivi des zones modifiées.
+            """
             panel_width = 250  # Largeur du panneau
             panel_x = WIDTH  # Position à droite de la grille
-            font = pygame.font.Font(None, 28)  # Réduire la taille de la police
+            font = assets.font(None, 28)  # Réduire la taille de la police
             padding = 10  # Espace intérieur pour le contenu
             unit_image_size = 40  # Taille des images des unités
 
             # Dessiner le panneau de fond
             pygame.draw.rect(self.screen, (50, 50, 50), (panel_x, 0, panel_width, HEIGHT))  # Fond gris foncé
             pygame.draw.rect(self.screen, (255, 255, 255), (panel_x, 0, panel_width, HEIGHT), 2)  # Bordure blanche
+            rows = []
 
             if self.selected_mode == "Group":
                 # Mode Group : Afficher toutes les unités
                 y_offset = padding  # Position verticale de départ
                 for unit in self.player_units:
                     # Afficher le nom de l'unité
-                    name_text = font.render(unit.__class__.__name__, True, (255, 255, 0))  # Nom en jaune
+                    name_text = assets.render(font, unit.__class__.__name__, True, (255, 255, 0))  # Nom en jaune
                     self.screen.blit(name_text, (panel_x + padding, y_offset))
 
                     # Afficher l'image de l'unité
                     if unit.image:
-                        unit_image = pygame.transform.scale(unit.image, (unit_image_size, unit_image_size))
+                        unit_image = assets.scaled(unit.image, (unit_image_size, unit_image_size))
                         self.screen.blit(unit_image, (panel_x + padding, y_offset + 30))
 
                     # Afficher les statistiques
@@ -971,8 +1378,9 @@ class Game:
                         f"Defense: {unit.defense}"
                     ]
                     for i, stat in enumerate(stats):
-                        stat_text = font.render(stat, True, (255, 255, 255))
+                        stat_text = assets.render(font, stat, True, (255, 255, 255))
                         self.screen.blit(stat_text, (panel_x + padding + unit_image_size + 10, y_offset + 30 + i * 25))
+                    rows.append((len(rows), (unit.__class__.__name__, *stats), pygame.Rect(panel_x, y_offset, panel_width, 100)))
 
                     # Ajouter un espace entre les unités
                     y_offset += 100
@@ -983,12 +1391,12 @@ class Game:
                 unit = self.active_unit
 
                 # Afficher le nom de l'unité
-                name_text = font.render(unit.__class__.__name__, True, (255, 255, 0))  # Nom en jaune
+                name_text = assets.render(font, unit.__class__.__name__, True, (255, 255, 0))  # Nom en jaune
                 self.screen.blit(name_text, (panel_x + padding, y_offset))
 
                 # Afficher l'image de l'unité
                 if unit.image:
-                    unit_image = pygame.transform.scale(unit.image, (unit_image_size, unit_image_size))
+                    unit_image = assets.scaled(unit.image, (unit_image_size, unit_image_size))
                     self.screen.blit(unit_image, (panel_x + padding, y_offset + 30))
 
                 # Afficher les statistiques
@@ -998,29 +1406,50 @@ class Game:
                     f"Defense: {unit.defense}"
                 ]
                 for i, stat in enumerate(stats):
-                    stat_text = font.render(stat, True, (255, 255, 255))
+                    stat_text = assets.render(font, stat, True, (255, 255, 255))
                     self.screen.blit(stat_text, (panel_x + padding + unit_image_size + 10, y_offset + 30 + i * 25))
+                rows.append((0, (unit.__class__.__name__, *stats), pygame.Rect(panel_x, y_offset, panel_width, 100)))
+            return rows
 
 
     def display_message(self, message):
         """Afficher un message temporaire au centre de l'écran."""
-        font = pygame.font.Font(None, 64)
-        text_surface = font.render(message, True, (255, 255, 255))  # Texte en blanc
+        if self.headless:
+            return
+        font = assets.font(None, 64)
+        text_surface = assets.render(font, message, True, (255, 255, 255))  # Texte en blanc
         text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
         self.screen.blit(text_surface, text_rect)
-        pygame.display.flip()
+        self.present()
         pygame.time.delay(2000)  # Afficher pendant 2 secondes
  
+# Fichiers décodés pendant l'écran de chargement : (chemin, taille) des images, sons et musique
+PRELOAD_IMAGES = (
+    [(cls.image_file, (CELL_SIZE, CELL_SIZE)) for cls in (Pyro, Medic, Sniper, Scout)]
+    + [(f"pic/{name}", (CELL_SIZE, CELL_SIZE)) for name in (
+        "prairie_1.png", "rue1.png", "eau_1.png", "eau_2.png", "magma.png", "Arbre.png", "mur.png",
+        "heart.png", "16_bit_bomb2.png", "explosion.png")]
+    + [("pic/heart_frame1.png", (20, 20)), ("pic/attack_boost.png", (60, 60)), ("pic/defense_boost.png", (60, 60))]
+    + [("pic/bg.jpg", (WIDTH, HEIGHT)), ("pic/pause_bg.jpg", (WIDTH, HEIGHT))]
+)
+PRELOAD_SOUNDS = ("gunshot.wav",)
+MUSIC_FILE = "stranger-things-124008.mp3"
+
+
 def show_loading_screen(screen):
-    """Afficher une barre de chargement avec un arrière-plan et une progression lente/rapide."""
-    font_large = pygame.font.Font(None, 60)  # Police pour "Loading..."
-    font_percentage = pygame.font.Font(None, 48)  # Police pour le pourcentage
+    """
+    Afficher une barre de chargement avec un arrière-plan, qui suit le vrai chargement des fichiers
+    (images, sons et musique décodés en arrière-plan dans un pool de threads).
+
+    Retourne le Preload terminé (ses erreurs indiquent les fichiers manquants).
+    """
+    font_large = assets.font(None, 60)  # Police pour "Loading..."
+    font_percentage = assets.font(None, 48)  # Police pour le pourcentage
     bar_color = (0, 200, 0)  # Couleur de la barre (vert clair)
     text_color = (255, 255, 255)  # Couleur du texte (blanc)
 
     # Charger l'image de fond pour le chargement
-    bg_image = pygame.image.load("pic/loading_bg.jpg")  # Remplacez par le chemin de votre image
-    bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
+    bg_image = assets.image("pic/loading_bg.jpg", (WIDTH, HEIGHT))
 
     # Dimensions de la barre de chargement
     bar_width = 400
@@ -1028,78 +1457,121 @@ def show_loading_screen(screen):
     bar_x = (WIDTH - bar_width) // 2
     bar_y = (HEIGHT - bar_height) // 2
 
-    loading_steps = 100  # Nombre d'étapes de chargement
-    for i in range(loading_steps + 1):
+    preload = assets.preload(PRELOAD_IMAGES, PRELOAD_SOUNDS, (MUSIC_FILE,))
+    clock = pygame.time.Clock()
+    while True:
+        done = preload.done
+        loaded, loaded_bytes = preload.progress()
+        ratio = loaded_bytes / preload.total_bytes if preload.total_bytes else 1
+
         # Afficher l'image de fond
         screen.blit(bg_image, (0, 0))
 
         # Dessiner le texte "Loading..."
-        loading_text = font_large.render("Loading...", True, text_color)
+        loading_text = assets.render(font_large, "Loading...", True, text_color)
         loading_rect = loading_text.get_rect(center=(WIDTH // 2, bar_y - 80))
         screen.blit(loading_text, loading_rect)
 
         # Dessiner la barre de fond
         pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
 
-        # Dessiner la barre de progression
-        pygame.draw.rect(screen, bar_color, (bar_x, bar_y, (i / loading_steps) * bar_width, bar_height))
+        # Dessiner la barre de progression (octets déjà décodés)
+        pygame.draw.rect(screen, bar_color, (bar_x, bar_y, ratio * bar_width, bar_height))
 
-        # Dessiner le texte du pourcentage
-        percentage_text = font_percentage.render(f"{i}%", True, text_color)
+        # Dessiner le texte du pourcentage et du nombre de fichiers
+        percentage_text = assets.render(font_percentage, f"{int(ratio * 100)}%  ({loaded}/{preload.total})", True, text_color)
         percentage_rect = percentage_text.get_rect(center=(WIDTH // 2, bar_y - 30))
         screen.blit(percentage_text, percentage_rect)
 
         # Mettre à jour l'écran
         pygame.display.flip()
+        if done:
+            break
 
-        # Pause pour simuler une progression lente, puis rapide
-        if i < 60:
-            pygame.time.delay(50)  # Lent de 0 à 60 %
-        else:
-            pygame.time.delay(15)  # Rapide de 60 à 100 %
+        # La fenêtre reste réactive pendant le chargement
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+        clock.tick(FPS)
+
+    for path, error in preload.finish():
+        ui_log.warning("Chargement impossible : %s (%s)", path, error)
 
     # Effacer l'écran une fois le chargement terminé
     screen.fill((0, 0, 0))
     pygame.display.flip()
+    return preload
+
+
+def play_music():
+    """Jouer la musique de fond en boucle, si l'audio et le fichier sont disponibles."""
+    if pygame.mixer.get_init() is None:
+        return
+    try:
+        # Chargement du fichier audio (ici un fichier mp3 nommé "stranger-things-124008.mp3"), déjà en mémoire s'il a été préchargé
+        pygame.mixer.music.load(assets.music_file(MUSIC_FILE))
+    except (FileNotFoundError, pygame.error) as error:
+        ui_log.warning("Musique indisponible : %s", error)
+        return
+    # Définition du volume de la musique à 50% (0.5, la plage va de 0 à 1)
+    pygame.mixer.music.set_volume(0.5)
+    # Lecture de la musique en boucle infinie (-1 signifie une boucle infinie)
+    pygame.mixer.music.play(-1)
 
 
+def main(record=None, grid_size=GRID_SIZE):
+    """
+    Lance le jeu avec une fenêtre.
 
-def main():
+    record : str ou None
+        Fichier où enregistrer le replay de chaque partie (la dernière partie jouée y reste).
+    grid_size : int
+        Côté de la carte en cases, gardé pour les parties suivantes (menu principal) ;
+        au-delà de VIEW_SIZE, la carte défile (W, A, S, D, ou C pour recentrer).
+    """
+    launch_time = time.perf_counter()  # Pour mesurer le démarrage à froid
     pygame.init()
 
-     # Initialisation du module mixer de Pygame, qui est utilisé pour gérer les sons et la musique
-    pygame.mixer.init() 
-    # Chargement du fichier audio (ici un fichier mp3 nommé "stranger-things-124008.mp3")
-    pygame.mixer.music.load("stranger-things-124008.mp3") 
-
-    # Définition du volume de la musique à 50% (0.5, la plage va de 0 à 1)
-    pygame.mixer.music.set_volume(0.5) 
-    # Lecture de la musique en boucle infinie (-1 signifie une boucle infinie)
-    pygame.mixer.music.play(-1)
-
     #Initialiser la fenêtre
     screen = pygame.display.set_mode((WIDTH+250, HEIGHT))
     pygame.display.set_caption("Mon jeu avec panneau d'informations")
 
 
-     # Afficher l'écran de chargement
+     # Afficher l'écran de chargement : images, sons et musique sont décodés pendant la barre
     show_loading_screen(screen)
+    play_music()
 
     
     #Créer une instance de jeu
     # 创建游戏实例
-    game = Game(screen)
-
-    # 显示菜单
-    # Afficher le menu
-    game.show_menu()
-
-    # 进入主游戏循环
-    # Entrez dans la boucle principale du jeu
-    while True:
-        game.handle_player_turn()
-        game.handle_enemy_turn()
+    game = Game(screen, grid_size=grid_size)
+    game.launch_time = launch_time
+
+    try:
+        # 显示菜单
+        # Afficher le menu
+        game.show_menu()
+        if record is not None:
+            game.start_recording(record)
+
+        # 进入主游戏循环
+        # Entrez dans la boucle principale du jeu
+        while True:
+            game.handle_player_turn()
+            game.handle_enemy_turn()
+    finally:
+        # Les boutons et la croix « Quitter » appellent exit() : on arrête quand même le pool MCTS
+        game.close_planner()
 
 if __name__ == "__main__":
-
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Jeu de stratégie au tour par tour.")
+    parser.add_argument("--record", metavar="FICHIER", help="enregistre le replay de la partie (voir replay.py)")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE, metavar="CASES",
+                        help=f"côté de la carte (au moins {VIEW_SIZE}, la taille de la fenêtre ; défaut {GRID_SIZE})")
+    args = parser.parse_args()
+    if args.grid_size < VIEW_SIZE:
+        parser.error(f"--grid-size doit valoir au moins {VIEW_SIZE}")
+    main(args.record, args.grid_size)
@@ -0,0 +1,98 @@
+"""
+Boucle d'entrée commune des menus, du tour du joueur et des choix de cible : au repos, le processus
+dort dans pygame.event.wait au lieu de tourner sur pygame.event.get ; pendant les animations, la file
+est vidée sans attendre et l'horloge de la Timeline donne la cadence.
+所有菜单、玩家回合和目标选择共用的输入循环：空闲时在 pygame.event.wait 中休眠而不是空转；
+动画期间不等待地取出事件，由 Timeline 的时钟控制帧率。
+"""
+
+import time
+from collections import deque
+
+import pygame
+
+# Seuls ces événements entrent dans la file : les autres (relâchements, molette, saisie de texte...)
+# ne servent à aucun écran et réveilleraient la boucle pour rien
+INPUT_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION,
+                pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)  # La fenêtre est à redessiner
+LATENCY_SAMPLES = 120  # Latences gardées pour les statistiques
+
+
+class InputLoop:
+    """
+    Classe pour attendre les entrées du joueur sans occuper le processeur.
+    在不占用处理器的情况下等待玩家输入的类。
+
+    ...
+    Attributs
+    ---------
+    idle_time : float
+        Secondes passées endormi dans pygame.event.wait depuis le dernier reset_stats().
+        自上次 reset_stats() 以来在 pygame.event.wait 中休眠的秒数。
+    latencies : collections.deque
+        Millisecondes entre l'arrivée d'un clic ou d'une touche et la présentation de l'image qui y répond.
+        从点击或按键到达到显示响应画面之间的毫秒数。
+
+    Méthodes
+    --------
+    events(busy=False)
+        Événements à traiter ; attend le premier si rien n'est en cours.
+        返回待处理的事件；没有动画时等待第一个事件。
+    presented()
+        À appeler quand une image est poussée : mesure la latence de la dernière entrée.
+        每次提交画面时调用：测量最近一次输入的延迟。
+    cpu_share
+        Part du temps processeur utilisée depuis le dernier reset_stats() (1.0 : un cœur plein).
+        自上次 reset_stats() 以来的 CPU 占用比例。
+    """
+
+    def __init__(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(INPUT_EVENTS)
+        self.input_time = None  # Arrivée de la dernière entrée pas encore affichée
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Remet les compteurs de repos, de processeur et de latence à zéro."""
+        self.idle_time = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.started = (time.perf_counter(), time.process_time())
+
+    def events(self, busy=False):
+        """
+        Événements à traiter. Sans animation en cours (busy faux), attend le premier dans pygame.event.wait,
+        puis prend ceux arrivés entre-temps ; avec busy, ne fait que vider la file.
+        Une rafale de mouvements de souris est réduite au dernier.
+        """
+        if busy:
+            events = pygame.event.get()
+        else:
+            start = time.perf_counter()
+            events = [pygame.event.wait()]
+            self.idle_time += time.perf_counter() - start
+            events += pygame.event.get()
+
+        motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                motion = event
+            elif event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN) and self.input_time is None:
+                self.input_time = time.perf_counter()
+        return [event for event in events if event.type != pygame.MOUSEMOTION or event is motion]
+
+    def presented(self):
+        if self.input_time is not None:
+            self.latencies.append((time.perf_counter() - self.input_time) * 1000)
+            self.input_time = None
+
+    @property
+    def cpu_share(self):
+        wall, cpu = self.started
+        elapsed = time.perf_counter() - wall
+        return (time.process_time() - cpu) / elapsed if elapsed else 0.0
+
+    @staticmethod
+    def exposed(event):
+        """Vrai si l'événement demande de redessiner la fenêtre (elle a été recouverte puis découverte)."""
+        return event.type in EXPOSE_EVENTS
@@ -0,0 +1,152 @@
+"""
+Journal des événements du jeu, par sous-système (déplacements, combat, IA, carte, interface),
+construit sur le module logging : niveaux, activation par sous-système et sorties optionnelles
+(tampon circulaire en mémoire, fichier JSON lines) pour le journal de combat.
+游戏事件日志，按子系统（移动、战斗、AI、地图、界面）划分，基于 logging 模块：
+支持日志级别、按子系统开关，以及战斗日志的可选输出（内存环形缓冲区、JSON lines 文件）。
+
+Les messages sont formatés à la demande (log.info("%s a %s PV", nom, pv)) :
+un niveau désactivé ne coûte qu'un test, sans f-string ni écriture sur la console.
+"""
+
+import contextlib
+import json
+import logging
+import sys
+from collections import deque
+
+SUBSYSTEMS = ("movement", "combat", "ai", "map", "ui")
+ROOT = "game"
+
+
+def get_logger(subsystem):
+    """Logger d'un sous-système, ex. get_logger("combat") -> "game.combat"."""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+movement_log = get_logger("movement")
+combat_log = get_logger("combat")
+ai_log = get_logger("ai")
+map_log = get_logger("map")
+ui_log = get_logger("ui")
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Écrit sur le sys.stdout courant (suit les redirections, comme print)."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def record_to_dict(record):
+    """Événement structuré : sous-système, niveau, modèle du message, valeurs et texte final."""
+    return {
+        "time": record.created,
+        "subsystem": record.name.rpartition(".")[2],
+        "level": record.levelname,
+        "event": record.msg,
+        "args": list(record.args) if isinstance(record.args, tuple) else record.args,
+        "message": record.getMessage(),
+    }
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Classe pour garder les derniers événements en mémoire (journal de combat consultable en jeu ou après une partie).
+    在内存中保留最近事件的处理器。
+
+    ...
+    Attributs
+    ---------
+    events : collections.deque
+        Les capacity derniers événements, sous forme de dict (voir record_to_dict).
+        最近 capacity 个事件（字典形式）。
+    """
+
+    def __init__(self, capacity=1000):
+        super().__init__()
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.events.append(record_to_dict(record))
+
+
+class JsonLinesHandler(logging.FileHandler):
+    """Écrit un événement JSON par ligne dans un fichier."""
+
+    def format(self, record):
+        return json.dumps(record_to_dict(record), ensure_ascii=False, default=str)
+
+
+_console = ConsoleHandler()
+_root = logging.getLogger(ROOT)
+_root.addHandler(_console)
+_root.setLevel(logging.INFO)
+_root.propagate = False  # Ne pas dupliquer les messages dans le logger racine de l'application
+
+
+def configure(level=logging.INFO, console=True, disabled=()):
+    """
+    Règle le journal.
+
+    Paramètres
+    ----------
+    level : int
+        Niveau minimal (logging.DEBUG, INFO, WARNING...) pour tous les sous-systèmes.
+    console : bool
+        Afficher les messages dans la console.
+    disabled : iterable
+        Sous-systèmes coupés, ex. ("movement", "ai").
+    """
+    _root.setLevel(level)
+    if console and _console not in _root.handlers:
+        _root.addHandler(_console)
+    elif not console and _console in _root.handlers:
+        _root.removeHandler(_console)
+    for subsystem in SUBSYSTEMS:
+        set_enabled(subsystem, subsystem not in disabled)
+
+
+def set_enabled(subsystem, enabled=True):
+    """Active ou coupe un sous-système ; un sous-système coupé ne formate ni n'écrit rien."""
+    get_logger(subsystem).disabled = not enabled
+
+
+def attach_ring(capacity=1000, subsystem="combat"):
+    """Ajoute un tampon circulaire en mémoire au journal d'un sous-système et le renvoie."""
+    handler = RingBufferHandler(capacity)
+    get_logger(subsystem).addHandler(handler)
+    return handler
+
+
+def attach_jsonl(path, subsystem="combat"):
+    """Ajoute une sortie JSON lines au journal d'un sous-système et la renvoie."""
+    handler = JsonLinesHandler(path, encoding="utf-8")
+    get_logger(subsystem).addHandler(handler)
+    return handler
+
+
+def detach(handler, subsystem="combat"):
+    """Retire (et ferme) une sortie ajoutée par attach_ring ou attach_jsonl."""
+    get_logger(subsystem).removeHandler(handler)
+    handler.close()
+
+
+@contextlib.contextmanager
+def silenced():
+    """Coupe tout le journal le temps d'un bloc (simulations en série, mesures de performance)."""
+    level = _root.level
+    _root.setLevel(logging.CRITICAL + 1)
+    try:
+        yield
+    finally:
+        _root.setLevel(level)
@@ -0,0 +1,212 @@
+"""
+Génération procédurale de la carte : seedée, par blocs (chunks) et vectorisée avec numpy.
+程序化地图生成：带种子、按区块、用 numpy 向量化。
+
+Chaque couche (eau, lave, murs, routes) vient d'un bruit de valeur dont les points du réseau sont
+hachés à partir de la graine et de leurs coordonnées : un bloc se calcule seul, sans état partagé,
+et les blocs voisins se raccordent sans couture. La carte ne dépend donc que de la graine et de sa taille.
+Une fois la carte posée, un union-find vectorisé vérifie que la zone d'apparition
+des joueurs rejoint celle des ennemis pour chaque règle de déplacement ; sinon un chemin de route est creusé.
+"""
+
+import numpy as np
+
+from terrain import TERRAIN_CODES, GRASS, ROAD, WATER, LAVA, TREE, WALL
+
+CHUNK_SIZE = 128  # Côté d'un bloc de génération
+SPAWN_SIZE = 3  # Zones d'apparition 3x3 dans les coins, toujours en herbe
+
+# Couches de bruit : (échelle en cases, seuil) ; une case prend la couche quand le bruit dépasse le seuil.
+# Les seuils visent à peu près les proportions de l'ancienne carte 16x16 (eau 14 %, lave 4 %, murs 8 %).
+WATER_NOISE = (6, 0.67)
+LAVA_NOISE = (3, 0.8)
+WALL_NOISE = (3, 0.75)
+ROAD_NOISE = (12, 0.035)  # Routes : là où le bruit passe près de 0.5 (lignes de niveau), à cette distance près
+TREE_DENSITY = 0.04  # Proportion d'arbres sur l'herbe restante
+
+# Identifiants des couches pour le hachage
+LAYERS = ("water", "lava", "wall", "road", "tree", "variant", "path")
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(value):
+    """Mélange splitmix64 d'un entier Python (clé d'une couche)."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def layer_key(seed, layer):
+    """Clé 64 bits d'une couche pour une graine."""
+    return _mix(_mix(seed & _MASK) ^ LAYERS.index(layer))
+
+
+def hash_unit(key, ix, iy):
+    """Valeur pseudo-aléatoire dans [0, 1) pour chaque (ix, iy) (tableaux d'entiers), même résultat partout."""
+    z = (ix.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ (iy.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+    z ^= np.uint64(key)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _weights(start, length, scale):
+    """Poids d'interpolation (smoothstep) de chaque case vers les deux points du réseau qui l'encadrent."""
+    cells = np.arange(start, start + length)
+    index = cells // scale - start // scale
+    t = (cells % scale) / scale
+    t = t * t * (3 - 2 * t)
+    weights = np.zeros((length, (start + length - 1) // scale - start // scale + 2))
+    rows = np.arange(length)
+    weights[rows, index] = 1 - t
+    weights[rows, index + 1] = t
+    return weights
+
+
+def value_noise(key, x0, y0, width, height, scale):
+    """
+    Bruit de valeur [x, y] sur le bloc (x0, y0, width, height) : valeurs hachées aux points du réseau
+    (tous les scale cases), interpolées (smoothstep) entre eux. L'interpolation est séparable :
+    deux produits de matrices, poids en x @ réseau @ poids en y.
+    """
+    weights_x = _weights(x0, width, scale)
+    weights_y = _weights(y0, height, scale)
+    lattice_x = np.arange(x0 // scale, x0 // scale + weights_x.shape[1])
+    lattice_y = np.arange(y0 // scale, y0 // scale + weights_y.shape[1])
+    lattice = hash_unit(key, lattice_x[:, None], lattice_y[None, :])
+    return weights_x @ lattice @ weights_y.T
+
+
+def fractal_noise(key, x0, y0, width, height, scale):
+    """Deux octaves de bruit de valeur : formes larges, bords irréguliers."""
+    detail = max(1, scale // 2)
+    return (0.7 * value_noise(key, x0, y0, width, height, scale)
+            + 0.3 * value_noise(key ^ 1, x0, y0, width, height, detail))
+
+
+def generate_chunk(seed, x0, y0, width, height, variant_counts):
+    """Types et variantes [x, y] d'un bloc de la carte (ne dépend que de la graine et de la position)."""
+    def noise(layer, scale):
+        return fractal_noise(layer_key(seed, layer), x0, y0, width, height, scale)
+
+    types = np.full((width, height), GRASS, dtype=np.uint8)
+    # Ordre de l'ancienne génération : chaque couche recouvre les précédentes
+    scale, width_road = ROAD_NOISE
+    types[np.abs(noise("road", scale) - 0.5) < width_road] = ROAD
+    for layer, code, (scale, threshold) in (("water", WATER, WATER_NOISE), ("lava", LAVA, LAVA_NOISE)):
+        types[noise(layer, scale) > threshold] = code
+    xs = np.arange(x0, x0 + width)[:, None]
+    ys = np.arange(y0, y0 + height)[None, :]
+    trees = hash_unit(layer_key(seed, "tree"), xs, ys) < TREE_DENSITY
+    types[trees & (types == GRASS)] = TREE
+    scale, threshold = WALL_NOISE
+    types[noise("wall", scale) > threshold] = WALL
+
+    variants = np.zeros((width, height), dtype=np.uint8)
+    pick = hash_unit(layer_key(seed, "variant"), xs, ys)
+    for name, count in variant_counts.items():
+        cells = types == TERRAIN_CODES[name]
+        variants[cells] = (pick[cells] * count).astype(np.uint8)
+    return types, variants
+
+
+def spawn_zones(size):
+    """Coins (x0, y0) des zones d'apparition des joueurs et des ennemis."""
+    return (0, 0), (size - SPAWN_SIZE, size - SPAWN_SIZE)
+
+
+def _run_ids(passable):
+    """Numéro de la suite de cases franchissables (le long de l'axe y) de chaque case, 0 si bloquée."""
+    starts = passable.copy()
+    starts[:, 1:] &= ~passable[:, :-1]
+    ids = np.cumsum(starts, dtype=np.int64).reshape(passable.shape)
+    ids[~passable] = 0
+    return ids, int(ids.max())
+
+
+def label_regions(passable):
+    """
+    Numéro de région [x, y] de chaque case franchissable (4 directions), 0 pour les cases bloquées.
+
+    Union-find vectorisé sur les suites de cases : chaque suite le long de y est un nœud, reliée aux suites
+    qu'elle touche dans la colonne suivante. À chaque passe, chaque nœud est accroché au plus petit
+    représentant de ses voisins, puis les chaînes sont raccourcies (saut de pointeurs) ; il faut
+    quelques passes, quel que soit le nombre de virages des chemins.
+    """
+    ids, count = _run_ids(passable)
+    touching = passable[:-1] & passable[1:]
+    edges = np.unique(ids[:-1][touching] * (count + 1) + ids[1:][touching])
+    a, b = edges // (count + 1), edges % (count + 1)
+    parent = np.arange(count + 1)
+    while True:
+        low = np.minimum(parent[a], parent[b])
+        before = parent.copy()
+        np.minimum.at(parent, parent[a], low)
+        np.minimum.at(parent, parent[b], low)
+        while not np.array_equal(parent, jumped := parent[parent]):
+            parent = jumped
+        if np.array_equal(parent, before):
+            return parent[ids]
+
+
+def connected(types, blocked_codes):
+    """Vrai si les deux zones d'apparition se rejoignent sans passer par ces codes de terrain."""
+    (px, py), (ex, ey) = spawn_zones(len(types))
+    regions = label_regions(~np.isin(types, blocked_codes))
+    return bool(np.isin(regions[ex:ex + SPAWN_SIZE, ey:ey + SPAWN_SIZE], regions[px, py]).any())
+
+
+def carve_path(types, variants, seed, blocked_codes):
+    """
+    Creuse une route entre les zones d'apparition : chemin monotone tiré au hasard (pas en x et en y mélangés),
+    seules ses cases bloquantes deviennent de la route.
+    """
+    (px, py), (ex, ey) = spawn_zones(len(types))
+    start, goal = px + SPAWN_SIZE - 1, ex
+    steps = goal - start
+    if steps <= 0:
+        return
+    order = np.random.default_rng([layer_key(seed, "path")]).permutation(2 * steps) < steps
+    xs = start + np.concatenate(([0], np.cumsum(order)))
+    ys = start + np.concatenate(([0], np.cumsum(~order)))
+    blocked = np.isin(types[xs, ys], blocked_codes)
+    types[xs[blocked], ys[blocked]] = ROAD
+    variants[xs[blocked], ys[blocked]] = 0
+
+
+def generate(size, seed, variant_counts=None, movement_rules=()):
+    """
+    Génère une carte size x size.
+
+    variant_counts : nombre de variantes d'image par type de terrain, ex. {"grass": 1, "water": 2}.
+    movement_rules : types de terrain bloquants de chaque règle de déplacement ; les zones d'apparition
+    doivent se rejoindre pour chacune.
+
+    Retourne (types, variants), deux tableaux uint8 indexés par [x, y].
+    """
+    variant_counts = variant_counts or {}
+    types = np.empty((size, size), dtype=np.uint8)
+    variants = np.empty((size, size), dtype=np.uint8)
+    for x0 in range(0, size, CHUNK_SIZE):
+        for y0 in range(0, size, CHUNK_SIZE):
+            width, height = min(CHUNK_SIZE, size - x0), min(CHUNK_SIZE, size - y0)
+            chunk = generate_chunk(seed, x0, y0, width, height, variant_counts)
+            types[x0:x0 + width, y0:y0 + height], variants[x0:x0 + width, y0:y0 + height] = chunk
+
+    for x0, y0 in spawn_zones(size):
+        types[x0:x0 + SPAWN_SIZE, y0:y0 + SPAWN_SIZE] = GRASS
+        variants[x0:x0 + SPAWN_SIZE, y0:y0 + SPAWN_SIZE] = 0
+
+    # Si les zones se rejoignent en évitant tous les terrains bloquants à la fois, chaque règle est satisfaite
+    rules = [[TERRAIN_CODES[name] for name in blocked] for blocked in movement_rules]
+    every = sorted({code for codes in rules for code in codes})
+    if rules and not connected(types, every):
+        cut = [codes for codes in rules if not connected(types, codes)]
+        if cut:
+            carve_path(types, variants, seed, sorted({code for codes in cut for code in codes}))
+    return types, variants
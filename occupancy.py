@@ -0,0 +1,101 @@
+"""
+Index des unités par case : « qui est sur (x, y) » et « cette case est-elle libre » en temps constant.
+按格子索引单位：常数时间查询“谁在 (x, y)”和“该格是否空闲”。
+"""
+
+import numpy as np
+
+# Codes d'équipe stockés dans la grille
+EMPTY, PLAYER, ENEMY = 0, 1, 2
+TEAM_CODES = {"player": PLAYER, "enemy": ENEMY}
+
+
+class OccupancyGrid:
+    """
+    Classe pour représenter l'occupation des cases de la carte.
+    表示地图格子占用情况的类。
+
+    ...
+    Attributs
+    ---------
+    cells : numpy.ndarray
+        L'unité présente sur chaque case (ou None), indexée par [x, y].
+        每个格子上的单位（或 None），按 [x, y] 索引。
+    teams : numpy.ndarray
+        Code d'équipe de chaque case (EMPTY, PLAYER ou ENEMY), pour les requêtes vectorisées.
+        每个格子的队伍代码，用于向量化查询。
+    version : int
+        Incrémenté à chaque changement, pour invalider les caches (chemins, portées).
+        每次变化时递增，用于使缓存失效。
+
+    Méthodes
+    --------
+    unit_at(x, y)
+        L'unité sur la case, ou None.
+        格子上的单位。
+    is_free(x, y)
+        Vrai si aucune unité n'occupe la case.
+        格子是否空闲。
+    add(unit) / remove(unit) / move(unit, x, y)
+        Tenir l'index à jour quand une unité apparaît, meurt ou se déplace.
+        单位出现、死亡或移动时更新索引。
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = np.full((size, size), None, dtype=object)
+        self.teams = np.zeros((size, size), dtype=np.uint8)
+        self.version = 0
+
+    def rebuild(self, units):
+        """Reconstruit l'index à partir d'une liste d'unités."""
+        self.cells.fill(None)
+        self.teams.fill(EMPTY)
+        for unit in units:
+            self.add(unit)
+
+    def unit_at(self, x, y):
+        """L'unité sur la case (x, y), ou None."""
+        return self.cells[x, y]
+
+    def is_free(self, x, y):
+        """Vrai si aucune unité n'occupe la case (x, y)."""
+        return self.teams[x, y] == EMPTY
+
+    def add(self, unit):
+        """Enregistre une unité sur sa case actuelle."""
+        x, y = unit.position
+        self.cells[x, y] = unit
+        self.teams[x, y] = TEAM_CODES[unit.team]
+        self.version += 1
+
+    def remove(self, unit):
+        """Retire une unité de l'index (mort, bombe)."""
+        x, y = unit.position
+        if self.cells[x, y] is unit:
+            self.cells[x, y] = None
+            self.teams[x, y] = EMPTY
+            self.version += 1
+
+    def move(self, unit, x, y):
+        """Déplace une unité vers (x, y) dans l'index et met à jour sa position."""
+        self.remove(unit)
+        unit.x, unit.y = x, y
+        self.add(unit)
+
+    def occupied_mask(self):
+        """Masque booléen [x, y] des cases occupées."""
+        return self.teams != EMPTY
+
+    def team_mask(self, team):
+        """Masque booléen [x, y] des cases occupées par une équipe ('player' ou 'enemy')."""
+        return self.teams == TEAM_CODES[team]
+
+    def units_in(self, positions, team=None):
+        """Unités présentes sur une liste de cases, éventuellement filtrées par équipe."""
+        units = []
+        for x, y in positions:
+            unit = self.cells[x, y]
+            if unit is not None and (team is None or unit.team == team):
+                units.append(unit)
+        return units
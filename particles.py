@@ -0,0 +1,231 @@
+"""
+Moteur de particules : un pool préalloué de tableaux NumPy (une colonne par propriété),
+mis à jour de façon vectorisée et dessiné seulement dans le rectangle des particules vivantes.
+粒子引擎：预分配的 NumPy 数组池（每个属性一列），向量化更新，只在存活粒子的矩形内绘制。
+
+Les effets de feu, de cœurs et d'explosion sont des préréglages d'émetteurs (emit_fire, emit_hearts, emit_explosion).
+"""
+
+import numpy as np
+import pygame
+
+DEFAULT_CAPACITY = 4096
+FRAME_MS = 1000 / 30  # Vitesses et durées de vie sont exprimées en images de 1/30 s
+
+
+class ParticlePool:
+    """
+    Classe pour représenter toutes les particules du jeu dans des tableaux partagés.
+    用共享数组表示游戏中所有粒子的类。
+
+    ...
+    Attributs
+    ---------
+    capacity : int
+        Nombre maximal de particules vivantes ; au-delà, les nouvelles sont ignorées.
+        最大存活粒子数；超出时新粒子被忽略。
+    x, y, vx, vy : numpy.ndarray
+        Position (pixels) et vitesse (pixels par image).
+        位置（像素）和速度（像素/帧）。
+    size, shrink : numpy.ndarray
+        Rayon et perte de rayon par image.
+        半径及每帧缩小量。
+    color, fade : numpy.ndarray
+        Couleur RGB et variation de couleur par image.
+        RGB 颜色及每帧颜色变化。
+    life, alpha_per_life : numpy.ndarray
+        Images restantes ; l'opacité vaut life * alpha_per_life (plafonnée à 255).
+        剩余帧数；不透明度为 life * alpha_per_life。
+    rng : numpy.random.Generator
+        Tirages des émetteurs (flux cosmétique de la partie, séparé des règles).
+        发射器的随机数（对局的外观随机流，与规则分离）。
+    image : numpy.ndarray
+        Index de l'image à afficher (dans images), ou -1 pour un disque.
+        显示的图片索引，-1 表示圆形。
+    alive : numpy.ndarray
+        Masque des particules vivantes.
+        存活粒子的掩码。
+
+    Méthodes
+    --------
+    emit(count, x, y, ...)
+        Ajoute des particules dans les places libres.
+        在空闲位置加入粒子。
+    update(dt)
+        Fait avancer toutes les particules de dt millisecondes.
+        推进所有粒子 dt 毫秒。
+    draw(screen)
+        Dessine les particules vivantes et renvoie les rectangles touchés.
+        绘制存活粒子并返回受影响的矩形。
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, rng=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.shrink = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.fade = np.zeros((capacity, 3), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.alpha_per_life = np.zeros(capacity, dtype=np.float32)
+        self.image = np.full(capacity, -1, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.images = []  # Images des particules-images (cœurs), partagées
+        self.dropped = 0  # Particules ignorées faute de place
+        self.scratch = None  # Surface de dessin réutilisée d'une image à l'autre
+
+    @property
+    def active(self):
+        return bool(self.alive.any())
+
+    @property
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def image_index(self, image):
+        """Index d'une image de particule, ajoutée au registre si besoin."""
+        for index, known in enumerate(self.images):
+            if known is image:
+                return index
+        self.images.append(image)
+        return len(self.images) - 1
+
+    def emit(self, count, x, y, vx=0.0, vy=0.0, size=4.0, shrink=0.0, color=(255, 255, 255),
+             fade=(0, 0, 0), life=30.0, alpha_per_life=255.0, image=None):
+        """
+        Ajoute count particules. Chaque paramètre est un scalaire ou un tableau de count valeurs
+        (les émetteurs tirent leurs valeurs aléatoires d'un coup avec NumPy).
+
+        Retourne le nombre de particules réellement ajoutées.
+        """
+        slots = np.flatnonzero(~self.alive)[:count]
+        added = len(slots)
+        self.dropped += count - added
+        if not added:
+            return 0
+
+        def take(values, per_particle_ndim=1):
+            # Un tableau d'une valeur par particule est coupé au nombre de places trouvées
+            values = np.asarray(values, dtype=np.float32)
+            return values[:added] if values.ndim == per_particle_ndim else values
+
+        self.x[slots] = take(x)
+        self.y[slots] = take(y)
+        self.vx[slots] = take(vx)
+        self.vy[slots] = take(vy)
+        self.size[slots] = take(size)
+        self.shrink[slots] = take(shrink)
+        self.color[slots] = take(color, 2)
+        self.fade[slots] = take(fade, 2)
+        self.life[slots] = take(life)
+        self.alpha_per_life[slots] = take(alpha_per_life)
+        self.image[slots] = -1 if image is None else self.image_index(image)
+        self.alive[slots] = True
+        return added
+
+    def update(self, dt):
+        """Fait avancer toutes les particules vivantes de dt millisecondes, en une passe vectorisée."""
+        steps = dt / FRAME_MS
+        alive = self.alive
+        self.x[alive] += self.vx[alive] * steps
+        self.y[alive] += self.vy[alive] * steps
+        self.size[alive] -= self.shrink[alive] * steps
+        self.color[alive] = np.clip(self.color[alive] + self.fade[alive] * steps, 0, 255)
+        self.life[alive] -= steps
+        # Une particule meurt quand sa vie est écoulée ou qu'un disque n'a plus de rayon
+        alive &= (self.life > 0) & ((self.size > 0) | (self.image >= 0))
+
+    def clear(self):
+        self.alive[:] = False
+
+    def draw(self, screen):
+        """Dessine les particules vivantes ; renvoie les rectangles touchés (un pour les disques)."""
+        rects = []
+        disks = np.flatnonzero(self.alive & (self.image < 0))
+        if len(disks):
+            rects.append(self.draw_disks(screen, disks))
+        sprites = np.flatnonzero(self.alive & (self.image >= 0))
+        if len(sprites):
+            rects.extend(screen.blits([
+                (self.images[index], (x, y))
+                for index, x, y in zip(self.image[sprites].tolist(), self.x[sprites].tolist(), self.y[sprites].tolist())
+            ]))
+        return rects
+
+    def draw_disks(self, screen, indices):
+        """Dessine des disques semi-transparents dans une surface limitée à leur rectangle englobant."""
+        x, y, size = self.x[indices], self.y[indices], np.ceil(self.size[indices])
+        left, top = int(np.floor((x - size).min())), int(np.floor((y - size).min()))
+        right, bottom = int(np.ceil((x + size).max())) + 1, int(np.ceil((y + size).max())) + 1
+        area = pygame.Rect(left, top, right - left, bottom - top)
+
+        if self.scratch is None or self.scratch.get_width() < area.width or self.scratch.get_height() < area.height:
+            width = max(area.width, self.scratch.get_width() if self.scratch else 0)
+            height = max(area.height, self.scratch.get_height() if self.scratch else 0)
+            self.scratch = pygame.Surface((width, height), pygame.SRCALPHA)
+        local = pygame.Rect(0, 0, area.width, area.height)
+        self.scratch.fill((0, 0, 0, 0), local)
+
+        alpha = np.minimum(self.life[indices] * self.alpha_per_life[indices], 255).astype(np.int32)
+        colors = self.color[indices].astype(np.int32)
+        circle = pygame.draw.circle
+        scratch = self.scratch
+        for px, py, radius, (r, g, b), a in zip((x - left).tolist(), (y - top).tolist(), size.tolist(),
+                                                colors.tolist(), alpha.tolist()):
+            circle(scratch, (r, g, b, a), (px, py), radius)
+        return screen.blit(scratch, area, local)
+
+
+def emit_fire(pool, rect, count=50):
+    """Flammes qui montent d'une case (rect en pixels) en rétrécissant et en passant du jaune au rouge."""
+    rng = pool.rng
+    return pool.emit(
+        count,
+        x=rng.uniform(rect.left, rect.right, count),
+        y=rng.uniform(rect.centery, rect.bottom, count),
+        vy=-rng.uniform(1, 3, count),  # Monte de 1 à 3 pixels par image
+        size=rng.integers(3, 7, count),
+        shrink=1.0,
+        color=np.column_stack([np.full(count, 255), rng.uniform(50, 150, count), np.zeros(count)]),
+        fade=(0, -5, 0),
+        life=rng.uniform(20, 40, count),
+        alpha_per_life=5.0,
+    )
+
+
+def emit_hearts(pool, rect, image, count=8):
+    """Cœurs qui flottent vers le haut depuis une case (rect en pixels)."""
+    rng = pool.rng
+    return pool.emit(
+        count,
+        x=rect.left + rng.uniform(-10, 30, count),
+        y=rect.top + rng.uniform(-10, 10, count),
+        vy=-rng.uniform(1, 2, count),
+        life=30.0,
+        image=image,
+    )
+
+
+def emit_explosion(pool, center, count=120):
+    """Éclats jaunes, orange et rouges projetés en cercle depuis un point, qui s'estompent."""
+    rng = pool.rng
+    angle = rng.uniform(0, 2 * np.pi, count)
+    speed = rng.uniform(1, 5, count)
+    palette = np.array([(255, 255, 0), (255, 165, 0), (255, 0, 0)], dtype=np.float32)  # Jaune, orange, rouge
+    return pool.emit(
+        count,
+        x=center[0],
+        y=center[1],
+        vx=np.cos(angle) * speed,
+        vy=np.sin(angle) * speed,
+        size=rng.uniform(4, 9, count),
+        shrink=0.25,
+        color=palette[rng.integers(0, len(palette), count)],
+        fade=(0, -6, 0),
+        life=rng.uniform(15, 30, count),
+        alpha_per_life=12.0,
+    )
@@ -0,0 +1,226 @@
+"""
+Recherche de chemin A* pour les ennemis, avec coûts par terrain et cache de chemins,
+et cases accessibles en un déplacement (BFS borné) pour toutes les unités.
+敌人的 A* 寻路：按地形计算代价，并缓存路径；以及所有单位一次移动可达的格子（有界 BFS）。
+"""
+
+from array import array
+import heapq
+import math
+
+import numpy as np
+
+from terrain import TERRAIN_TYPES, TERRAIN_CODES, WATER
+
+# Coût pour entrer dans une case, selon son terrain (point de vue des ennemis)
+ENEMY_TERRAIN_COSTS = {
+    "grass": 1.0,
+    "road": 0.5,  # Les routes sont rapides
+    "water": 4.0,  # L'eau fait perdre 3 PV aux ennemis : à éviter si possible
+    "lava": math.inf,  # Infranchissable
+    "tree": 1.0,
+    "wall": math.inf,  # Infranchissable
+}
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+class PathFinder:
+    """
+    Classe pour calculer les chemins des ennemis.
+    计算敌人路径的类。
+
+    ...
+    Attributs
+    ---------
+    terrain : TerrainGrid
+        La grille de terrain.
+        地形网格。
+    occupancy : OccupancyGrid
+        L'index des unités par case (les cases occupées bloquent le passage).
+        单位占用索引（被占用的格子不可通过）。
+    cache : dict
+        Chemins calculés, par (unité, cible), valables pour un état exact de la carte.
+        已计算的路径，按（单位，目标）存储。
+    reach_cache : dict
+        Cases accessibles en un déplacement, par unité.
+        每个单位一次移动可达的格子。
+    hits, misses : int
+        Statistiques du cache.
+        缓存命中与未命中次数。
+
+    Méthodes
+    --------
+    find_path(start, goal, unit_class=None)
+        Chemin le moins coûteux de start à goal, ou None.
+        从 start 到 goal 代价最小的路径。
+    path_to(unit, target)
+        Chemin de l'unité vers sa cible (en cache tant que rien n'a bougé).
+        单位到目标的路径（状态未变时复用缓存）。
+    reachable(unit)
+        Cases où l'unité peut finir son déplacement ce tour, avec leur nombre de pas.
+        单位本回合可移动到的格子及步数。
+    """
+
+    def __init__(self, terrain, occupancy, costs=ENEMY_TERRAIN_COSTS):
+        self.terrain = terrain
+        self.occupancy = occupancy
+        self.costs = np.array([costs[name] for name in TERRAIN_TYPES], dtype=float)
+        self.min_cost = float(self.costs.min())  # Pour une heuristique admissible
+        self.cost_grids = {}
+        self._occupied = (-1, set())
+        self.cache = {}
+        self.reach_cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cost_grid(self, unit_class=None):
+        """
+        Coûts à plat pour une classe d'unité, recalculés si le terrain change. La carte est entourée
+        d'un bord infranchissable : la case (x, y) est à l'index (x + 1) * (size + 2) + y + 1, et A*
+        passe d'une case à sa voisine par un simple décalage, sans tester les limites de la carte.
+        """
+        blocks_water = unit_class is not None and not unit_class.crosses_water
+        key = (self.terrain.version, blocks_water)
+        grid = self.cost_grids.get(key)
+        if grid is None:
+            costs = self.costs[self.terrain.types]
+            if blocks_water:
+                costs[self.terrain.types == WATER] = math.inf  # Sniper et Scout ne nagent pas
+            # array("d") : 8 octets par case, là où une liste de floats Python en coûte 32
+            grid = array("d", np.pad(costs, 1, constant_values=math.inf).tobytes())
+            # On garde les deux variantes (eau permise ou non) du terrain actuel, pas les anciennes versions
+            self.cost_grids = {old: value for old, value in self.cost_grids.items() if old[0] == key[0]}
+            self.cost_grids[key] = grid
+        return grid
+
+    def occupied(self):
+        """Cases occupées (index à plat, avec le bord), recalculées seulement quand l'occupation change."""
+        version = self.occupancy.version
+        if self._occupied[0] != version:
+            size = self.terrain.size
+            cells = np.flatnonzero(self.occupancy.teams)
+            cells += 2 * (cells // size) + size + 3  # Index de la même case dans la grille bordée
+            self._occupied = (version, set(cells.tolist()))
+        return self._occupied[1]
+
+    def find_path(self, start, goal, unit_class=None):
+        """
+        A* sur 4 directions. Les cases occupées bloquent, sauf la case d'arrivée.
+
+        Retourne la liste des cases de start à goal (incluses), ou None si aucun chemin.
+        """
+        width = self.terrain.size + 2  # Bord compris
+        costs = self.cost_grid(unit_class)
+        occupied = self.occupied()
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        start_index = (start_x + 1) * width + start_y + 1
+        goal_index = (goal_x + 1) * width + goal_y + 1
+        moves = [(dx, dy, dx * width + dy) for dx, dy in DIRECTIONS]
+        # Heuristique (distance de Manhattan au coût minimal), calculée seulement pour les cases atteintes
+        min_cost = self.min_cost
+        inf = math.inf
+
+        # Dicts plutôt que des listes de la taille de la carte : une recherche ne paie que les cases atteintes
+        best = {start_index: 0.0}
+        came_from = {}
+        # À estimation égale, on développe d'abord la case la plus avancée (-coût)
+        heap = [((abs(start_x - goal_x) + abs(start_y - goal_y)) * min_cost, -0.0, start_index, start_x, start_y)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            _, cost, index, x, y = pop(heap)
+            cost = -cost
+            if index == goal_index:
+                break
+            if cost > best[index]:
+                continue  # Entrée périmée
+            for dx, dy, offset in moves:
+                neighbour = index + offset
+                if neighbour == goal_index:
+                    step = 1.0
+                else:
+                    step = costs[neighbour]
+                    if step == inf or neighbour in occupied:
+                        continue  # Le bord coûte inf : jamais de case hors de la carte
+                new_cost = cost + step
+                if new_cost < best.get(neighbour, inf):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = index
+                    new_x, new_y = x + dx, y + dy
+                    push(heap, (new_cost + (abs(new_x - goal_x) + abs(new_y - goal_y)) * min_cost,
+                                -new_cost, neighbour, new_x, new_y))
+        else:
+            return None
+
+        path = [goal_index]
+        while path[-1] != start_index:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return [(index // width - 1, index % width - 1) for index in path]
+
+    def path_to(self, unit, target):
+        """
+        Chemin de la case de l'unité jusqu'à celle de la cible, ou None si aucun chemin.
+
+        Le cache n'est qu'une optimisation : une entrée ne sert que si le terrain, l'occupation, l'unité
+        et la cible n'ont pas bougé depuis, c'est-à-dire quand find_path renverrait exactement le même chemin.
+        Les décisions des ennemis ne dépendent donc jamais du contenu du cache.
+        """
+        key = (id(unit), id(target))
+        version = (self.terrain.version, self.occupancy.version, unit.position, target.position)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        path = self.find_path(unit.position, target.position, type(unit))
+        self.cache[key] = (version, path)
+        return path
+
+    def reachable(self, unit):
+        """
+        Cases où l'unité peut finir son déplacement, avec leur nombre de pas : BFS d'au plus unit.speed pas
+        (4 directions), sans traverser de case occupée ni de terrain interdit à sa classe et à son équipe
+        (règles de Unit.move). Un pas coûte toujours 1 : la vitesse compte des cases, pas un coût de terrain.
+
+        Le résultat est gardé jusqu'au prochain changement du terrain, de l'occupation ou de l'unité ;
+        la portée affichée, la validation des clics et l'IA du joueur lisent le même dict.
+        """
+        store, row = unit.store, unit.index
+        position, speed = (store.x.item(row), store.y.item(row)), store.speed.item(row)
+        key = (self.terrain.version, self.occupancy.version, position, speed)
+        entry = self.reach_cache.get(id(unit))
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        size = self.terrain.size
+        types, teams = self.terrain.types, self.occupancy.teams
+        blocked = {TERRAIN_CODES[name] for name in unit.blocked_terrain(unit.team)}
+        steps = {position: 0}
+        frontier = [position]
+        for step in range(1, speed + 1):
+            reached = []
+            for x, y in frontier:
+                for dx, dy in DIRECTIONS:
+                    cell = new_x, new_y = x + dx, y + dy
+                    if (0 <= new_x < size and 0 <= new_y < size and cell not in steps
+                            and types.item(new_x, new_y) not in blocked and not teams.item(new_x, new_y)):
+                        steps[cell] = step
+                        reached.append(cell)
+            frontier = reached
+        del steps[position]  # Rester sur place n'est pas un déplacement
+        self.reach_cache[id(unit)] = (key, steps)
+        return steps
+
+    def forget(self, unit):
+        """Oublie les chemins d'une unité (morte ou retirée), qu'elle soit le chasseur ou la cible."""
+        for key in [key for key in self.cache if id(unit) in key]:
+            del self.cache[key]
+        self.reach_cache.pop(id(unit), None)
+
+    def clear(self):
+        """Oublie tous les chemins et toutes les cases accessibles (nouvelle partie, chargement)."""
+        self.cache.clear()
+        self.reach_cache.clear()
@@ -0,0 +1,568 @@
+"""
+IA ennemie par recherche arborescente Monte Carlo (MCTS) sur les actions conjointes des ennemis :
+déplacement, attaque et compétences de classe de chaque ennemi, dans l'ordre du tour.
+基于蒙特卡洛树搜索（MCTS）的敌方 AI：在敌方单位的联合行动（移动、攻击、职业技能）上搜索。
+
+Les parties simulées (rollouts) utilisent un modèle tactique compact (TacticalState) qui reprend
+les règles du jeu : formules de combat.py, formes de shapes.py, terrain bloquant des ennemis.
+Les zones de soin, les bombes et les bonus sont ignorés ; côté joueur, la politique reprend l'IA de simulation.py.
+
+Parallélisation à la racine : chaque processus du pool construit son propre arbre à partir du même état,
+lu dans un bloc de mémoire partagée (multiprocessing.shared_memory) plutôt que picklé ; les statistiques
+des arbres sont additionnées à la fin du budget.
+
+Le budget est un temps de réflexion, un nombre de rollouts, ou les deux (le premier atteint arrête la recherche).
+Les graines des arbres viennent du flux "ai" de la partie (rng.py) : avec un budget en rollouts seulement,
+une même graine de partie redonne les mêmes plans, quelle que soit la vitesse de la machine.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from combat import hits, evades, is_critical, attack_damage, type_multiplier
+from occupancy import PLAYER, ENEMY
+from shapes import SQUARE_1, DISK_2, DIAMOND_3, DISK_6, diamond
+from terrain import LAVA, WALL, WATER
+from unitstore import ATTACK_BITS
+
+PLAN_BUDGET = 0.3  # Secondes de réflexion par tour ennemi
+ROLLOUT_ROUNDS = 3  # Tours complets joués après les actions ennemies avant d'évaluer
+EXPLORATION = 1.4  # Constante d'exploration de l'UCT
+ROLES = ("Pyro", "Medic", "Sniper", "Scout")
+PYRO, MEDIC, SNIPER, SCOUT = range(len(ROLES))
+DIRECTIONS = ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0))
+ABILITIES = (None, "attack", "single", "group")
+MAX_HEALTH = 20
+DIAMOND_1 = diamond(1)  # Portée de l'attaque au contact (distance de Manhattan 1, comme is_target_in_range)
+# Décalages couverts par chaque forme, en ensembles : un rollout teste les unités une à une, sans NumPy
+REACH = {shape: frozenset(shape.offsets) for shape in (DIAMOND_1, SQUARE_1, DISK_2, DIAMOND_3, DISK_6)}
+
+# Colonnes des unités (une ligne par unité), dans l'ordre des index u[0], u[1]... de TacticalState
+FIELDS = ("x", "y", "health", "attack_power", "defense", "accuracy", "evasion", "crit_chance",
+          "team", "role", "weak", "resist")
+# Dans la mémoire partagée : santé et probabilités en float32, tout le reste en int16
+FLOAT_COLUMNS = [FIELDS.index(name) for name in ("health", "accuracy", "evasion", "crit_chance")]
+INTEGER_COLUMNS = [k for k in range(len(FIELDS)) if k not in FLOAT_COLUMNS]
+
+
+class TacticalState:
+    """
+    Classe pour représenter une position de jeu compacte, copiée à chaque rollout.
+    表示紧凑游戏局面的类，每次模拟时复制。
+
+    ...
+    Attributs
+    ---------
+    terrain : numpy.ndarray
+        Codes de terrain [x, y] (la lave du Pyro le modifie).
+        地形代码。
+    units : list[list]
+        Une liste de valeurs (dans l'ordre de FIELDS) par unité, morte ou vivante.
+        每个单位一个数值列表（顺序同 FIELDS）。
+    occupied : dict
+        (x, y) -> index de l'unité, pour les déplacements.
+        格子到单位索引的映射。
+
+    Méthodes
+    --------
+    enemy_actions(i)
+        Actions (dx, dy, capacité) possibles pour l'ennemi i.
+        敌方单位 i 可执行的行动。
+    apply(i, action, rng)
+        Joue une action de l'unité i.
+        执行单位 i 的一个行动。
+    rollout(rng, rounds)
+        Joue quelques tours avec les politiques par défaut et renvoie la valeur pour les ennemis (0 à 1).
+        用默认策略模拟若干回合，返回敌方的价值（0 到 1）。
+    """
+
+    __slots__ = ("terrain", "units", "occupied", "start_health")
+
+    def __init__(self, terrain, units, start_health=None):
+        self.terrain = terrain
+        self.units = units
+        # Une unité vivante peut partager la case d'un mort resté sur la carte : elle passe en priorité
+        order = sorted(range(len(units)), key=lambda i: units[i][2] > 0)
+        self.occupied = {(int(units[i][0]), int(units[i][1])): i for i in order}
+        self.start_health = start_health or {team: self.team_health(team) or 1 for team in (PLAYER, ENEMY)}
+
+    @classmethod
+    def from_arrays(cls, terrain, rows):
+        return cls(np.array(terrain, dtype=np.uint8), [list(map(float, row)) for row in rows])
+
+    def copy(self):
+        state = TacticalState.__new__(TacticalState)
+        state.terrain = self.terrain  # Copié seulement si une lave est posée
+        state.units = [list(unit) for unit in self.units]
+        state.occupied = dict(self.occupied)
+        state.start_health = self.start_health
+        return state
+
+    def team_health(self, team):
+        return sum(max(u[2], 0) for u in self.units if u[8] == team)
+
+    def alive(self, i):
+        return self.units[i][2] > 0
+
+    def living(self, team):
+        return [i for i, u in enumerate(self.units) if u[8] == team and u[2] > 0]
+
+    def in_shape(self, shape, x, y, team=None):
+        """Unités (mortes comprises, comme sur la carte) couvertes par une forme centrée sur (x, y)."""
+        reach = REACH[shape]
+        return [i for i, u in enumerate(self.units)
+                if (team is None or u[8] == team) and (int(u[0]) - x, int(u[1]) - y) in reach]
+
+    def nearest(self, i, candidates, euclidean=False):
+        """Candidat vivant le plus proche de l'unité i (le premier à égalité), ou None."""
+        x, y = self.units[i][0], self.units[i][1]
+        best, best_distance = None, math.inf
+        for j in candidates:
+            unit = self.units[j]
+            if unit[2] <= 0:
+                continue
+            dx, dy = unit[0] - x, unit[1] - y
+            distance = dx * dx + dy * dy if euclidean else abs(dx) + abs(dy)
+            if distance < best_distance:
+                best, best_distance = j, distance
+        return best
+
+    # --- Règles -------------------------------------------------------------------------------
+
+    def take_damage(self, j, damage, attack_type):
+        """Comme Unit.take_damage : faiblesse, résistance, partie entière."""
+        unit = self.units[j]
+        bit = ATTACK_BITS[attack_type]
+        multiplier = type_multiplier(int(unit[10]) & bit, int(unit[11]) & bit).item()
+        unit[2] -= max(0, int(damage * multiplier))
+
+    def can_enter(self, i, x, y):
+        """Un ennemi avance sur une case libre, dans la carte, hors murs et lave (comme le chemin A*)."""
+        size = self.terrain.shape[0]
+        return (0 <= x < size and 0 <= y < size and (x, y) not in self.occupied
+                and self.terrain[x, y] not in (WALL, LAVA))
+
+    def move(self, i, x, y):
+        unit = self.units[i]
+        if self.occupied.get((int(unit[0]), int(unit[1]))) == i:
+            del self.occupied[(int(unit[0]), int(unit[1]))]
+        unit[0], unit[1] = x, y
+        self.occupied[(x, y)] = i
+
+    def ability_target(self, i, ability):
+        """Cible d'une capacité de l'unité i, ou None si la capacité n'a pas d'effet."""
+        unit = self.units[i]
+        x, y, role = int(unit[0]), int(unit[1]), int(unit[9])
+        opponents = PLAYER if unit[8] == ENEMY else ENEMY
+        if ability == "attack":
+            return self.nearest(i, self.in_shape(DIAMOND_1, x, y, opponents))
+        if ability == "single":
+            shape = {PYRO: SQUARE_1, MEDIC: DIAMOND_3, SNIPER: DISK_6, SCOUT: DISK_2}[role]
+            return self.nearest(i, self.in_shape(shape, x, y, opponents), euclidean=role in (SNIPER, SCOUT))
+        if ability == "group":
+            if role == MEDIC:
+                hurt = [j for j in self.in_shape(DISK_2, x, y, unit[8]) if 0 < self.units[j][2] < MAX_HEALTH]
+                return hurt[0] if hurt else None
+            shape = SQUARE_1 if role == SNIPER else DISK_2
+            return self.nearest(i, self.in_shape(shape, x, y, opponents))
+        return None
+
+    def enemy_actions(self, i):
+        """Actions (dx, dy, capacité) de l'ennemi i : un pas ou rester, puis une capacité utile ou rien."""
+        unit = self.units[i]
+        x, y = int(unit[0]), int(unit[1])
+        actions = []
+        for dx, dy in DIRECTIONS:
+            if (dx or dy) and not self.can_enter(i, x + dx, y + dy):
+                continue
+            state = self.copy()
+            if dx or dy:
+                state.move(i, x + dx, y + dy)
+            actions.append((dx, dy, None))
+            actions.extend((dx, dy, ability) for ability in ABILITIES[1:] if state.ability_target(i, ability) is not None)
+        return actions
+
+    def apply(self, i, action, rng):
+        """Joue l'action (dx, dy, capacité) de l'unité i."""
+        dx, dy, ability = action
+        unit = self.units[i]
+        if dx or dy:
+            self.move(i, int(unit[0]) + dx, int(unit[1]) + dy)
+        if ability is not None:
+            self.use(i, ability, rng)
+
+    def use(self, i, ability, rng):
+        """Effet d'une capacité, comme handle_enemy_turn (attaque) et les handle_*_attack des rôles."""
+        target = self.ability_target(i, ability)
+        if target is None:
+            return
+        unit = self.units[i]
+        x, y, role = int(unit[0]), int(unit[1]), int(unit[9])
+        opponents = PLAYER if unit[8] == ENEMY else ENEMY
+        if ability == "attack":
+            self.take_damage(target, unit[3], "melee")
+        elif ability == "single":
+            if role == PYRO:
+                tx, ty = int(self.units[target][0]), int(self.units[target][1])
+                self.terrain = self.terrain.copy()
+                self.terrain[tx, ty] = LAVA
+                self.take_damage(target, 10, "fire")
+            elif role == MEDIC or role == SNIPER:
+                self.take_damage(target, 5 if role == MEDIC else 8, "ranged")
+            else:
+                self.take_damage(target, 5, "melee")
+        elif role == PYRO:
+            for j in self.in_shape(DISK_2, x, y):
+                self.take_damage(j, 8, "fire")
+        elif role == MEDIC:
+            for j in self.in_shape(DISK_2, x, y, unit[8]):
+                health = self.units[j][2]
+                if health > 0:  # Comme Medic.handle_group_attack : les morts restent morts
+                    self.units[j][2] = min(health + (5 if health <= 10 else 3), MAX_HEALTH)
+        elif role == SNIPER:
+            for j in self.in_shape(SQUARE_1, x, y, opponents):
+                self.units[j][4] = max(0, self.units[j][4] - 5)
+        else:
+            for j in self.in_shape(DISK_2, x, y, opponents):
+                self.units[j][3] = max(0, self.units[j][3] - 2)
+        self.clear_dead(opponents)
+
+    def clear_dead(self, team):
+        """Les joueurs morts sont retirés de la carte (handle_enemy_turn) ; leur case se libère."""
+        if team != PLAYER:
+            return
+        for position, j in list(self.occupied.items()):
+            if self.units[j][8] == PLAYER and self.units[j][2] <= 0:
+                del self.occupied[position]
+
+    # --- Politiques par défaut ----------------------------------------------------------------
+
+    def default_enemy_action(self, i, rng):
+        """Un pas vers le joueur le plus proche, puis une capacité utile au hasard."""
+        target = self.nearest(i, self.living(PLAYER))
+        unit = self.units[i]
+        x, y = int(unit[0]), int(unit[1])
+        best = (0, 0)
+        if target is not None:
+            tx, ty = self.units[target][0], self.units[target][1]
+            distance = abs(tx - x) + abs(ty - y)
+            for dx, dy in DIRECTIONS[1:]:
+                if self.can_enter(i, x + dx, y + dy) and abs(tx - x - dx) + abs(ty - y - dy) < distance:
+                    best = (dx, dy)
+                    break
+        if best != (0, 0):
+            self.move(i, x + best[0], y + best[1])
+        usable = [ability for ability in ABILITIES[1:] if self.ability_target(i, ability) is not None]
+        if usable:
+            self.use(i, rng.choice(usable), rng)
+
+    def player_action(self, i, rng):
+        """Politique du joueur reprise de simulation.py : compétence utile, sinon un pas puis l'attaque simple."""
+        target = self.nearest(i, self.living(ENEMY))
+        if target is None:
+            return
+        unit, enemy = self.units[i], self.units[target]
+        dx, dy = enemy[0] - unit[0], enemy[1] - unit[1]
+        role = int(unit[9])
+        if role == PYRO and max(abs(dx), abs(dy)) <= 1:
+            ability = "single"
+        elif role == PYRO and dx * dx + dy * dy <= 4:
+            ability = "group"
+        elif role == MEDIC and unit[2] <= 10:
+            ability = "group"
+        elif role == MEDIC and abs(dx) + abs(dy) <= 3:
+            ability = "single"
+        elif role == SNIPER and dx * dx + dy * dy <= 36 or role == SCOUT and dx * dx + dy * dy <= 4:
+            ability = "single"
+        else:
+            ability = None
+        if ability is not None and self.ability_target(i, ability) is not None:
+            self.use(i, ability, rng)
+            return
+        self.player_step(i, enemy)
+        if abs(enemy[0] - unit[0]) + abs(enemy[1] - unit[1]) <= 1:
+            self.player_attack(i, target, rng)
+
+    def player_step(self, i, enemy):
+        """Un pas (Unit.move) vers l'ennemi : pas d'eau pour les joueurs, la lave brûle."""
+        unit = self.units[i]
+        x, y = int(unit[0]), int(unit[1])
+        size = self.terrain.shape[0]
+        for dx, dy in sorted(DIRECTIONS[1:], key=lambda d: abs(x + d[0] - enemy[0]) + abs(y + d[1] - enemy[1])):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < size and 0 <= ny < size and (nx, ny) not in self.occupied and self.terrain[nx, ny] != WATER:
+                self.move(i, nx, ny)
+                if self.terrain[nx, ny] == LAVA:
+                    unit[2] -= 2
+                    unit[4] = max(0, unit[4] - 1)
+                return
+
+    def player_attack(self, i, target, rng):
+        """Unit.attack, avec les formules de combat.py."""
+        unit, enemy = self.units[i], self.units[target]
+        if not hits(rng.random(), unit[5]) or evades(rng.random(), enemy[6]):
+            return
+        enemy[2] -= attack_damage(unit[3], enemy[4], is_critical(rng.random(), unit[7])).item()
+
+    def value(self):
+        """Valeur de la position pour les ennemis, entre 0 (défaite) et 1 (victoire)."""
+        players = self.team_health(PLAYER) / self.start_health[PLAYER]
+        enemies = self.team_health(ENEMY) / self.start_health[ENEMY]
+        if players <= 0:
+            return 1.0
+        if enemies <= 0:
+            return 0.0
+        return (1 + enemies - players) / 2
+
+    def rollout(self, rng, rounds=ROLLOUT_ROUNDS):
+        for _ in range(rounds):
+            for i in self.living(PLAYER):
+                if self.alive(i):
+                    self.player_action(i, rng)
+            for i in self.living(ENEMY):
+                if self.alive(i):
+                    self.default_enemy_action(i, rng)
+            if not self.living(PLAYER) or not self.living(ENEMY):
+                break
+        return self.value()
+
+
+class Node:
+    """Nœud de l'arbre : un préfixe d'actions ennemies pour ce tour."""
+
+    __slots__ = ("children", "untried", "visits", "total")
+
+    def __init__(self, actions):
+        self.children = {}
+        self.untried = list(actions)
+        self.visits = 0
+        self.total = 0.0
+
+    def select(self):
+        """Enfant qui maximise l'UCT."""
+        log_visits = math.log(self.visits)
+        return max(self.children.items(),
+                   key=lambda item: item[1].total / item[1].visits + EXPLORATION * math.sqrt(log_visits / item[1].visits))
+
+
+def search(state, order, deadline, seed, max_iterations=None):
+    """
+    Construit un arbre MCTS à partir de state, jusqu'à deadline (time.perf_counter, math.inf pour ne pas
+    s'arrêter au temps) ou jusqu'à max_iterations rollouts.
+
+    order : list[int]
+        Index des ennemis qui jouent, dans l'ordre du tour ; le niveau k de l'arbre est l'action de order[k].
+    Retourne les statistiques {préfixe d'actions: (visites, valeur totale)} de tous les nœuds.
+    """
+    rng = random.Random(seed)
+    root = Node(state.enemy_actions(order[0]))
+    iterations = 0
+    while time.perf_counter() < deadline and (max_iterations is None or iterations < max_iterations):
+        iterations += 1
+        current, path, node = state.copy(), [root], root
+        depth = 0
+        # Sélection puis expansion d'un nouvel enfant
+        while depth < len(order):
+            unit = order[depth]
+            if node.untried:
+                action = node.untried.pop(rng.randrange(len(node.untried)))
+                if current.alive(unit):
+                    current.apply(unit, action, rng)
+                depth += 1
+                following = order[depth] if depth < len(order) else None
+                child = Node(current.enemy_actions(following) if following is not None and current.alive(following)
+                             else [(0, 0, None)] if following is not None else [])
+                node.children[action] = child
+                path.append(child)
+                node = child
+                break
+            if not node.children:
+                break
+            action, node = node.select()
+            if current.alive(unit):
+                current.apply(unit, action, rng)
+            path.append(node)
+            depth += 1
+        # Les ennemis restants jouent la politique par défaut, puis quelques tours complets
+        for unit in order[depth:]:
+            if current.alive(unit):
+                current.default_enemy_action(unit, rng)
+        value = current.rollout(rng)
+        for visited in path:
+            visited.visits += 1
+            visited.total += value
+
+    statistics = {}
+    stack = [((), root)]
+    while stack:
+        prefix, node = stack.pop()
+        statistics[prefix] = (node.visits, node.total)
+        stack.extend((prefix + (action,), child) for action, child in node.children.items())
+    return statistics
+
+
+def best_plan(statistics, depth):
+    """Suite d'actions la plus visitée, niveau par niveau, dans des statistiques (éventuellement fusionnées)."""
+    plan, prefix = [], ()
+    for _ in range(depth):
+        children = [(visits, total, key[-1]) for key, (visits, total) in statistics.items()
+                    if len(key) == len(prefix) + 1 and key[:-1] == prefix]
+        if not children:
+            plan.append((0, 0, None))
+            prefix += ((0, 0, None),)
+            continue
+        _, _, action = max(children, key=lambda child: (child[0], child[1]))
+        plan.append(action)
+        prefix += (action,)
+    return plan
+
+
+def merge(statistics_list):
+    merged = {}
+    for statistics in statistics_list:
+        for key, (visits, total) in statistics.items():
+            old_visits, old_total = merged.get(key, (0, 0.0))
+            merged[key] = (old_visits + visits, old_total + total)
+    return merged
+
+
+# --- Processus de travail et mémoire partagée ------------------------------------------------
+
+def offsets(size, count):
+    """Début des colonnes flottantes, des colonnes entières, et taille du bloc partagé (en octets)."""
+    floats_at = -(-size * size // 4) * 4  # Après le terrain, aligné pour float32
+    integers_at = floats_at + 4 * count * len(FLOAT_COLUMNS)
+    return floats_at, integers_at, integers_at + 2 * count * len(INTEGER_COLUMNS)
+
+
+def views(buffer, size, count):
+    """Vues typées sur un bloc partagé : terrain uint8 [size, size], colonnes float32 et int16 des unités [count, k]."""
+    floats_at, integers_at, _ = offsets(size, count)
+    terrain = np.ndarray((size, size), dtype=np.uint8, buffer=buffer)
+    floats = np.ndarray((count, len(FLOAT_COLUMNS)), dtype=np.float32, buffer=buffer, offset=floats_at)
+    integers = np.ndarray((count, len(INTEGER_COLUMNS)), dtype=np.int16, buffer=buffer, offset=integers_at)
+    return terrain, floats, integers
+
+
+def pack(terrain, rows):
+    """Copie le terrain et les unités dans un nouveau bloc de mémoire partagée ; renvoie (bloc, description)."""
+    size, count = terrain.shape[0], len(rows)
+    table = np.asarray(rows, dtype=np.float64)
+    block = shared_memory.SharedMemory(create=True, size=offsets(size, count)[2])
+    shared_terrain, floats, integers = views(block.buf, size, count)
+    shared_terrain[:] = terrain
+    floats[:] = table[:, FLOAT_COLUMNS]
+    integers[:] = table[:, INTEGER_COLUMNS]
+    del shared_terrain, floats, integers  # Libérer les vues avant close()
+    return block, (block.name, size, count)
+
+
+def unpack(layout):
+    """Lit l'état dans le bloc partagé (dans un processus de travail) et le détache."""
+    name, size, count = layout
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name=name)
+        # Avant Python 3.13, s'attacher à un bloc l'inscrit aussi auprès du resource_tracker de ce processus,
+        # qui le détruirait à sa sortie (et signalerait une fuite) alors qu'il appartient au processus principal.
+        # Le tracker l'a inscrit sous _name (avec le « / » initial que block.name retire) : c'est ce nom-là
+        # qu'il faut désinscrire.
+        resource_tracker.unregister(block._name, "shared_memory")
+    shared_terrain, floats, integers = views(block.buf, size, count)
+    table = np.empty((count, len(FIELDS)))
+    table[:, FLOAT_COLUMNS] = floats
+    table[:, INTEGER_COLUMNS] = integers
+    state = TacticalState.from_arrays(shared_terrain, table)  # from_arrays copie le terrain
+    del shared_terrain, floats, integers
+    block.close()
+    return state
+
+
+def deadline(budget):
+    """Fin de la recherche pour un budget en secondes (None : pas de limite de temps)."""
+    return math.inf if budget is None else time.perf_counter() + budget
+
+
+def worker_search(layout, order, budget, seed, max_iterations=None):
+    """Tâche d'un processus du pool : arbre indépendant sur l'état partagé, dans le budget donné."""
+    state = unpack(layout)
+    return search(state, order, deadline(budget), seed, max_iterations)
+
+
+class Planner:
+    """
+    Classe pour choisir les actions des ennemis par MCTS, avec un pool de processus.
+    使用进程池通过 MCTS 选择敌方行动的类。
+
+    ...
+    Attributs
+    ---------
+    budget : float ou None
+        Temps de réflexion par tour, en secondes ; None pour ne compter que les rollouts.
+        每回合思考时间（秒）；None 表示只按模拟次数限制。
+    max_iterations : int ou None
+        Rollouts par tour, tous processus confondus ; seul ce budget rend les plans reproductibles.
+        每回合的模拟次数（所有进程合计）；只有这种预算能让计划可复现。
+    workers : int
+        Nombre de processus (1 : recherche dans le processus du jeu, sans pool).
+        进程数（1 表示在游戏进程内搜索）。
+    iterations : int
+        Rollouts joués au dernier tour, tous processus confondus.
+        上一回合所有进程的模拟次数。
+    """
+
+    def __init__(self, budget=PLAN_BUDGET, workers=None, max_iterations=None):
+        if budget is None and max_iterations is None:
+            raise ValueError("Il faut un budget en secondes, en rollouts, ou les deux")
+        self.budget = budget
+        self.max_iterations = max_iterations
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.iterations = 0
+
+    def plan(self, game):
+        """Renvoie [(ennemi, (dx, dy, capacité))] pour les ennemis vivants, dans l'ordre du tour."""
+        store = game.unit_store
+        rows = np.flatnonzero(store.placed())  # Les morts encore sur la carte bloquent leur case
+        order = [k for k, index in enumerate(rows) if store.team[index] == ENEMY and store.health[index] > 0]
+        if not order or not store.live("player").any():
+            return []
+        table = [[getattr(store, field).item(index) for field in FIELDS[:8]]
+                 + [store.team.item(index), ROLES.index(store.units[index].__class__.__name__),
+                    store.weak.item(index), store.resist.item(index)]
+                 for index in rows]
+        seed = game.rng.ai.getrandbits(32)  # Flux de la partie : mêmes arbres pour une même graine
+
+        if self.workers <= 1:
+            state = TacticalState.from_arrays(game.terrain.types, table)
+            statistics = search(state, order, deadline(self.budget), seed, self.max_iterations)
+        else:
+            if self.pool is None:
+                self.pool = multiprocessing.get_context().Pool(self.workers)
+            block, layout = pack(game.terrain.types, table)
+            # Le budget en rollouts est partagé entre les processus (les premiers en font un de plus)
+            shares = [None if self.max_iterations is None else self.max_iterations // self.workers
+                      + (k < self.max_iterations % self.workers) for k in range(self.workers)]
+            try:
+                results = self.pool.starmap(
+                    worker_search, [(layout, order, self.budget, seed + k, shares[k]) for k in range(self.workers)])
+            finally:
+                block.close()
+                block.unlink()
+            statistics = merge(results)
+        self.iterations = statistics[()][0]
+        return [(store.units[rows[k]], action) for k, action in zip(order, best_plan(statistics, len(order)))]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,130 @@
+"""
+Présentation de l'écran par rectangles modifiés.
+按脏矩形刷新屏幕。
+
+Au lieu de pousser toute la fenêtre (pygame.display.flip) à chaque dessin,
+on ne pousse que les zones abîmées avec pygame.display.update(rects).
+"""
+
+import pygame
+
+
+class Renderer:
+    """
+    Classe pour présenter l'écran au moniteur.
+    负责把屏幕内容提交到显示器的类。
+
+    ...
+    Attributs
+    ---------
+    screen : pygame.Surface
+        La surface de la fenêtre du jeu.
+        游戏窗口的绘制表面。
+    dirty_rects : bool
+        Si faux, chaque présentation est un display.flip complet (mode de repli).
+        为 False 时每次都整屏刷新（后备模式）。
+    last_frame_pixels : int
+        Nombre de pixels poussés lors de la dernière présentation.
+        上一次提交的像素数量。
+    frames : int
+        Nombre de présentations depuis la création ou le dernier reset_stats().
+        提交次数。
+    pixels_presented : int
+        Total des pixels poussés sur ces présentations.
+        提交的像素总数。
+
+    Méthodes
+    --------
+    present(rects=None)
+        Pousse des rectangles dessinés par une animation (ou tout l'écran si None).
+        提交动画绘制的矩形（None 表示整屏）。
+    present_frame(damage)
+        Pousse une image complète du jeu, limitée aux zones abîmées.
+        提交一帧完整画面，只刷新被修改的区域。
+    """
+
+    def __init__(self, screen, dirty_rects=True):
+        self.screen = screen
+        self.dirty_rects = dirty_rects
+        self.full = True  # La prochaine image complète doit être poussée en entier
+        self.pending = []  # Zones dessinées par-dessus l'image, à nettoyer à la prochaine image
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Remet les compteurs de pixels à zéro."""
+        self.last_frame_pixels = 0
+        self.frames = 0
+        self.pixels_presented = 0
+
+    @property
+    def screen_pixels(self):
+        return self.screen.get_width() * self.screen.get_height()
+
+    @property
+    def average_frame_pixels(self):
+        """Nombre moyen de pixels poussés par présentation."""
+        return self.pixels_presented / self.frames if self.frames else 0
+
+    @property
+    def overlaid(self):
+        """Vrai si quelque chose a été dessiné par-dessus la dernière image complète (jusqu'à la suivante)."""
+        return bool(self.pending)
+
+    def invalidate(self):
+        """Force la prochaine image complète à être poussée en entier (après un menu par exemple)."""
+        self.full = True
+
+    def present(self, rects=None):
+        """
+        Pousse à l'écran ce qu'une animation vient de dessiner.
+
+        Paramètres
+        ----------
+        rects : list[pygame.Rect] ou pygame.Rect ou None
+            Zones dessinées. Avec None, toute la fenêtre est poussée
+            et l'image suivante du jeu sera redessinée en entier.
+        """
+        if rects is None:
+            self.full = True
+            self.flip()
+            return
+        if isinstance(rects, pygame.Rect):
+            rects = [rects]
+        # Ces pixels seront effacés par la prochaine image : on les repoussera alors
+        self.pending.extend(rects)
+        self.update(rects)
+
+    def present_frame(self, damage):
+        """Pousse une image complète du jeu : seules les zones abîmées et les restes d'animations."""
+        rects = self.pending + list(damage)
+        self.pending = []
+        if self.full:
+            self.full = False
+            self.flip()
+        else:
+            self.update(rects)
+
+    def flip(self):
+        pygame.display.flip()
+        self.count(self.screen_pixels)
+
+    def update(self, rects):
+        if not self.dirty_rects:
+            self.flip()
+            return
+        bounds = self.screen.get_rect()
+        clipped = [bounds.clip(rect) for rect in rects]
+        clipped = [rect for rect in clipped if rect.width and rect.height]
+        pixels = sum(rect.width * rect.height for rect in clipped)
+        if pixels >= self.screen_pixels:
+            # Plus rapide de tout pousser que de découper
+            self.flip()
+            return
+        if clipped:
+            pygame.display.update(clipped)
+        self.count(pixels)
+
+    def count(self, pixels):
+        self.last_frame_pixels = pixels
+        self.frames += 1
+        self.pixels_presented += pixels
@@ -0,0 +1,284 @@
+"""
+Replays : la graine de la partie et le flux des commandes du joueur, dans un fichier binaire compact.
+回放：对局种子和玩家命令流，保存在紧凑的二进制文件中。
+
+La partie est déterministe pour une graine (rng.py) : rejouer les commandes sur Game(None, seed)
+redonne exactement la même partie, sans affichage et à pleine vitesse. Des keyframes (état complet
+compressé : snapshot.py et état des flux aléatoires) sont écrites tous les KEYFRAME_INTERVAL tours ennemis,
+pour se placer au tour N sans tout resimuler depuis le tour 0.
+
+Format (petit-boutiste) :
+    en-tête   : "TRPL", version (B), graine (Q), intervalle des keyframes (H), mode (B), unité active (b), IA ennemie (B),
+                côté de la carte (H)
+    commande  : type (B), ligne de l'unité (B), a (h), b (h)                         -> 6 octets
+    keyframe  : commande KEYFRAME (a = tour), puis longueur (I) et état compressé (zlib) :
+                flux des règles (RandomStreams.dumps) suivis d'un snapshot (snapshot.dumps)
+
+Usage : python replay.py partie.rpl [--turn N]
+"""
+
+import argparse
+import struct
+import time
+import zlib
+
+from rng import STATE_SIZE
+
+MAGIC = b"TRPL"
+VERSION = 3  # 2 : keyframes en snapshot binaire ; 3 : côté de la carte dans l'en-tête
+KEYFRAME_INTERVAL = 10  # Tours ennemis entre deux keyframes
+HEADER = struct.Struct("<4sBQHBbBH")
+COMMAND = struct.Struct("<BBhh")
+LENGTH = struct.Struct("<I")
+
+# Types de commande
+MOVE = 1  # Unit.move(a, b)
+REACT = 2  # Réaction des ennemis au déplacement de l'unité (handle_enemy_reaction)
+SINGLE = 3  # Attaque unique ; a, b : case visée (Pyro) ou ligne de la cible (Medic, dans a)
+GROUP = 4  # Attaque de groupe
+DEFENSE = 5  # Compétence de défense
+ATTACK = 6  # Unit.attack ; a : ligne de la cible
+HEALTH = 7  # Fin de l'action de l'unité : zone de soin puis vérification de la victoire
+RESET = 8  # Game.reset_actions
+TURN = 9  # Tour des ennemis
+PLAN = 10  # Action d'un ennemi choisie par MCTS ; a : direction, b : capacité (planner.ABILITIES)
+KEYFRAME = 11
+
+MODES = ("Group", "One Player")
+CLASSES = ("Pyro", "Medic", "Scout", "Sniper")
+
+
+def encode_step(dx, dy):
+    return (dx + 1) * 3 + dy + 1
+
+
+def decode_step(code):
+    return code // 3 - 1, code % 3 - 1
+
+
+class Recorder:
+    """
+    Classe pour enregistrer un replay pendant une partie.
+    在对局中录制回放的类。
+
+    ...
+    Attributs
+    ---------
+    path : str
+        Le fichier du replay.
+        回放文件。
+    turn : int
+        Tours ennemis joués depuis le début de l'enregistrement.
+        录制开始后已进行的敌方回合数。
+
+    Méthodes
+    --------
+    command(kind, unit, a, b)
+        Ajoute une commande (6 octets).
+        添加一条命令（6 字节）。
+    end_turn(game)
+        Compte un tour ennemi et écrit une keyframe tous les keyframe_interval tours.
+        计数一个敌方回合，每 keyframe_interval 回合写入一个关键帧。
+    """
+
+    def __init__(self, game, path, keyframe_interval=KEYFRAME_INTERVAL):
+        from game import ENEMY_AIS  # Import tardif : game importe ce module
+
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.turn = 0
+        active = -1 if game.active_unit is None else CLASSES.index(game.active_unit.__class__.__name__)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, game.rng.seed, keyframe_interval,
+                                    MODES.index(game.selected_mode), active, ENEMY_AIS.index(game.enemy_ai),
+                                    game.grid_size))
+
+    def command(self, kind, unit=0, a=0, b=0):
+        self.file.write(COMMAND.pack(kind, unit, a, b))
+
+    def end_turn(self, game):
+        self.turn += 1
+        if self.turn % self.keyframe_interval == 0:
+            import snapshot  # Import tardif : snapshot importe les unités, qui importent ce module
+
+            blob = zlib.compress(game.rng.dumps() + snapshot.dumps(game))
+            self.command(KEYFRAME, 0, self.turn)
+            self.file.write(LENGTH.pack(len(blob)))
+            self.file.write(blob)
+
+    def close(self):
+        self.file.close()
+
+
+class Replay:
+    """
+    Classe pour lire un replay et le rejouer sans affichage.
+    读取回放并在无显示模式下重放的类。
+
+    ...
+    Attributs
+    ---------
+    seed : int
+        La graine de la partie enregistrée.
+        录制对局的种子。
+    commands : list[tuple]
+        Les commandes (type, unité, a, b), keyframes exclues.
+        命令列表（不含关键帧）。
+    keyframes : dict
+        Tour -> (position dans commands, état compressé).
+        回合 -> （命令位置，压缩的状态）。
+    turns : int
+        Nombre de tours ennemis enregistrés.
+        录制的敌方回合数。
+
+    Méthodes
+    --------
+    game_at(turn)
+        Partie headless telle qu'au début du tour turn, à partir de la keyframe la plus proche.
+        从最近的关键帧开始，得到第 turn 回合开始时的无显示对局。
+    play()
+        Rejoue toute la partie et renvoie le Game final.
+        重放整局并返回最终的 Game。
+    """
+
+    def __init__(self, data):
+        magic, version, self.seed, self.keyframe_interval, mode, active, enemy_ai, self.grid_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Replay invalide ou de version inconnue ({magic!r}, version {version})")
+        self.selected_mode = MODES[mode]
+        self.selected_unit = CLASSES[active] if active >= 0 else None
+        self.enemy_ai = enemy_ai
+        self.commands = []
+        self.keyframes = {}
+        offset = HEADER.size
+        while offset < len(data):
+            command = COMMAND.unpack_from(data, offset)
+            offset += COMMAND.size
+            if command[0] == KEYFRAME:
+                (length,) = LENGTH.unpack_from(data, offset)
+                offset += LENGTH.size
+                self.keyframes[command[2]] = (len(self.commands), data[offset:offset + length])
+                offset += length
+            else:
+                self.commands.append(command)
+        self.turns = sum(command[0] == TURN for command in self.commands)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def new_game(self):
+        """Partie headless au début de l'enregistrement : même graine, mêmes réglages."""
+        from game import Game, ENEMY_AIS
+
+        game = Game(None, self.seed, self.grid_size)
+        game.selected_mode = self.selected_mode
+        game.enemy_ai = ENEMY_AIS[self.enemy_ai]
+        if self.selected_unit is not None:
+            game.selected_unit = self.selected_unit
+        game.set_active_unit()
+        return game
+
+    def game_at(self, turn):
+        """Partie après turn tours ennemis : keyframe la plus proche, puis les commandes restantes."""
+        game = self.new_game()
+        start, position = 0, 0
+        for keyframe_turn, (keyframe_position, blob) in self.keyframes.items():
+            if start < keyframe_turn <= turn:
+                start, position = keyframe_turn, keyframe_position
+                state = blob
+        if start:
+            import snapshot
+
+            state = zlib.decompress(state)
+            snapshot.loads(game, state[STATE_SIZE:])  # Flux repartis de la graine...
+            game.rng.loads(state)  # ... puis remis dans leur état à la keyframe
+        self.run(game, position, turn - start)
+        return game
+
+    def play(self):
+        """Rejoue toutes les commandes, y compris le dernier tour du joueur après le dernier tour ennemi."""
+        game = self.new_game()
+        self.run(game, 0, self.turns + 1)
+        return game
+
+    def run(self, game, position, turns):
+        """Applique les commandes à partir de position, jusqu'à avoir joué turns tours ennemis."""
+        commands = self.commands
+        while position < len(commands) and turns > 0:
+            kind, unit, a, b = commands[position]
+            position += 1
+            if kind == TURN:
+                plan = []
+                while position < len(commands) and commands[position][0] == PLAN:
+                    plan.append(commands[position])
+                    position += 1
+                apply_turn(game, plan)
+                turns -= 1
+            else:
+                apply_command(game, kind, unit, a, b)
+        return position
+
+
+def apply_command(game, kind, index, a, b):
+    """Rejoue une commande du joueur avec les règles du jeu (sans enregistrer)."""
+    unit = game.unit_store.units[index]
+    name = unit.__class__.__name__
+    if kind == MOVE:
+        unit.move(a, b, game)
+    elif kind == REACT:
+        game.handle_enemy_reaction(unit)
+    elif kind == SINGLE and name == "Pyro":
+        unit.handle_single_attack(game, (a, b))
+    elif kind == SINGLE and name == "Medic":
+        unit.handle_single_attack(game, game.unit_store.units[a])
+    elif kind == SINGLE:
+        unit.handle_single_attack(game)
+    elif kind == GROUP:
+        unit.handle_group_attack(game)
+    elif kind == DEFENSE and name == "Pyro":
+        unit.handle_defense(unit)
+    elif kind == DEFENSE:
+        unit.handle_defense()
+    elif kind == ATTACK:
+        unit.attack(game.unit_store.units[a])
+    elif kind == HEALTH:
+        game.handle_health_zones(unit)
+        game.check_victory()
+    elif kind == RESET:
+        game.reset_actions()
+    else:
+        raise ValueError(f"Commande de replay inconnue : {kind}")
+
+
+def apply_turn(game, plan):
+    """Rejoue un tour ennemi : l'IA est recalculée, sauf MCTS dont le plan enregistré est réappliqué."""
+    from planner import ABILITIES
+
+    if game.enemy_ai == "MCTS":
+        units = game.unit_store.units
+        game.handle_enemy_turn([(units[index], (*decode_step(a), ABILITIES[b])) for _, index, a, b in plan])
+    else:
+        game.handle_enemy_turn()
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    import journal
+
+    parser = argparse.ArgumentParser(description="Rejoue un replay sans affichage.")
+    parser.add_argument("path")
+    parser.add_argument("--turn", type=int, default=None, help="se placer après N tours ennemis")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    with journal.silenced():
+        game = replay.play() if args.turn is None else replay.game_at(args.turn)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Graine {replay.seed}, {len(replay.commands)} commandes, {replay.turns} tours, "
+          f"{len(replay.keyframes)} keyframes ; gagnant : {game.winner} ({elapsed:.1f} ms)")
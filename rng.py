@@ -0,0 +1,76 @@
+"""
+Flux de nombres aléatoires d'une partie, tous dérivés d'une seule graine :
+carte (terrain, apparitions, bonus, zones), combat (précision, esquive, critiques), IA (graines des
+recherches MCTS) et cosmétique (dispersion des balles, particules). Une même graine redonne la même carte
+et, avec les mêmes commandes, la même partie ; les effets visuels ne décalent jamais les tirages des règles.
+对局的随机数流，全部由一个种子派生：地图、战斗、AI 和外观效果。相同的种子和命令会重现同一局游戏。
+"""
+
+import random
+import struct
+
+import numpy as np
+
+STREAMS = ("map", "combat", "cosmetic", "ai")
+# Flux rejoués par les replays (keyframes) ; pas "ai" : les plans MCTS sont enregistrés, jamais recalculés
+RULE_STREAMS = ("map", "combat")
+
+# État d'un random.Random (petit-boutiste) : version (B), 624 mots du Mersenne Twister et position (625I),
+# présence (?) et valeur (d) du tirage gaussien en attente
+GENERATOR_STATE = struct.Struct("<B625I?d")
+STATE_SIZE = GENERATOR_STATE.size * len(RULE_STREAMS)  # Longueur de RandomStreams.dumps()
+
+
+def new_seed():
+    """Graine d'une nouvelle partie, tirée du module random (random.seed rend donc Game() reproductible)."""
+    return random.getrandbits(63)
+
+
+class RandomStreams:
+    """
+    Classe pour représenter les générateurs seedés d'une partie, un par usage.
+    表示一局游戏中按用途划分的带种子随机数生成器的类。
+
+    ...
+    Attributs
+    ---------
+    seed : int
+        La graine de la partie.
+        对局种子。
+    map, combat, cosmetic, ai : random.Random
+        Un générateur indépendant par usage.
+        每种用途一个独立的生成器。
+    particles : numpy.random.Generator
+        Tirages vectorisés des émetteurs de particules (cosmétique).
+        粒子发射器的向量化随机数（外观）。
+
+    Méthodes
+    --------
+    dumps() / loads(data, offset=0)
+        État des flux qui comptent pour les règles (carte et combat), en bytes de taille fixe
+        (GENERATOR_STATE par flux), pour les keyframes des replays.
+        影响规则的随机流状态，以固定长度的字节保存 / 恢复（用于回放关键帧）。
+    """
+
+    def __init__(self, seed=None):
+        self.seed = new_seed() if seed is None else seed
+        # Une chaîne comme graine est hachée (SHA-512) : les flux sont indépendants et stables d'une exécution à l'autre
+        for name in STREAMS:
+            setattr(self, name, random.Random(f"{self.seed}:{name}"))
+        self.particles = np.random.default_rng([self.seed, STREAMS.index("cosmetic")])
+
+    def dumps(self):
+        """État des flux de RULE_STREAMS, champ par champ : rien n'est dépicklé à la lecture."""
+        chunks = []
+        for name in RULE_STREAMS:
+            version, words, gauss = getattr(self, name).getstate()
+            chunks.append(GENERATOR_STATE.pack(version, *words, gauss is not None, gauss or 0.0))
+        return b"".join(chunks)
+
+    def loads(self, data, offset=0):
+        """Remet les flux dans un état écrit par dumps ; renvoie la position qui suit cet état dans data."""
+        for name in RULE_STREAMS:
+            version, *words, has_gauss, gauss = GENERATOR_STATE.unpack_from(data, offset)
+            getattr(self, name).setstate((version, tuple(words), gauss if has_gauss else None))
+            offset += GENERATOR_STATE.size
+        return offset
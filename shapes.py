@@ -0,0 +1,140 @@
+"""
+Bibliothèque de formes de compétences : gabarits booléens précalculés (disque, carré, losange, ligne),
+découpés aux bords de la carte et appliqués comme masques sur les grilles d'occupation et de terrain.
+技能形状库：预先计算的布尔模板（圆、方形、菱形、直线），在地图边界处裁剪，并作为掩码作用于占用网格和地形网格。
+
+Une forme sert à trois choses :
+- les cases touchées autour d'un centre (affichage de la portée), découpées aux bords de la carte ;
+- les unités touchées, en une passe vectorisée (UnitStore.area) ;
+- l'aperçu de toutes les positions possibles d'un coup : coverage() compte, pour chaque centre,
+  les cases d'un masque (ennemis, lave...) que la forme couvrirait, et best_placement() choisit la meilleure.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def disk_stencil(radius):
+    """Disque booléen (2r+1) x (2r+1) des décalages (dx, dy) tels que dx² + dy² <= r²."""
+    offsets = np.arange(-radius, radius + 1)
+    return offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius ** 2
+
+
+def diamond_stencil(radius):
+    """Losange booléen des décalages tels que |dx| + |dy| <= r (distance de Manhattan)."""
+    offsets = np.abs(np.arange(-radius, radius + 1))
+    return offsets[:, None] + offsets[None, :] <= radius
+
+
+class Shape:
+    """
+    Classe pour représenter la zone d'effet d'une compétence autour de sa case centrale.
+    表示技能以中心格为基准的作用范围的类。
+
+    ...
+    Attributs
+    ---------
+    stencil : numpy.ndarray
+        Masque booléen (2r+1) x (2r+1), indexé par [dx + r, dy + r].
+        布尔模板，按 [dx + r, dy + r] 索引。
+    radius : int
+        Demi-côté du gabarit.
+        模板的半边长。
+    offsets : list[tuple]
+        Les décalages (dx, dy) couverts, dx d'abord.
+        覆盖的偏移量列表。
+
+    Méthodes
+    --------
+    cells(x, y, size)
+        Cases couvertes autour de (x, y), découpées à la carte.
+        以 (x, y) 为中心、裁剪到地图内的格子。
+    mask(x, y, size)
+        Les mêmes cases en masque booléen [x, y] de la taille de la carte.
+        同样的格子，以地图大小的布尔掩码表示。
+    contains(dx, dy)
+        Vrai (élément par élément) pour les décalages couverts ; accepte des tableaux.
+        判断偏移量是否被覆盖（支持数组）。
+    coverage(grid)
+        Pour chaque centre possible, le nombre de cases vraies de grid que la forme couvrirait.
+        对每个可能的中心，统计形状会覆盖的 grid 中为真的格子数。
+    """
+
+    def __init__(self, stencil):
+        self.stencil = np.asarray(stencil, dtype=bool)
+        self.radius = self.stencil.shape[0] // 2
+        self.offsets = [(int(dx) - self.radius, int(dy) - self.radius) for dx, dy in np.argwhere(self.stencil)]
+
+    def cells(self, x, y, size):
+        """
+        Cases couvertes autour de (x, y) sur une carte size x size, découpées à partir de offsets.
+        Rien n'est gardé en mémoire : une forme ne couvre que quelques dizaines de cases, alors qu'un cache
+        par centre grandirait avec la taille de la carte.
+        """
+        return [(x + dx, y + dy) for dx, dy in self.offsets if 0 <= x + dx < size and 0 <= y + dy < size]
+
+    def mask(self, x, y, size):
+        """Masque booléen [x, y] de la carte, vrai sur les cases couvertes autour de (x, y)."""
+        r = self.radius
+        mask = np.zeros((size, size), dtype=bool)
+        left, top = max(0, x - r), max(0, y - r)
+        right, bottom = min(size, x + r + 1), min(size, y + r + 1)
+        mask[left:right, top:bottom] = self.stencil[left - x + r:right - x + r, top - y + r:bottom - y + r]
+        return mask
+
+    def contains(self, dx, dy):
+        """Vrai pour les décalages (dx, dy) couverts ; dx et dy peuvent être des tableaux."""
+        r = self.radius
+        dx, dy = np.asarray(dx), np.asarray(dy)
+        inside = (np.abs(dx) <= r) & (np.abs(dy) <= r)
+        return inside & self.stencil[np.where(inside, dx + r, 0), np.where(inside, dy + r, 0)]
+
+    def coverage(self, grid):
+        """Nombre de cases vraies de grid couvertes, pour la forme centrée sur chaque case [x, y]."""
+        r = self.radius
+        padded = np.pad(np.asarray(grid, dtype=np.int32), r)
+        windows = sliding_window_view(padded, self.stencil.shape)
+        return np.einsum("xyij,ij->xy", windows, self.stencil.astype(np.int32))
+
+
+def disk(radius):
+    return Shape(disk_stencil(radius))
+
+
+def square(radius):
+    return Shape(np.ones((2 * radius + 1, 2 * radius + 1), dtype=bool))
+
+
+def diamond(radius):
+    return Shape(diamond_stencil(radius))
+
+
+def line(dx, dy, length):
+    """Ligne de length cases dans la direction (dx, dy), sans la case de départ."""
+    stencil = np.zeros((2 * length + 1, 2 * length + 1), dtype=bool)
+    for step in range(1, length + 1):
+        stencil[length + dx * step, length + dy * step] = True
+    return Shape(stencil)
+
+
+def best_placement(shape, grid, allowed=None):
+    """
+    Centre où la forme couvre le plus de cases vraies de grid (ex. ennemis pour une explosion).
+
+    allowed : masque booléen [x, y] des centres possibles (portée du lanceur), toute la carte par défaut.
+    Retourne ((x, y), nombre de cases couvertes), ou (None, 0) si aucun centre ne couvre rien.
+    """
+    counts = shape.coverage(grid)
+    if allowed is not None:
+        counts = np.where(allowed, counts, 0)
+    x, y = np.unravel_index(int(counts.argmax()), counts.shape)
+    best = int(counts[x, y])
+    return ((int(x), int(y)), best) if best else (None, 0)
+
+
+# Formes des compétences, calculées une seule fois
+SQUARE_1 = square(1)  # Lave du Pyro, affaiblissement du Sniper (3x3)
+DISK_2 = disk(2)  # Explosion du Pyro, soin du Medic, fumée et tir du Scout
+DIAMOND_3 = diamond(3)  # Tir du Medic (3 cases de Manhattan)
+DISK_6 = disk(6)  # Tir du Sniper
+ADJACENT = Shape([[0, 1, 0], [1, 0, 1], [0, 1, 0]])  # Les 4 cases voisines (mur du Sniper)
@@ -0,0 +1,151 @@
+"""
+Simulation headless : parties complètes sans fenêtre, sans animation ni pause.
+无显示模拟：在没有窗口、动画和等待的情况下运行完整对局。
+
+Les règles (Unit.move, Unit.attack, take_damage, handle_*_attack, handle_enemy_turn)
+sont celles du jeu ; seul le côté joueur est piloté par une IA simple au lieu de la souris.
+
+Objectif de performance : TARGET_GAMES_PER_SECOND parties complètes par seconde
+sur un seul cœur (mesuré par benchmark.py, journal coupé), soit 3 000 parties par minute :
+un lot d'équilibrage de 10 000 parties tient en moins de 4 minutes sur un cœur.
+"""
+
+import time
+
+import journal
+from game import Game
+from replay import ATTACK
+from unit import Pyro, Medic, Sniper, Scout
+
+TARGET_GAMES_PER_SECOND = 50  # Objectif : parties complètes / seconde / cœur
+MAX_TURNS = 100  # Au-delà, la partie est déclarée nulle
+
+
+def closest_enemy(game, unit):
+    """Trouve l'ennemi vivant le plus proche d'une unité du joueur."""
+    return game.unit_store.closest(*unit.position, "enemy")
+
+
+def weakest_enemy(game, unit):
+    """Trouve l'ennemi vivant avec le moins de PV (choix de cible alternatif pour les tournois)."""
+    return game.unit_store.weakest("enemy")
+
+
+def step_towards(game, unit, target):
+    """Va sur la case accessible (PathFinder.reachable) la plus proche de la cible, en le moins de pas possible."""
+    cells = game.pathfinder.reachable(unit)
+    if not cells:
+        return False
+    (x, y), (target_x, target_y) = unit.position, target.position
+    new_x, new_y = min(cells, key=lambda cell: (abs(cell[0] - target_x) + abs(cell[1] - target_y), cells[cell]))
+    return unit.move(new_x - x, new_y - y, game)
+
+
+def use_skill(game, unit, target):
+    """Choisit la compétence de classe la plus utile contre la cible, sinon l'attaque simple."""
+    (x, y), (target_x, target_y) = unit.position, target.position
+    dx, dy = target_x - x, target_y - y
+    distance = abs(dx) + abs(dy)
+    if isinstance(unit, Pyro):
+        if max(abs(dx), abs(dy)) <= 1:
+            unit.handle_single_attack(game, (target_x, target_y))
+        elif dx ** 2 + dy ** 2 <= 4:
+            unit.handle_group_attack(game)
+        else:
+            return False
+    elif isinstance(unit, Medic):
+        if unit.health <= 10:
+            unit.handle_group_attack(game)
+        elif distance <= 3:
+            unit.handle_single_attack(game, target)
+        else:
+            return False
+    elif isinstance(unit, Sniper):
+        if dx ** 2 + dy ** 2 <= 36:
+            unit.handle_single_attack(game)
+        else:
+            return False
+    elif isinstance(unit, Scout):
+        if dx ** 2 + dy ** 2 <= 4:
+            unit.handle_single_attack(game)
+        else:
+            return False
+    elif distance <= 1:
+        unit.attack(target)
+    else:
+        return False
+    return True
+
+
+def play_player_turn(game, choose_target=closest_enemy):
+    """Tour du joueur piloté par l'IA : s'approcher de la cible (l'ennemi le plus proche par défaut) puis attaquer."""
+    store = game.unit_store
+    for unit in store.selected(store.live("player")):
+        target = choose_target(game, unit)
+        if target is None:
+            break
+        if not use_skill(game, unit, target):
+            step_towards(game, unit, target)
+            (x, y), (target_x, target_y) = unit.position, target.position
+            if abs(target_x - x) + abs(target_y - y) <= 1:
+                game.record(ATTACK, unit, target.index)
+                unit.attack(target)
+        game.handle_health_zones(unit)
+        if game.check_victory():
+            return
+
+
+def play_headless_game(seed=None, max_turns=MAX_TURNS, planner=None, record=None):
+    """
+    Joue une partie complète IA contre IA sans affichage.
+
+    Paramètres
+    ----------
+    seed : int, optionnel
+        Graine de la partie (rng.py), pour rejouer la même partie.
+    max_turns : int
+        Nombre maximal de tours avant de déclarer la partie nulle.
+    planner : planner.Planner, optionnel
+        Si donné, les ennemis jouent par MCTS avec ce planificateur (partagé entre les parties) ;
+        sinon, l'IA gloutonne de handle_enemy_turn.
+    record : str, optionnel
+        Fichier où enregistrer le replay de la partie (replay.py).
+
+    Retourne un dict avec le gagnant ('player', 'enemy' ou None) et le nombre de tours.
+    """
+    game = Game(None, seed)
+    game.selected_mode = "Group"
+    if planner is not None:
+        game.enemy_ai, game.planner = "MCTS", planner
+    if record is not None:
+        game.start_recording(record)
+    turn = play_game(game, max_turns)
+    game.stop_recording()
+    return {"winner": game.winner, "turns": turn}
+
+
+def play_game(game, max_turns=MAX_TURNS, choose_target=closest_enemy):
+    """
+    Joue une partie headless déjà construite jusqu'à la victoire ou max_turns, en mode Group.
+    Les ennemis suivent game.enemy_ai ; les joueurs visent choose_target(game, unit).
+
+    Retourne le nombre de tours joués (game.winner donne le résultat).
+    """
+    game.selected_mode = "Group"
+    turn = 0
+    while game.winner is None and turn < max_turns:
+        turn += 1
+        game.reset_actions()
+        play_player_turn(game, choose_target)
+        if game.winner is None:
+            game.handle_enemy_turn()
+    return turn
+
+
+def games_per_second(count=100, seed=0):
+    """Mesure le nombre de parties headless simulées par seconde sur un cœur (journal coupé)."""
+    with journal.silenced():
+        start = time.perf_counter()
+        for i in range(count):
+            play_headless_game(seed + i)
+        return count / (time.perf_counter() - start)
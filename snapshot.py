@@ -0,0 +1,144 @@
+"""
+Snapshots binaires versionnés de l'état d'une partie : sauvegarde rapide, reprise après un plantage,
+ou état à transmettre à d'autres processus. Aucune image n'est décodée au chargement : les unités
+et les bonus reprennent les images déjà en mémoire (cache d'assets).
+对局状态的带版本二进制快照：快速存档 / 读档、崩溃恢复，或传给其他进程的状态。读取时不解码任何图片。
+
+Format (petit-boutiste) :
+    en-tête   : "TSNP", version (B), graine (Q), côté de la grille (H), unités (H), mode (B),
+                unité active (h, -1 si aucune), IA ennemie (B), gagnant (B), bonus (H), zones de soin (H),
+                bombes (H), compteurs bonus / bombes par équipe (4H)
+    terrain   : un octet par case, code du type (4 bits bas) et variante d'image (4 bits hauts)
+    unités    : classe de chaque ligne (B), puis chaque colonne de COLUMNS à la suite (tobytes)
+    bonus     : type de chaque bonus (B), puis leurs cases (x, y en H)
+    zones     : cases (x, y en H), zones de soin puis bombes
+
+Version 2 : côté, compteurs et coordonnées sur 16 bits, pour les cartes de 256 cases et plus.
+
+Les flux aléatoires ne sont pas sauvegardés : après un chargement, ils repartent de la graine du snapshot,
+si bien que charger deux fois le même snapshot redonne la même suite de partie. Les keyframes des replays
+écrivent leur état à côté du snapshot (RandomStreams.dumps).
+"""
+
+import struct
+from collections import Counter
+
+import numpy as np
+
+from bonus import AttackBoost, DefenseBoost
+from rng import RandomStreams
+from unit import Pyro, Medic, Scout, Sniper
+from unitstore import UnitStore, COLUMNS, DEFAULT_CAPACITY
+
+MAGIC = b"TSNP"
+VERSION = 2
+HEADER = struct.Struct("<4sBQHHBhBBHHH4H")
+COORDINATE = np.dtype("<u2")
+VARIANT_SHIFT = 4
+
+MODES = ("Group", "One Player")
+UNIT_CLASSES = (Pyro, Medic, Scout, Sniper)
+BONUS_CLASSES = (AttackBoost, DefenseBoost)
+WINNERS = (None, "player", "enemy")
+TEAMS = ("player", "enemy")
+COUNTERS = [(event, team) for event in ("bonus", "bomb") for team in TEAMS]
+
+
+def dumps(game):
+    """Sérialise l'état de la partie en bytes."""
+    from game import ENEMY_AIS  # Import tardif : game importe ce module
+
+    store = game.unit_store
+    count = store.count
+    terrain = game.terrain
+    active = -1 if game.active_unit is None else game.active_unit.index
+    header = HEADER.pack(MAGIC, VERSION, game.rng.seed, terrain.size, count, MODES.index(game.selected_mode),
+                         active, ENEMY_AIS.index(game.enemy_ai), WINNERS.index(game.winner), len(game.bonus_items),
+                         len(game.health_zones), len(game.bomb_zones), *(game.counters[key] for key in COUNTERS))
+    cells = terrain.types | (terrain.variants << VARIANT_SHIFT)
+    classes = bytes(UNIT_CLASSES.index(type(unit)) for unit in store.units)
+    bonus_classes = bytes(BONUS_CLASSES.index(type(item)) for item in game.bonus_items)
+    bonuses = np.array([(item.x, item.y) for item in game.bonus_items], dtype=COORDINATE)
+    zones = np.array(game.health_zones + game.bomb_zones, dtype=COORDINATE)
+    return b"".join([header, cells.tobytes(), classes, *(getattr(store, name)[:count].tobytes() for name in COLUMNS),
+                     bonus_classes, bonuses.tobytes(), zones.tobytes()])
+
+
+def loads(game, data):
+    """Remet la partie dans l'état d'un snapshot (les unités sont recréées, leurs images réutilisées)."""
+    from game import ENEMY_AIS
+
+    (magic, version, seed, size, count, mode, active, enemy_ai, winner,
+     bonuses, hearts, bombs, *counters) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Snapshot invalide ou de version inconnue ({magic!r}, version {version})")
+    terrain = game.terrain
+    if size != terrain.size:
+        raise ValueError(f"Snapshot d'une grille {size}x{size}, la partie est en {terrain.size}x{terrain.size}")
+    offset = HEADER.size
+
+    cells = np.frombuffer(data, np.uint8, size * size, offset).reshape(size, size)
+    offset += size * size
+    terrain.replace(cells & ((1 << VARIANT_SHIFT) - 1), cells >> VARIANT_SHIFT)  # Chemins et portées en cache sont invalidés
+    game.terrain_layer = None
+
+    # Flux neufs : les mêmes tirages après chaque chargement de ce snapshot
+    game.rng = RandomStreams(seed)
+    game.particles.rng = game.rng.particles
+
+    # Les images déjà décodées des unités et bonus actuels servent aux nouveaux objets
+    images = {type(unit): unit.image for unit in game.unit_store.units + game.bonus_items}
+    classes = data[offset:offset + count]
+    offset += count
+    store = UnitStore(max(count, DEFAULT_CAPACITY), rng=game.rng.combat)
+    store.count = count
+    for name, dtype in COLUMNS.items():
+        column = np.frombuffer(data, dtype, count, offset)
+        getattr(store, name)[:count] = column
+        offset += column.nbytes
+    for index, code in enumerate(classes):
+        unit_class = UNIT_CLASSES[code]
+        unit = unit_class.from_row(store, index, images.get(unit_class))
+        if unit.image is None and not game.headless:
+            unit.image = unit.load_image()  # Classe absente de la partie actuelle : image du cache d'assets
+        store.units.append(unit)
+    store.refresh_rows()
+    game.unit_store = store
+    game.player_units = store.selected(store.placed("player"))
+    game.enemy_units = store.selected(store.placed("enemy"))
+    game.occupancy.rebuild(game.player_units + game.enemy_units)
+    game.pathfinder.clear()
+
+    bonus_classes = data[offset:offset + bonuses]
+    offset += bonuses
+    cells = np.frombuffer(data, COORDINATE, 2 * bonuses, offset).reshape(bonuses, 2).tolist()
+    offset += 2 * bonuses * COORDINATE.itemsize
+    game.bonus_items = []
+    for code, (x, y) in zip(bonus_classes, cells):
+        bonus_class = BONUS_CLASSES[code]
+        item = bonus_class(x, y, headless=True)
+        item.image = None if game.headless else images.get(bonus_class) or item.load_bonus_image()
+        game.bonus_items.append(item)
+    zones = [tuple(zone) for zone in np.frombuffer(data, COORDINATE, 2 * (hearts + bombs), offset).reshape(-1, 2).tolist()]
+    game.health_zones, game.bomb_zones = zones[:hearts], zones[hearts:]
+
+    game.selected_mode = MODES[mode]
+    game.active_unit = None if active < 0 else store.units[active]
+    if game.active_unit is not None:
+        game.selected_unit = type(game.active_unit).__name__
+    game.enemy_ai = ENEMY_AIS[enemy_ai]
+    game.winner = WINNERS[winner]
+    game.counters = Counter({key: value for key, value in zip(COUNTERS, counters) if value})
+    game.frame_state = {}  # Tout est à redessiner
+
+
+def save(game, path):
+    """Écrit le snapshot de la partie dans un fichier."""
+    with open(path, "wb") as file:
+        file.write(dumps(game))
+
+
+def load(game, path):
+    """Charge un snapshot écrit par save."""
+    with open(path, "rb") as file:
+        loads(game, file.read())
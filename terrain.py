@@ -0,0 +1,160 @@
+"""
+Grille de terrain compacte : un code uint8 par case et un numéro de variante d'image.
+紧凑的地形网格：每个格子一个 uint8 类型码和一个贴图变体编号。
+"""
+
+import numpy as np
+
+# Codes des types de terrain (l'ordre fixe la valeur stockée dans la grille)
+TERRAIN_TYPES = ("grass", "road", "water", "lava", "tree", "wall")
+GRASS, ROAD, WATER, LAVA, TREE, WALL = range(len(TERRAIN_TYPES))
+TERRAIN_CODES = {name: code for code, name in enumerate(TERRAIN_TYPES)}
+
+
+class TerrainGrid:
+    """
+    Classe pour représenter le terrain de la carte.
+    表示地图地形的类。
+
+    ...
+    Attributs
+    ---------
+    size : int
+        Nombre de cases par côté.
+        每边的格子数。
+    types : numpy.ndarray
+        Codes de terrain (uint8), indexés par [x, y].
+        地形类型码，按 [x, y] 索引。
+    variants : numpy.ndarray
+        Numéro de l'image utilisée pour chaque case (uint8), indexé par [x, y].
+        每个格子使用的贴图编号。
+    images : dict
+        Images par type de terrain (une image ou une liste de variantes), ou None sans affichage.
+        每种地形的图片（单张或变体列表）。
+    dirty_cells : set
+        Cases modifiées depuis le dernier take_dirty(), pour redessiner le fond en cache.
+        自上次 take_dirty() 以来被修改的格子，用于刷新缓存的地形背景。
+    version : int
+        Incrémenté à chaque modification, pour invalider les caches (chemins, portées).
+        每次修改时递增，用于使缓存失效。
+
+    Méthodes
+    --------
+    terrain[x][y]
+        Accès compatible avec l'ancienne liste de dicts {"type": ..., "image": ...}.
+        兼容旧的字典列表访问方式。
+    replace(types, variants)
+        Remplace toute la carte d'un coup.
+        一次性替换整张地图。
+    take_dirty()
+        Renvoie puis vide la liste des cases modifiées.
+        返回并清空被修改的格子。
+    mask(*terrain_types)
+        Masque booléen des cases de ces types.
+        指定类型格子的布尔掩码。
+    walkable_mask(unit_class, team)
+        Masque des cases accessibles pour une classe d'unité et une équipe.
+        某兵种和队伍可通行格子的掩码。
+    """
+
+    def __init__(self, size, images=None):
+        self.size = size
+        self.types = np.zeros((size, size), dtype=np.uint8)
+        self.variants = np.zeros((size, size), dtype=np.uint8)
+        self.images = images
+        self.dirty_cells = set()
+        self.full_redraw = True  # Toute la carte est à redessiner
+        self.version = 0
+
+    def __getitem__(self, x):
+        return _TerrainColumn(self, x)
+
+    def __len__(self):
+        return self.size
+
+    def variant_count(self, terrain_type):
+        """Nombre de variantes d'image disponibles pour un type de terrain."""
+        images = self.images.get(terrain_type) if self.images else None
+        return len(images) if isinstance(images, list) else 1
+
+    def code_at(self, x, y):
+        """Code du terrain de la case (int Python, sans passer par une chaîne)."""
+        return self.types.item(x, y)
+
+    def type_at(self, x, y):
+        """Nom du terrain de la case, ex. "water"."""
+        return TERRAIN_TYPES[self.types.item(x, y)]
+
+    def image_at(self, x, y):
+        """Image de la case, ou None sans affichage."""
+        if not self.images:
+            return None
+        image = self.images[TERRAIN_TYPES[self.types.item(x, y)]]
+        if isinstance(image, list):
+            return image[self.variants.item(x, y)]
+        return image
+
+    def set(self, x, y, terrain_type, variant=0):
+        """Change le terrain d'une case."""
+        self.types[x, y] = TERRAIN_CODES[terrain_type]
+        self.variants[x, y] = variant
+        self.dirty_cells.add((x, y))
+        self.version += 1
+
+    def fill(self, terrain_type, variants=None):
+        """Remplit toute la carte avec un type de terrain (et éventuellement un tableau de variantes)."""
+        self.types.fill(TERRAIN_CODES[terrain_type])
+        if variants is None:
+            self.variants.fill(0)
+        else:
+            self.variants[:] = variants
+        self.full_redraw = True
+        self.version += 1
+
+    def replace(self, types, variants):
+        """Remplace toute la carte par ces tableaux [x, y] (carte générée, snapshot)."""
+        self.types[:] = types
+        self.variants[:] = variants
+        self.dirty_cells = set()
+        self.full_redraw = True
+        self.version += 1
+
+    def take_dirty(self):
+        """
+        Renvoie (full_redraw, cases modifiées) puis remet le suivi à zéro.
+        Les écritures directes dans types/variants ne sont pas suivies : passer par set() ou fill().
+        """
+        full, cells = self.full_redraw, self.dirty_cells
+        self.full_redraw = False
+        self.dirty_cells = set()
+        return full, cells
+
+    def mask(self, *terrain_types):
+        """Masque booléen [x, y] des cases appartenant à l'un des types donnés."""
+        codes = [TERRAIN_CODES[terrain_type] for terrain_type in terrain_types]
+        return np.isin(self.types, codes)
+
+    def walkable_mask(self, unit_class, team):
+        """Masque [x, y] des cases où une unité de cette classe et de cette équipe peut entrer."""
+        return ~self.mask(*unit_class.blocked_terrain(team))
+
+
+class _TerrainColumn:
+    """Colonne x de la grille, pour garder la syntaxe terrain[x][y]."""
+
+    __slots__ = ("grid", "x")
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __getitem__(self, y):
+        return {"type": self.grid.type_at(self.x, y), "image": self.grid.image_at(self.x, y)}
+
+    def __setitem__(self, y, cell):
+        # Retrouver la variante à partir de l'image fournie, si elle fait partie d'une liste
+        images = self.grid.images.get(cell["type"]) if self.grid.images else None
+        variant = 0
+        if isinstance(images, list) and cell.get("image") in images:
+            variant = images.index(cell["image"])
+        self.grid.set(self.x, y, cell["type"], variant)
@@ -0,0 +1,180 @@
+"""
+Tournoi headless IA contre IA : des milliers de parties seedées jouées sur un pool de processus,
+pour comparer les politiques des deux camps et les statistiques des unités.
+无显示 AI 对 AI 锦标赛：在进程池上运行数千局带种子的对局，用于比较双方策略和单位属性。
+
+Chaque partie est écrite dès qu'elle se termine (CSV, ou SQLite si le fichier finit par .db / .sqlite) :
+graine, politiques, gagnant, tours, dégâts subis par classe et par équipe, bonus ramassés, bombes déclenchées.
+
+Usage : python tournament.py --games 1000 --workers 1 2 4 --player closest --enemy weakest --output results.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import multiprocessing
+import os
+import sqlite3
+import time
+
+# Pas de fenêtre ni de son dans les processus du tournoi
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import journal
+import simulation
+from game import Game
+from planner import Planner
+
+# Politiques de choix de cible : côté joueur (simulation.py), côté ennemi (Game.enemy_ai)
+PLAYER_POLICIES = {"closest": simulation.closest_enemy, "weakest": simulation.weakest_enemy}
+ENEMY_POLICIES = {"closest": "Greedy", "weakest": "Weakest", "mcts": "MCTS"}
+TEAMS = ("player", "enemy")
+CLASSES = ("Pyro", "Medic", "Scout", "Sniper")
+FIELDS = (["workers", "seed", "player_policy", "enemy_policy", "winner", "turns"]
+          + [f"damage_{team}_{name}" for team in TEAMS for name in CLASSES]
+          + [f"{event}_{team}" for event in ("bonuses", "bombs") for team in TEAMS])
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def play_match(seed, player_policy, enemy_policy, max_turns=simulation.MAX_TURNS, budget=0.05, max_iterations=None):
+    """
+    Joue une partie seedée et renvoie sa ligne de résultats (dict sur FIELDS, sans workers).
+
+    budget : float ou None
+        Temps de réflexion par tour de la politique ennemie "mcts" (recherche dans ce processus).
+    max_iterations : int ou None
+        Rollouts MCTS par tour ; sans budget de temps, la ligne ne dépend plus que de la graine.
+    """
+    game = Game(None, seed)
+    game.enemy_ai = ENEMY_POLICIES[enemy_policy]
+    if game.enemy_ai == "MCTS":
+        game.planner = Planner(budget, workers=1, max_iterations=max_iterations)  # Déjà dans un processus du pool : pas de pool imbriqué
+    turns = simulation.play_game(game, max_turns, PLAYER_POLICIES[player_policy])
+
+    row = {"seed": seed, "player_policy": player_policy, "enemy_policy": enemy_policy,
+           "winner": game.winner or "draw", "turns": turns}
+    store = game.unit_store
+    for index in range(store.count):
+        unit = store.units[index]
+        key = f"damage_{unit.team}_{unit.__class__.__name__}"
+        row[key] = row.get(key, 0) + store.damage_taken.item(index)
+    for team in TEAMS:
+        row[f"bonuses_{team}"] = game.counters["bonus", team]
+        row[f"bombs_{team}"] = game.counters["bomb", team]
+    return row
+
+
+def play_match_args(args):
+    return play_match(*args)
+
+
+def silence_worker():
+    """Initialisation d'un processus du pool : journal coupé."""
+    journal.configure(console=False, disabled=journal.SUBSYSTEMS)
+
+
+class CsvSink:
+    """Écrit les lignes de résultats dans un fichier CSV, une par partie, au fil de l'eau."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteSink:
+    """Écrit les lignes de résultats dans la table games d'une base SQLite (validées par lots)."""
+
+    def __init__(self, path, batch=500):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS games ({', '.join(FIELDS)})")
+        self.insert = f"INSERT INTO games VALUES ({', '.join('?' * len(FIELDS))})"
+        self.batch = batch
+        self.pending = 0
+
+    def write(self, row):
+        self.connection.execute(self.insert, [row[field] for field in FIELDS])
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.connection.commit()
+            self.pending = 0
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def open_sink(path):
+    return SqliteSink(path) if path.endswith(SQLITE_SUFFIXES) else CsvSink(path)
+
+
+def run(games, workers, player_policy, enemy_policy, sink, seed=0, max_turns=simulation.MAX_TURNS, budget=0.05,
+        max_iterations=None):
+    """
+    Joue games parties (graines seed, seed + 1, ...) sur workers processus et écrit chaque ligne dans sink.
+
+    Retourne (victoires par gagnant, parties par minute).
+    """
+    tasks = [(seed + i, player_policy, enemy_policy, max_turns, budget, max_iterations) for i in range(games)]
+    wins = dict.fromkeys((*TEAMS, "draw"), 0)
+    start = time.perf_counter()
+    if workers <= 1:
+        # En série, les parties tournent dans le processus appelant : le journal n'est coupé que pendant le tournoi
+        quiet = journal.silenced()
+        results = map(play_match_args, tasks)
+        pool = None
+    else:
+        quiet = contextlib.nullcontext()
+        pool = multiprocessing.get_context().Pool(workers, initializer=silence_worker)
+        # Par paquets : moins d'allers-retours entre processus, mais des lignes écrites au fil de l'eau
+        results = pool.imap_unordered(play_match_args, tasks, chunksize=max(1, min(50, games // (4 * workers))))
+    try:
+        with quiet:
+            for row in results:
+                row["workers"] = workers
+                sink.write(row)
+                wins[row["winner"]] += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return wins, games / (time.perf_counter() - start) * 60
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tournoi headless IA contre IA sur un pool de processus.")
+    parser.add_argument("--games", type=int, default=1000, help="parties par nombre de processus")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="nombres de processus à mesurer, ex. 1 2 4")
+    parser.add_argument("--player", choices=PLAYER_POLICIES, default="closest", help="politique des joueurs")
+    parser.add_argument("--enemy", choices=ENEMY_POLICIES, default="closest", help="politique des ennemis")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la première partie")
+    parser.add_argument("--max-turns", type=int, default=simulation.MAX_TURNS, help="tours avant match nul")
+    parser.add_argument("--budget", type=float, default=0.05, help="secondes de réflexion MCTS par tour")
+    parser.add_argument("--iterations", type=int, default=None,
+                        help="rollouts MCTS par tour ; avec --budget 0, seul ce budget compte (résultats reproductibles)")
+    parser.add_argument("--output", default="tournament.csv", help="fichier .csv, ou .db / .sqlite pour SQLite")
+    args = parser.parse_args(argv)
+    budget = args.budget or None  # --budget 0 : pas de limite de temps
+
+    sink = open_sink(args.output)
+    try:
+        for workers in args.workers:
+            wins, rate = run(args.games, workers, args.player, args.enemy, sink,
+                             args.seed, args.max_turns, budget, args.iterations)
+            print(f"{workers} processus : {rate:.0f} parties/min ; "
+                  f"joueurs {wins['player']}, ennemis {wins['enemy']}, nuls {wins['draw']}")
+    finally:
+        sink.close()
+    print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Stockage des unités en colonnes : l'état numérique de toutes les unités d'une partie
+(position, santé, statistiques, actions, drapeaux) vit dans des tableaux NumPy contigus.
+Les objets Pyro, Medic, Sniper et Scout ne sont que des vues (__slots__) sur une ligne de ces tableaux,
+ce qui permet les requêtes d'équipe et les dégâts de zone vectorisés.
+单位的列式存储：一局游戏中所有单位的数值状态（位置、生命、属性、行动次数、标志）保存在连续的 NumPy 数组中。
+Pyro、Medic、Sniper、Scout 对象只是这些数组中一行的视图（__slots__），从而可以向量化地进行队伍查询和范围伤害。
+"""
+
+import random
+
+import numpy as np
+
+from combat import type_multiplier
+from occupancy import TEAM_CODES
+
+DEFAULT_CAPACITY = 8  # Deux équipes de quatre ; les tableaux doublent au besoin
+
+# Colonnes et types : la santé est en flottants car une attaque sans défense inflige x1.2
+COLUMNS = {
+    "x": np.int32,
+    "y": np.int32,
+    "health": np.float64,
+    "attack_power": np.int32,
+    "defense": np.int32,
+    "accuracy": np.float64,
+    "evasion": np.float64,
+    "crit_chance": np.float64,
+    "speed": np.int16,
+    "actions_left": np.int16,
+    "damage_taken": np.float64,  # Dégâts subis au combat depuis le début de la partie (statistiques)
+    "flags": np.uint8,
+    "team": np.uint8,
+    "weak": np.uint8,
+    "resist": np.uint8,
+}
+
+# Drapeaux (colonne flags)
+SELECTED, HIDDEN, VISIBLE, REMOVED = 1, 2, 4, 8
+
+# Types d'attaque, un bit chacun dans les colonnes weak et resist
+ATTACK_TYPES = ("fire", "water", "melee", "ranged", "poison")
+ATTACK_BITS = {name: 1 << bit for bit, name in enumerate(ATTACK_TYPES)}
+
+
+def attack_bits(attack_types):
+    """Masque de bits d'une liste de types d'attaque, ex. ("melee", "ranged") -> 0b1100."""
+    bits = 0
+    for name in attack_types:
+        bits |= ATTACK_BITS[name]
+    return bits
+
+
+class Column:
+    """Attribut d'unité lu et écrit dans une colonne du UnitStore (valeur Python, pas scalaire NumPy)."""
+
+    __slots__ = ("name",)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return getattr(unit.store, self.name).item(unit.index)
+
+    def __set__(self, unit, value):
+        getattr(unit.store, self.name)[unit.index] = value
+
+
+class HealthColumn(Column):
+    """Comme Column, mais des PV entiers restent des int (affichage « 12 PV » et non « 12.0 PV »)."""
+
+    __slots__ = ()
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        value = unit.store.health.item(unit.index)
+        return int(value) if value.is_integer() else value
+
+
+class Flag:
+    """Attribut booléen d'unité stocké dans un bit de la colonne flags."""
+
+    __slots__ = ("bit",)
+
+    def __init__(self, bit):
+        self.bit = bit
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return bool(unit.store.flags.item(unit.index) & self.bit)
+
+    def __set__(self, unit, value):
+        if value:
+            unit.store.flags[unit.index] |= self.bit
+        else:
+            unit.store.flags[unit.index] &= ~self.bit & 0xFF
+
+
+class UnitStore:
+    """
+    Classe pour représenter l'état numérique de toutes les unités d'une partie, une ligne par unité.
+    表示一局游戏中所有单位数值状态的类，每个单位一行。
+
+    ...
+    Attributs
+    ---------
+    count : int
+        Nombre d'unités enregistrées (lignes utilisées).
+        已登记的单位数（已使用的行数）。
+    units : list[Unit]
+        L'unité de chaque ligne, pour retrouver l'objet à partir d'un index.
+        每一行对应的单位对象。
+    x, y, health, attack_power, defense, ... : numpy.ndarray
+        Une colonne par statistique (voir COLUMNS), de longueur capacity.
+        每个属性一列（见 COLUMNS）。
+    flags : numpy.ndarray
+        Bits SELECTED, HIDDEN, VISIBLE et REMOVED (retirée de son équipe et de la carte).
+        标志位：选中、隐身、可见、已移除。
+    rng : random.Random
+        Tirages de combat des unités (précision, esquive, critiques) : le flux combat de la partie.
+        单位的战斗随机数（命中、闪避、暴击）：对局的战斗随机流。
+
+    Méthodes
+    --------
+    add(unit, **values)
+        Ajoute une ligne pour une unité et renvoie son index.
+        为单位添加一行并返回其索引。
+    live(team) / placed(team)
+        Masques des unités vivantes / encore sur la carte, éventuellement d'une équipe.
+        存活单位 / 仍在地图上的单位的掩码。
+    closest(x, y, team) / closest_in(shape, x, y, team) / weakest(team)
+        Requêtes d'équipe vectorisées.
+        向量化的队伍查询。
+    area(shape, x, y, team)
+        Masque des unités dans une zone d'effet.
+        范围效果内单位的掩码。
+    damage(mask, damage, attack_type)
+        Applique des dégâts à plusieurs unités d'un coup, faiblesses et résistances comprises.
+        一次对多个单位造成伤害（考虑弱点和抗性）。
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, rng=None):
+        self.count = 0
+        self.rng = random.Random() if rng is None else rng
+        self.units = []
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        # Lignes encore sur la carte, toutes équipes (None) et par équipe, tenues à jour par add et remove
+        self.rows = {team: np.zeros(capacity, dtype=bool) for team in (None, *TEAM_CODES)}
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def add(self, unit, **values):
+        """Ajoute une ligne remplie avec values (colonnes de COLUMNS) et renvoie son index."""
+        if self.count == self.capacity:
+            self.grow(2 * self.capacity)
+        index = self.count
+        for name, value in values.items():
+            getattr(self, name)[index] = value
+        self.units.append(unit)
+        self.rows[None][index] = True
+        self.rows[unit.team][index] = True
+        self.count += 1
+        return index
+
+    def grow(self, capacity):
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        for team, rows in self.rows.items():
+            self.rows[team] = np.zeros(capacity, dtype=bool)
+            self.rows[team][:len(rows)] = rows
+
+    def remove(self, unit):
+        """Marque une unité comme retirée de son équipe et de la carte (sa ligne reste en place)."""
+        self.flags[unit.index] |= REMOVED
+        self.rows[None][unit.index] = False
+        self.rows[unit.team][unit.index] = False
+
+    def refresh_rows(self):
+        """Recalcule les lignes sur la carte (toutes équipes et par équipe) à partir des colonnes flags et team."""
+        n = self.count
+        placed = (self.flags[:n] & REMOVED) == 0
+        self.rows[None][:n] = placed
+        for team, code in TEAM_CODES.items():
+            self.rows[team][:n] = placed & (self.team[:n] == code)
+
+    def placed(self, team=None):
+        """Masque (en lecture seule) des unités encore sur la carte, mortes comprises, éventuellement d'une équipe."""
+        return self.rows[team][:self.count]
+
+    def live(self, team=None):
+        """Masque des unités vivantes encore sur la carte, éventuellement d'une équipe."""
+        return self.rows[team][:self.count] & (self.health[:self.count] > 0)
+
+    def selected(self, mask):
+        """Unités des lignes sélectionnées par un masque, dans l'ordre des lignes."""
+        return [self.units[index] for index in np.flatnonzero(mask)]
+
+    def nearest(self, mask, distance):
+        """Unité du masque qui minimise distance (tableau sur toutes les lignes), ou None ; à égalité, la première."""
+        index = int(np.where(mask, distance, np.inf).argmin())
+        return self.units[index] if mask[index] else None
+
+    def closest(self, x, y, team):
+        """Unité vivante de l'équipe la plus proche de (x, y) en distance de Manhattan, ou None."""
+        n = self.count
+        distance = np.abs(self.x[:n] - x)
+        distance += np.abs(self.y[:n] - y)
+        return self.nearest(self.live(team), distance)
+
+    def closest_in(self, shape, x, y, team):
+        """Unité de l'équipe couverte par la forme centrée sur (x, y) la plus proche (distance euclidienne), ou None."""
+        n = self.count
+        dx, dy = self.x[:n] - x, self.y[:n] - y
+        return self.nearest(self.area(shape, x, y, team), dx * dx + dy * dy)
+
+    def weakest(self, team):
+        """Unité vivante de l'équipe avec le moins de PV, ou None."""
+        return self.nearest(self.live(team), self.health[:self.count])
+
+    def reset_actions(self, actions=1):
+        """Rend ses actions à chaque unité vivante encore sur la carte."""
+        self.actions_left[:self.count][self.live()] = actions
+
+    def area(self, shape, x, y, team=None):
+        """Masque des unités sur la carte couvertes par une forme (shapes.Shape) centrée sur (x, y)."""
+        n = self.count
+        return self.placed(team) & shape.contains(self.x[:n] - x, self.y[:n] - y)
+
+    def damage(self, mask, damage, attack_type):
+        """
+        Applique les mêmes dégâts à toutes les unités du masque, comme Unit.take_damage :
+        x1.5 contre une faiblesse, x0.5 contre une résistance, puis partie entière.
+        Renvoie les unités touchées.
+        """
+        n = self.count
+        bit = ATTACK_BITS[attack_type]
+        multiplier = type_multiplier(self.weak[:n] & bit, self.resist[:n] & bit)
+        dealt = np.maximum(0, np.trunc(damage * multiplier))
+        self.health[:n][mask] -= dealt[mask]
+        self.damage_taken[:n][mask] += dealt[mask]
+        return self.selected(mask)
@@ -0,0 +1,104 @@
+"""
+Vision combinée de l'équipe du joueur, tenue à jour de façon incrémentale pour le brouillard de guerre.
+玩家队伍的合并视野，增量更新，用于战争迷雾。
+"""
+
+import numpy as np
+
+from shapes import disk_stencil
+
+VISION_RANGE = 5
+
+# Décalages du disque de vision, calculés une seule fois
+VISION_STENCIL = disk_stencil(VISION_RANGE)
+VISION_OFFSETS = [(int(dx) - VISION_RANGE, int(dy) - VISION_RANGE) for dx, dy in np.argwhere(VISION_STENCIL)]
+
+
+class VisionMap:
+    """
+    Classe pour représenter les cases vues par l'équipe du joueur.
+    表示玩家队伍可见格子的类。
+
+    ...
+    Attributs
+    ---------
+    counts : numpy.ndarray
+        Nombre d'unités qui voient chaque case, indexé par [x, y].
+        每个格子被多少个单位看到，按 [x, y] 索引。
+    visible : numpy.ndarray
+        Masque booléen [x, y] des cases vues (counts > 0).
+        可见格子的布尔掩码。
+    version : int
+        Incrémenté quand la vision change, pour ne redessiner le brouillard qu'à ce moment-là.
+        视野变化时递增，只在此时重绘迷雾。
+
+    Méthodes
+    --------
+    sync(units)
+        Met à jour la vision pour les seules unités qui ont bougé ou sont mortes.
+        只为移动或死亡的单位更新视野。
+    (x, y) in vision
+        Test de visibilité en temps constant.
+        常数时间的可见性判断。
+    """
+
+    def __init__(self, size, radius=VISION_RANGE):
+        self.size = size
+        self.radius = radius
+        self.stencil = disk_stencil(radius).astype(np.int16)
+        self.counts = np.zeros((size, size), dtype=np.int16)
+        self.visible = np.zeros((size, size), dtype=bool)
+        self.positions = {}  # Unité -> case dont le disque est compté dans counts
+        self.version = 0
+
+    def __contains__(self, cell):
+        x, y = cell
+        return 0 <= x < self.size and 0 <= y < self.size and self.visible.item(x, y)
+
+    def cells(self):
+        """Liste des cases vues, en (x, y)."""
+        return [(int(x), int(y)) for x, y in np.argwhere(self.visible)]
+
+    def sync(self, units):
+        """
+        Aligne la vision sur les unités données (les vivantes voient, les mortes non).
+        Seules les unités dont la case a changé depuis le dernier appel touchent la grille.
+        """
+        changed = False
+        seen = set()
+        for unit in units:
+            seen.add(unit)
+            position = (unit.x, unit.y) if unit.health > 0 else None
+            old = self.positions.get(unit)
+            if old == position:
+                continue
+            if old is not None:
+                self.stamp(old, -1)
+            if position is None:
+                del self.positions[unit]
+            else:
+                self.stamp(position, 1)
+                self.positions[unit] = position
+            changed = True
+        # Unités retirées de la liste (mortes et supprimées)
+        for unit in [unit for unit in self.positions if unit not in seen]:
+            self.stamp(self.positions.pop(unit), -1)
+            changed = True
+        if changed:
+            np.greater(self.counts, 0, out=self.visible)
+            self.version += 1
+        return self
+
+    def stamp(self, position, sign):
+        """Ajoute (sign = 1) ou retire (sign = -1) le disque de vision centré sur une case, coupé aux bords."""
+        x, y = position
+        r = self.radius
+        x0, x1 = max(x - r, 0), min(x + r + 1, self.size)
+        y0, y1 = max(y - r, 0), min(y + r + 1, self.size)
+        if x0 >= x1 or y0 >= y1:
+            return
+        stencil = self.stencil[x0 - (x - r):x1 - (x - r), y0 - (y - r):y1 - (y - r)]
+        if sign > 0:
+            self.counts[x0:x1, y0:y1] += stencil
+        else:
+            self.counts[x0:x1, y0:y1] -= stencil